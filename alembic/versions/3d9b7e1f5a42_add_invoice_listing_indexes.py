@@ -0,0 +1,37 @@
+"""add invoice listing indexes
+
+Revision ID: 3d9b7e1f5a42
+Revises: 8a7f2c4e9b13
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3d9b7e1f5a42"
+down_revision = "8a7f2c4e9b13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_invoices_student_id_due_date", "invoices", ["student_id", "due_date"], unique=False)
+    op.create_index("ix_invoices_due_date_id", "invoices", ["due_date", "id"], unique=False)
+    op.create_index(
+        "ix_invoices_open_status_due_date",
+        "invoices",
+        ["status", "due_date"],
+        unique=False,
+        postgresql_where=sa.text("status <> 'PAID'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_invoices_open_status_due_date", table_name="invoices")
+    op.drop_index("ix_invoices_due_date_id", table_name="invoices")
+    op.drop_index("ix_invoices_student_id_due_date", table_name="invoices")
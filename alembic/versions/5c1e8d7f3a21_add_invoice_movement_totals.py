@@ -0,0 +1,60 @@
+"""add invoice movement totals
+
+Revision ID: 5c1e8d7f3a21
+Revises: 2f4d3a9a6c7b
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c1e8d7f3a21"
+down_revision = "2f4d3a9a6c7b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "invoices",
+        sa.Column("payments_total", sa.Numeric(precision=12, scale=2), nullable=False, server_default=sa.text("0")),
+    )
+    op.add_column(
+        "invoices",
+        sa.Column("refunds_total", sa.Numeric(precision=12, scale=2), nullable=False, server_default=sa.text("0")),
+    )
+
+    op.execute(
+        """
+        WITH invoice_movement_totals AS (
+            SELECT
+                p.invoice_id,
+                SUM(CASE WHEN p.kind = 'PAYMENT' THEN p.amount ELSE 0 END) AS payments_total,
+                SUM(CASE WHEN p.kind = 'REFUND' THEN p.amount ELSE 0 END) AS refunds_total
+            FROM payments p
+            GROUP BY p.invoice_id
+        )
+        UPDATE invoices i
+        SET payments_total = t.payments_total,
+            refunds_total = t.refunds_total
+        FROM invoice_movement_totals t
+        WHERE i.id = t.invoice_id
+        """
+    )
+
+    op.create_check_constraint(
+        "ck_invoices_movement_totals_non_negative",
+        "invoices",
+        "payments_total >= 0 AND refunds_total >= 0",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_invoices_movement_totals_non_negative", "invoices", type_="check")
+    op.drop_column("invoices", "refunds_total")
+    op.drop_column("invoices", "payments_total")
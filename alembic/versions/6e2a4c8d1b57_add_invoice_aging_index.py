@@ -0,0 +1,34 @@
+"""add invoice aging index
+
+Revision ID: 6e2a4c8d1b57
+Revises: 3d9b7e1f5a42
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6e2a4c8d1b57"
+down_revision = "3d9b7e1f5a42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_invoices_open_student_id_aging",
+        "invoices",
+        ["student_id"],
+        unique=False,
+        postgresql_include=["due_date", "total_amount", "payments_total", "refunds_total"],
+        postgresql_where=sa.text("status <> 'PAID'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_invoices_open_student_id_aging", table_name="invoices")
@@ -0,0 +1,33 @@
+"""add invoice billing runs
+
+Revision ID: 9b3f6d2e8c14
+Revises: 6e2a4c8d1b57
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b3f6d2e8c14"
+down_revision = "6e2a4c8d1b57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("invoices", sa.Column("billing_run_id", sa.UUID(), nullable=True))
+    op.add_column("invoices", sa.Column("fee_code", sa.String(length=50), nullable=True))
+    op.create_unique_constraint(
+        "uq_invoices_billing_run_student_fee", "invoices", ["billing_run_id", "student_id", "fee_code"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_invoices_billing_run_student_fee", "invoices", type_="unique")
+    op.drop_column("invoices", "fee_code")
+    op.drop_column("invoices", "billing_run_id")
@@ -0,0 +1,38 @@
+"""add billing runs
+
+Revision ID: c4e8a1f7d2b9
+Revises: 9b3f6d2e8c14
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4e8a1f7d2b9"
+down_revision = "9b3f6d2e8c14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "billing_runs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("school_id", sa.UUID(), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["school_id"], ["schools.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_billing_runs_school_id"), "billing_runs", ["school_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_billing_runs_school_id"), table_name="billing_runs")
+    op.drop_table("billing_runs")
@@ -0,0 +1,32 @@
+"""add idempotency key expiry
+
+Revision ID: d7b2e5a9c3f1
+Revises: c4e8a1f7d2b9
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d7b2e5a9c3f1"
+down_revision = "c4e8a1f7d2b9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("idempotency_keys", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    # Existing keys get the default 24 hour lifetime, counted from when they were stored.
+    op.execute("UPDATE idempotency_keys SET expires_at = created_at + interval '24 hours'")
+    op.alter_column("idempotency_keys", "expires_at", nullable=False)
+    op.create_index(op.f("ix_idempotency_keys_expires_at"), "idempotency_keys", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_idempotency_keys_expires_at"), table_name="idempotency_keys")
+    op.drop_column("idempotency_keys", "expires_at")
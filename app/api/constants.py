@@ -2,6 +2,11 @@
 DEFAULT_OFFSET = 0
 DEFAULT_LIMIT = 100
 MAX_LIMIT = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Bulk ingestion
+MAX_BULK_PAYMENTS = 10_000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 # Resource names for error messages
 SCHOOLS = "school"
@@ -1,20 +1,44 @@
 from __future__ import annotations
 
-from typing import Annotated
+from collections.abc import AsyncIterator, Callable
+from typing import Annotated, Literal
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.read_routing import reads_from_primary
+from app.cache.factory import get_shared_statement_cache
+from app.core.process_pool import get_shared_process_pool
 from app.core.security import decode_access_token
+from app.core.settings import settings
 from app.dal.repos.sqlalchemy_invoice_repo import SQLAlchemyInvoiceRepo
 from app.dal.repos.sqlalchemy_payment_repo import SQLAlchemyPaymentRepo
 from app.dal.repos.sqlalchemy_school_repo import SQLAlchemySchoolRepo
 from app.dal.repos.sqlalchemy_student_repo import SQLAlchemyStudentRepo
-from app.db.session import get_db
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork, unit_of_work_factory
+from app.db.session import ReadSessionLocal, SessionLocal, get_db
 from app.schemas.auth import UserClaims
-from app.services.ports import InvoiceRepo, PaymentRepo, SchoolRepo, StudentRepo
-from app.services.use_cases import GetSchoolStatement, GetStudentStatement, ListInvoicePayments
+from app.services.ports import (
+    InvoiceRepo,
+    PaymentRepo,
+    SchoolRepo,
+    StatementCache,
+    StatementReposFactory,
+    StudentRepo,
+    UnitOfWork,
+)
+from app.services.statement_cache import CachedGetSchoolStatement, CachedGetStudentStatement
+from app.services.statement_offload import StatementOffload
+from app.services.use_cases import (
+    GetAgingReport,
+    GetSchoolAging,
+    GetSchoolStatement,
+    GetStudentStatement,
+    ListInvoicePayments,
+    StatementJSONQuery,
+    StreamSchoolStatement,
+)
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -48,42 +72,104 @@ async def require_admin(current_user: Annotated[UserClaims, Depends(get_current_
     return current_user
 
 
-async def get_school_repo(session: Annotated[AsyncSession, Depends(get_db)]) -> SchoolRepo:
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for read-only routes: the replica, or the primary inside the client's read-your-writes window."""
+    async with _read_session_local(request)() as session:
+        yield session
+
+
+def _read_session_local(request: Request) -> Callable[[], AsyncSession]:
+    return SessionLocal if reads_from_primary(request) else ReadSessionLocal
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+async def get_school_repo(session: ReadSessionDep) -> SchoolRepo:
     return SQLAlchemySchoolRepo(session)
 
 
-async def get_student_repo(session: Annotated[AsyncSession, Depends(get_db)]) -> StudentRepo:
+async def get_student_repo(session: ReadSessionDep) -> StudentRepo:
     return SQLAlchemyStudentRepo(session)
 
 
-async def get_invoice_repo(session: Annotated[AsyncSession, Depends(get_db)]) -> InvoiceRepo:
+async def get_invoice_repo(session: ReadSessionDep) -> InvoiceRepo:
     return SQLAlchemyInvoiceRepo(session)
 
 
-async def get_payment_repo(session: Annotated[AsyncSession, Depends(get_db)]) -> PaymentRepo:
+async def get_payment_repo(session: ReadSessionDep) -> PaymentRepo:
     return SQLAlchemyPaymentRepo(session)
 
 
+async def get_statement_cache() -> StatementCache | None:
+    return get_shared_statement_cache()
+
+
+async def get_uow(session: Annotated[AsyncSession, Depends(get_db)]) -> UnitOfWork:
+    return SQLAlchemyUnitOfWork(session)
+
+
+async def get_statement_repos_factory(request: Request) -> StatementReposFactory:
+    """Opens repos on a new session per call, so a statement's independent queries run on separate connections."""
+    return unit_of_work_factory(_read_session_local(request))
+
+
+StatementReposDep = Annotated[StatementReposFactory, Depends(get_statement_repos_factory)]
+
+
+def _statement_fill_settle_seconds(request: Request) -> float:
+    # A replica may not have applied a write that just invalidated a statement yet, so fills read from it are only
+    # cached once the invalidation is older than the lag the read-your-writes window already allows for.
+    return 0.0 if reads_from_primary(request) else settings.read_your_writes_seconds
+
+
 async def get_student_statement_uc(
-    student_repo: Annotated[StudentRepo, Depends(get_student_repo)],
-    invoice_repo: Annotated[InvoiceRepo, Depends(get_invoice_repo)],
-    payment_repo: Annotated[PaymentRepo, Depends(get_payment_repo)],
-) -> GetStudentStatement:
-    return GetStudentStatement(student_repo=student_repo, invoice_repo=invoice_repo, payment_repo=payment_repo)
+    request: Request, repos: StatementReposDep, cache: Annotated[StatementCache | None, Depends(get_statement_cache)]
+) -> StatementJSONQuery:
+    use_case = GetStudentStatement(repos, max_concurrency=settings.statement_max_concurrency)
+    if cache is None:
+        return use_case.json
+    return CachedGetStudentStatement(use_case.json, cache, settle_seconds=_statement_fill_settle_seconds(request))
+
+
+async def get_statement_offload() -> StatementOffload | None:
+    executor = get_shared_process_pool()
+    if executor is None:
+        return None
+    return StatementOffload(
+        executor,
+        min_invoices=settings.statement_offload_min_invoices,
+        chunk_invoices=settings.statement_offload_chunk_invoices,
+    )
 
 
 async def get_school_statement_uc(
-    school_repo: Annotated[SchoolRepo, Depends(get_school_repo)],
-    student_repo: Annotated[StudentRepo, Depends(get_student_repo)],
-    invoice_repo: Annotated[InvoiceRepo, Depends(get_invoice_repo)],
-    payment_repo: Annotated[PaymentRepo, Depends(get_payment_repo)],
-) -> GetSchoolStatement:
-    return GetSchoolStatement(
-        school_repo=school_repo,
-        student_repo=student_repo,
-        invoice_repo=invoice_repo,
-        payment_repo=payment_repo,
+    request: Request,
+    repos: StatementReposDep,
+    cache: Annotated[StatementCache | None, Depends(get_statement_cache)],
+    offload: Annotated[StatementOffload | None, Depends(get_statement_offload)],
+    output_format: Annotated[Literal["json", "ndjson"], Query(alias="format")] = "json",
+) -> AsyncIterator[StatementJSONQuery | StreamSchoolStatement]:
+    """Builds only the use case for the requested format, so a JSON request never opens the stream's read session."""
+    if output_format == "ndjson":
+        async with _read_session_local(request)() as session:
+            yield StreamSchoolStatement(
+                school_repo=SQLAlchemySchoolRepo(session),
+                student_repo=SQLAlchemyStudentRepo(session),
+                invoice_repo=SQLAlchemyInvoiceRepo(session),
+            )
+        return
+
+    use_case = GetSchoolStatement(
+        repos,
+        chunk_size=settings.statement_student_chunk_size,
+        max_concurrency=settings.statement_max_concurrency,
+        offload=offload,
     )
+    if cache is None:
+        yield use_case.json
+        return
+    yield CachedGetSchoolStatement(use_case.json, cache, settle_seconds=_statement_fill_settle_seconds(request))
 
 
 async def get_list_invoice_payments_uc(
@@ -91,3 +177,14 @@ async def get_list_invoice_payments_uc(
     payment_repo: Annotated[PaymentRepo, Depends(get_payment_repo)],
 ) -> ListInvoicePayments:
     return ListInvoicePayments(invoice_repo=invoice_repo, payment_repo=payment_repo)
+
+
+async def get_school_aging_uc(
+    school_repo: Annotated[SchoolRepo, Depends(get_school_repo)],
+    invoice_repo: Annotated[InvoiceRepo, Depends(get_invoice_repo)],
+) -> GetSchoolAging:
+    return GetSchoolAging(school_repo=school_repo, invoice_repo=invoice_repo)
+
+
+async def get_aging_report_uc(invoice_repo: Annotated[InvoiceRepo, Depends(get_invoice_repo)]) -> GetAgingReport:
+    return GetAgingReport(invoice_repo=invoice_repo)
@@ -1,83 +1,104 @@
 from __future__ import annotations
 
+from datetime import date
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, Response, status
 
 from app.api.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, MAX_LIMIT
-from app.api.deps import get_invoice_repo, get_list_invoice_payments_uc, get_payment_repo, require_admin
+from app.api.deps import get_invoice_repo, get_list_invoice_payments_uc, get_statement_cache, get_uow, require_admin
+from app.api.pagination import resolve_after_id, set_next_cursor
+from app.api.serialization import INVOICE_LIST_ADAPTER, PAYMENT_LIST_ADAPTER, list_response
+from app.domain.dtos import InvoiceFiltersDTO
+from app.domain.enums import InvoiceSort, InvoiceStatus
+from app.domain.errors import DomainError
 from app.schemas import InvoiceCreate, InvoiceRead, InvoiceUpdate, PaymentRead
 from app.schemas.auth import UserClaims
 from app.services import invoices as invoice_service
-from app.services.ports import InvoiceRepo, PaymentRepo
+from app.services.ports import InvoiceRepo, StatementCache, UnitOfWork
 from app.services.use_cases import ListInvoicePayments
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 InvoiceRepoDep = Annotated[InvoiceRepo, Depends(get_invoice_repo)]
+UnitOfWorkDep = Annotated[UnitOfWork, Depends(get_uow)]
+StatementCacheDep = Annotated[StatementCache | None, Depends(get_statement_cache)]
 ListInvoicePaymentsUCDep = Annotated[ListInvoicePayments, Depends(get_list_invoice_payments_uc)]
-PaymentRepoDep = Annotated[PaymentRepo, Depends(get_payment_repo)]
 AdminUser = Annotated[UserClaims, Depends(require_admin)]
 
 
 @router.post("", response_model=InvoiceRead)
-async def create_invoice(invoice_in: InvoiceCreate, invoice_repo: InvoiceRepoDep, _admin: AdminUser) -> InvoiceRead:
-    invoice = await invoice_service.create_invoice(invoice_repo, data=invoice_in.model_dump())
-    return InvoiceRead.model_validate(invoice_service.serialize_invoice_with_totals(invoice, []))
+async def create_invoice(
+    invoice_in: InvoiceCreate, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser
+) -> InvoiceRead:
+    invoice = await invoice_service.create_invoice(uow, data=invoice_in.model_dump(), statement_cache=cache)
+    return InvoiceRead.model_validate(invoice_service.serialize_invoice_with_totals(invoice))
 
 
 @router.get("", response_model=list[InvoiceRead])
 async def list_invoices(
     invoice_repo: InvoiceRepoDep,
-    payment_repo: PaymentRepoDep,
     offset: int = Query(default=DEFAULT_OFFSET, ge=0),
     limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
-) -> list[InvoiceRead]:
+    cursor: str | None = Query(default=None),
+    statuses: Annotated[list[InvoiceStatus] | None, Query(alias="status")] = None,
+    due_after: Annotated[date | None, Query()] = None,
+    due_before: Annotated[date | None, Query()] = None,
+    student_id: Annotated[UUID | None, Query()] = None,
+    school_id: Annotated[UUID | None, Query()] = None,
+    sort: Annotated[InvoiceSort, Query()] = InvoiceSort.ID,
+) -> Response:
+    # Cursors seek on id, so they only page correctly in id order; other sorts page with offset.
+    if cursor is not None and sort is not InvoiceSort.ID:
+        raise DomainError("cursor pagination requires sort=id")
+    after_id = resolve_after_id(cursor=cursor, offset=offset)
+    filters = InvoiceFiltersDTO(
+        statuses=tuple(statuses or ()),
+        due_after=due_after,
+        due_before=due_before,
+        student_id=student_id,
+        school_id=school_id,
+    )
     invoices = await invoice_service.list_invoices_with_totals(
-        invoice_repo,
-        payment_repo,
-        offset=offset,
-        limit=limit,
+        invoice_repo, offset=offset, limit=limit, after_id=after_id, filters=filters, sort=sort
     )
-    return [InvoiceRead.model_validate(invoice) for invoice in invoices]
+    response = list_response(INVOICE_LIST_ADAPTER, invoices)
+    if sort is InvoiceSort.ID:
+        set_next_cursor(response, [invoice["id"] for invoice in invoices], limit=limit)
+    return response
 
 
 @router.get("/{invoice_id}", response_model=InvoiceRead)
-async def get_invoice(invoice_id: UUID, invoice_repo: InvoiceRepoDep, payment_repo: PaymentRepoDep) -> InvoiceRead:
-    invoice = await invoice_service.get_invoice_with_totals(
-        invoice_repo,
-        payment_repo,
-        invoice_id=invoice_id,
-    )
+async def get_invoice(invoice_id: UUID, invoice_repo: InvoiceRepoDep) -> InvoiceRead:
+    invoice = await invoice_service.get_invoice_with_totals(invoice_repo, invoice_id=invoice_id)
     return InvoiceRead.model_validate(invoice)
 
 
 @router.get("/{invoice_id}/payments", response_model=list[PaymentRead])
-async def list_invoice_payments(invoice_id: UUID, use_case: ListInvoicePaymentsUCDep) -> list[PaymentRead]:
+async def list_invoice_payments(invoice_id: UUID, use_case: ListInvoicePaymentsUCDep) -> Response:
     payments = await use_case(invoice_id)
-    return [PaymentRead.model_validate(payment) for payment in payments]
+    return list_response(PAYMENT_LIST_ADAPTER, payments)
 
 
 @router.patch("/{invoice_id}", response_model=InvoiceRead)
 async def patch_invoice(
     invoice_id: UUID,
     invoice_in: InvoiceUpdate,
-    invoice_repo: InvoiceRepoDep,
-    payment_repo: PaymentRepoDep,
+    uow: UnitOfWorkDep,
+    cache: StatementCacheDep,
     _admin: AdminUser,
 ) -> InvoiceRead:
     invoice = await invoice_service.update_invoice(
-        invoice_repo,
-        payment_repo,
+        uow,
         invoice_id=invoice_id,
         data=invoice_in.model_dump(exclude_unset=True),
+        statement_cache=cache,
     )
-    payments = await payment_repo.list_by_invoice_id(invoice.id)
-    return InvoiceRead.model_validate(invoice_service.serialize_invoice_with_totals(invoice, payments))
+    return InvoiceRead.model_validate(invoice_service.serialize_invoice_with_totals(invoice))
 
 
 @router.delete("/{invoice_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_invoice(invoice_id: UUID, repo: InvoiceRepoDep, _admin: AdminUser) -> Response:
-    await invoice_service.delete_invoice(repo, invoice_id=invoice_id)
+async def delete_invoice(invoice_id: UUID, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser) -> Response:
+    await invoice_service.delete_invoice(uow, invoice_id=invoice_id, statement_cache=cache)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import Sequence
+from uuid import UUID
+
+from fastapi import Response
+
+from app.api.constants import NEXT_CURSOR_HEADER
+from app.domain.errors import DomainError
+
+
+def encode_cursor(last_id: UUID) -> str:
+    return base64.urlsafe_b64encode(last_id.bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> UUID:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return UUID(bytes=raw)
+    except (binascii.Error, ValueError) as exc:
+        raise DomainError("invalid pagination cursor") from exc
+
+
+def resolve_after_id(*, cursor: str | None, offset: int) -> UUID | None:
+    if cursor is None:
+        return None
+    if offset:
+        raise DomainError("cursor and offset pagination cannot be combined")
+    return decode_cursor(cursor)
+
+
+def set_next_cursor(response: Response, ids: Sequence[UUID], *, limit: int) -> None:
+    # A short page means there is nothing left to seek to.
+    if len(ids) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(ids[-1])
@@ -1,40 +1,108 @@
 from __future__ import annotations
 
+import json
+from datetime import timedelta
+from decimal import Decimal
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from pydantic import ValidationError
 
-from app.api.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, MAX_LIMIT
-from app.api.deps import get_invoice_repo, get_payment_repo, require_admin
-from app.schemas import PaymentCreate, PaymentRead, PaymentUpdate
+from app.api.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, MAX_BULK_PAYMENTS, MAX_LIMIT, NDJSON_MEDIA_TYPE
+from app.api.deps import get_payment_repo, get_statement_cache, get_uow, require_admin
+from app.api.pagination import resolve_after_id, set_next_cursor
+from app.api.serialization import PAYMENT_LIST_ADAPTER, list_response
+from app.core.settings import settings
+from app.domain.errors import DomainError
+from app.schemas import PaymentBulkResult, PaymentBulkRowResult, PaymentCreate, PaymentRead, PaymentUpdate
 from app.schemas.auth import UserClaims
 from app.services import payments as payment_service
-from app.services.ports import InvoiceRepo, PaymentRepo
+from app.services.ports import PaymentRepo, StatementCache, UnitOfWork
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 PaymentRepoDep = Annotated[PaymentRepo, Depends(get_payment_repo)]
-InvoiceRepoDep = Annotated[InvoiceRepo, Depends(get_invoice_repo)]
+UnitOfWorkDep = Annotated[UnitOfWork, Depends(get_uow)]
+StatementCacheDep = Annotated[StatementCache | None, Depends(get_statement_cache)]
 AdminUser = Annotated[UserClaims, Depends(require_admin)]
 
 
 @router.post("", response_model=PaymentRead)
 async def create_payment(
-    payment_in: PaymentCreate, payment_repo: PaymentRepoDep, invoice_repo: InvoiceRepoDep, _admin: AdminUser
+    payment_in: PaymentCreate,
+    uow: UnitOfWorkDep,
+    cache: StatementCacheDep,
+    _admin: AdminUser,
+    idempotency_key: str | None = Header(default=None, min_length=1, max_length=255),
 ) -> PaymentRead:
-    payment = await payment_service.create_payment(payment_repo, invoice_repo, data=payment_in.model_dump())
+    payment = await payment_service.create_payment(
+        uow,
+        data=payment_in.model_dump(),
+        idempotency_key=idempotency_key,
+        idempotency_ttl=timedelta(seconds=settings.idempotency_key_ttl_seconds),
+        statement_cache=cache,
+    )
     return PaymentRead.model_validate(payment)
 
 
+@router.post(
+    "/bulk",
+    response_model=PaymentBulkResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/PaymentCreate"}}
+                },
+                NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/PaymentCreate"}},
+            },
+        }
+    },
+)
+async def create_payments_bulk(
+    request: Request, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser
+) -> PaymentBulkResult:
+    items = _parse_bulk_body(await request.body(), media_type=request.headers.get("content-type", ""))
+
+    results: dict[int, PaymentBulkRowResult] = {}
+    valid_indexes: list[int] = []
+    valid_rows: list[dict[str, object]] = []
+    for index, item in enumerate(items):
+        try:
+            valid_rows.append(PaymentCreate.model_validate(item).model_dump())
+        except ValidationError as exc:
+            results[index] = PaymentBulkRowResult(index=index, status="rejected", error=_validation_message(exc))
+            continue
+        valid_indexes.append(index)
+
+    outcomes = await payment_service.create_payments_bulk(uow, valid_rows, statement_cache=cache)
+    for index, outcome in zip(valid_indexes, outcomes, strict=True):
+        if outcome.payment is None:
+            results[index] = PaymentBulkRowResult(index=index, status="rejected", error=outcome.error)
+        else:
+            results[index] = PaymentBulkRowResult(
+                index=index, status="created", payment=PaymentRead.model_validate(outcome.payment)
+            )
+
+    ordered = [results[index] for index in range(len(items))]
+    created = sum(1 for result in ordered if result.status == "created")
+    return PaymentBulkResult(created=created, rejected=len(ordered) - created, results=ordered)
+
+
 @router.get("", response_model=list[PaymentRead])
 async def list_payments(
     repo: PaymentRepoDep,
     offset: int = Query(default=DEFAULT_OFFSET, ge=0),
     limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
-) -> list[PaymentRead]:
-    payments = await payment_service.list_payments(repo, offset=offset, limit=limit)
-    return [PaymentRead.model_validate(payment) for payment in payments]
+    cursor: str | None = Query(default=None),
+) -> Response:
+    after_id = resolve_after_id(cursor=cursor, offset=offset)
+    payments = await payment_service.list_payments(repo, offset=offset, limit=limit, after_id=after_id)
+    response = list_response(PAYMENT_LIST_ADAPTER, payments)
+    set_next_cursor(response, [payment.id for payment in payments], limit=limit)
+    return response
 
 
 @router.get("/{payment_id}", response_model=PaymentRead)
@@ -47,22 +115,52 @@ async def get_payment(payment_id: UUID, repo: PaymentRepoDep) -> PaymentRead:
 async def patch_payment(
     payment_id: UUID,
     payment_in: PaymentUpdate,
-    payment_repo: PaymentRepoDep,
-    invoice_repo: InvoiceRepoDep,
+    uow: UnitOfWorkDep,
+    cache: StatementCacheDep,
     _admin: AdminUser,
 ) -> PaymentRead:
     payment = await payment_service.update_payment(
-        payment_repo,
-        invoice_repo,
+        uow,
         payment_id=payment_id,
         data=payment_in.model_dump(exclude_unset=True),
+        statement_cache=cache,
     )
     return PaymentRead.model_validate(payment)
 
 
 @router.delete("/{payment_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_payment(
-    payment_id: UUID, payment_repo: PaymentRepoDep, invoice_repo: InvoiceRepoDep, _admin: AdminUser
-) -> Response:
-    await payment_service.delete_payment(payment_repo, invoice_repo, payment_id=payment_id)
+async def delete_payment(payment_id: UUID, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser) -> Response:
+    await payment_service.delete_payment(uow, payment_id=payment_id, statement_cache=cache)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _parse_bulk_body(body: bytes, *, media_type: str) -> list[object]:
+    if media_type.split(";", 1)[0].strip() == NDJSON_MEDIA_TYPE:
+        items: list[object] = []
+        for line_number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line, parse_float=Decimal))
+            except ValueError as exc:
+                raise DomainError(f"invalid JSON on line {line_number}") from exc
+    else:
+        try:
+            parsed = json.loads(body, parse_float=Decimal)
+        except ValueError as exc:
+            raise DomainError("request body must be valid JSON") from exc
+        if not isinstance(parsed, list):
+            raise DomainError("request body must be a JSON array of payments")
+        items = parsed
+
+    if not items:
+        raise DomainError("bulk request contains no payments")
+    if len(items) > MAX_BULK_PAYMENTS:
+        raise DomainError(f"bulk request exceeds {MAX_BULK_PAYMENTS} payments")
+    return items
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'body'}: {error['msg']}" for error in exc.errors()
+    )
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import settings
+from app.db.session import track_primary_commits
+
+LAST_WRITE_COOKIE = "last_write_at"
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def reads_from_primary(request: Request) -> bool:
+    """True while the client is inside the read-your-writes window after its own successful write."""
+    if settings.read_replica_url is None:
+        return True
+    raw = request.cookies.get(LAST_WRITE_COOKIE)
+    if raw is None:
+        return False
+    try:
+        last_write_at = float(raw)
+    except ValueError:
+        return False
+    return time.time() - last_write_at < settings.read_your_writes_seconds
+
+
+class ReadYourWritesMiddleware:
+    """Stamps successful responses that committed on the primary with a `last_write_at` cookie, so follow-up reads
+    can skip replica lag. Requests that write nothing, such as `POST /auth/login`, leave the client on the replica."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS or settings.read_replica_url is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_write_stamp(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400 and commits.count:
+                max_age = max(1, round(settings.read_your_writes_seconds))
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        with track_primary_commits() as commits:
+            await self.app(scope, receive, send_with_write_stamp)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.api.deps import get_aging_report_uc
+from app.api.serialization import AGING_REPORT_ADAPTER, model_response
+from app.schemas import AgingReport
+from app.services.use_cases import GetAgingReport
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+AgingReportUCDep = Annotated[GetAgingReport, Depends(get_aging_report_uc)]
+
+
+@router.get("/aging", response_model=AgingReport)
+async def get_aging_report(use_case: AgingReportUCDep, as_of: Annotated[date | None, Query()] = None) -> Response:
+    return model_response(AGING_REPORT_ADAPTER, await use_case(as_of))
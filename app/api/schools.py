@@ -1,28 +1,58 @@
 from __future__ import annotations
 
+from datetime import date
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, Response, status
 
-from app.api.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, MAX_LIMIT
-from app.api.deps import get_school_repo, get_school_statement_uc, require_admin
-from app.schemas import SchoolCreate, SchoolRead, SchoolStatement, SchoolUpdate
+from app.api.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, MAX_LIMIT, NDJSON_MEDIA_TYPE
+from app.api.deps import (
+    get_school_aging_uc,
+    get_school_repo,
+    get_school_statement_uc,
+    get_statement_cache,
+    get_uow,
+    require_admin,
+)
+from app.api.pagination import resolve_after_id, set_next_cursor
+from app.api.serialization import (
+    SCHOOL_AGING_ADAPTER,
+    SCHOOL_LIST_ADAPTER,
+    PydanticJSONResponse,
+    list_response,
+    model_response,
+    ndjson_response,
+)
+from app.domain.dtos import FeeDTO
+from app.schemas import (
+    BillingRunCreate,
+    BillingRunResult,
+    SchoolAging,
+    SchoolCreate,
+    SchoolRead,
+    SchoolStatement,
+    SchoolUpdate,
+)
 from app.schemas.auth import UserClaims
+from app.services import billing_runs as billing_run_service
 from app.services import schools as school_service
-from app.services.ports import SchoolRepo
-from app.services.use_cases import GetSchoolStatement
+from app.services.ports import SchoolRepo, StatementCache, UnitOfWork
+from app.services.use_cases import GetSchoolAging, StatementJSONQuery, StreamSchoolStatement
 
 router = APIRouter(prefix="/schools", tags=["schools"])
 
 SchoolRepoDep = Annotated[SchoolRepo, Depends(get_school_repo)]
-SchoolStatementUCDep = Annotated[GetSchoolStatement, Depends(get_school_statement_uc)]
+UnitOfWorkDep = Annotated[UnitOfWork, Depends(get_uow)]
+SchoolStatementUCDep = Annotated[StatementJSONQuery | StreamSchoolStatement, Depends(get_school_statement_uc)]
+SchoolAgingUCDep = Annotated[GetSchoolAging, Depends(get_school_aging_uc)]
+StatementCacheDep = Annotated[StatementCache | None, Depends(get_statement_cache)]
 AdminUser = Annotated[UserClaims, Depends(require_admin)]
 
 
 @router.post("", response_model=SchoolRead)
-async def create_school(school_in: SchoolCreate, repo: SchoolRepoDep, _admin: AdminUser) -> SchoolRead:
-    school = await school_service.create_school(repo, data=school_in.model_dump())
+async def create_school(school_in: SchoolCreate, uow: UnitOfWorkDep, _admin: AdminUser) -> SchoolRead:
+    school = await school_service.create_school(uow, data=school_in.model_dump())
     return SchoolRead.model_validate(school)
 
 
@@ -31,9 +61,13 @@ async def list_schools(
     repo: SchoolRepoDep,
     offset: int = Query(default=DEFAULT_OFFSET, ge=0),
     limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
-) -> list[SchoolRead]:
-    schools = await school_service.list_schools(repo, offset=offset, limit=limit)
-    return [SchoolRead.model_validate(school) for school in schools]
+    cursor: str | None = Query(default=None),
+) -> Response:
+    after_id = resolve_after_id(cursor=cursor, offset=offset)
+    schools = await school_service.list_schools(repo, offset=offset, limit=limit, after_id=after_id)
+    response = list_response(SCHOOL_LIST_ADAPTER, schools)
+    set_next_cursor(response, [school.id for school in schools], limit=limit)
+    return response
 
 
 @router.get("/{school_id}", response_model=SchoolRead)
@@ -43,19 +77,60 @@ async def get_school(school_id: UUID, repo: SchoolRepoDep) -> SchoolRead:
 
 
 @router.patch("/{school_id}", response_model=SchoolRead)
-async def patch_school(school_id: UUID, school_in: SchoolUpdate, repo: SchoolRepoDep, _admin: AdminUser) -> SchoolRead:
-    school = await school_service.update_school(
-        repo, school_id=school_id, data=school_in.model_dump(exclude_unset=True)
-    )
+async def patch_school(school_id: UUID, school_in: SchoolUpdate, uow: UnitOfWorkDep, _admin: AdminUser) -> SchoolRead:
+    school = await school_service.update_school(uow, school_id=school_id, data=school_in.model_dump(exclude_unset=True))
     return SchoolRead.model_validate(school)
 
 
 @router.delete("/{school_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_school(school_id: UUID, repo: SchoolRepoDep, _admin: AdminUser) -> Response:
-    await school_service.delete_school(repo, school_id=school_id)
+async def delete_school(school_id: UUID, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser) -> Response:
+    await school_service.delete_school(uow, school_id=school_id, statement_cache=cache)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("/{school_id}/statement", response_model=SchoolStatement)
-async def get_school_statement(school_id: UUID, use_case: SchoolStatementUCDep) -> SchoolStatement:
-    return await use_case(school_id)
+@router.get(
+    "/{school_id}/statement",
+    response_model=SchoolStatement,
+    responses={
+        200: {
+            "content": {
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {
+                        "oneOf": [
+                            {"$ref": "#/components/schemas/InvoiceSummary"},
+                            {"$ref": "#/components/schemas/SchoolStatementTrailer"},
+                        ]
+                    }
+                }
+            },
+            "description": "JSON statement, or with `format=ndjson` one InvoiceSummary per line and a trailer line.",
+        }
+    },
+)
+async def get_school_statement(school_id: UUID, use_case: SchoolStatementUCDep) -> Response:
+    # `format` is read by the dependency, which builds only the use case that format needs.
+    if isinstance(use_case, StreamSchoolStatement):
+        return ndjson_response(await use_case(school_id))
+    return PydanticJSONResponse(await use_case(school_id))
+
+
+@router.get("/{school_id}/aging", response_model=SchoolAging)
+async def get_school_aging(
+    school_id: UUID, use_case: SchoolAgingUCDep, as_of: Annotated[date | None, Query()] = None
+) -> Response:
+    return model_response(SCHOOL_AGING_ADAPTER, await use_case(school_id, as_of))
+
+
+@router.post("/{school_id}/billing-runs", response_model=BillingRunResult)
+async def create_billing_run(
+    school_id: UUID, run_in: BillingRunCreate, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser
+) -> BillingRunResult:
+    result = await billing_run_service.run_term_billing(
+        uow,
+        run_id=run_in.run_id,
+        school_id=school_id,
+        fees=[FeeDTO(code=fee.code, amount=fee.amount, description=fee.description) for fee in run_in.fees],
+        due_date=run_in.due_date,
+        statement_cache=cache,
+    )
+    return BillingRunResult.model_validate(result, from_attributes=True)
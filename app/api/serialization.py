@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.api.constants import NDJSON_MEDIA_TYPE
+from app.schemas import (
+    AgingReport,
+    InvoiceRead,
+    PaymentRead,
+    SchoolAging,
+    SchoolRead,
+    StudentRead,
+)
+
+NDJSON_CHUNK_BYTES = 64 * 1024
+
+# Built once at import: constructing an adapter compiles its validator and serializer.
+INVOICE_LIST_ADAPTER = TypeAdapter(list[InvoiceRead])
+PAYMENT_LIST_ADAPTER = TypeAdapter(list[PaymentRead])
+SCHOOL_LIST_ADAPTER = TypeAdapter(list[SchoolRead])
+STUDENT_LIST_ADAPTER = TypeAdapter(list[StudentRead])
+SCHOOL_AGING_ADAPTER = TypeAdapter(SchoolAging)
+AGING_REPORT_ADAPTER = TypeAdapter(AgingReport)
+
+
+class PydanticJSONResponse(Response):
+    """A JSON response whose body pydantic-core has already encoded to bytes."""
+
+    media_type = "application/json"
+
+
+def list_response(adapter: TypeAdapter[list[Any]], items: Iterable[object]) -> PydanticJSONResponse:
+    # Validates once, from service dicts or DTO attributes. Routes still declare response_model for the OpenAPI
+    # schema, but FastAPI passes Response objects through without validating and encoding them a second time.
+    return PydanticJSONResponse(adapter.dump_json(adapter.validate_python(items, from_attributes=True)))
+
+
+def model_response(adapter: TypeAdapter[Any], value: object) -> PydanticJSONResponse:
+    return PydanticJSONResponse(adapter.dump_json(value))
+
+
+def ndjson_response(records: AsyncIterable[BaseModel]) -> StreamingResponse:
+    return StreamingResponse(_ndjson_chunks(records), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _ndjson_chunks(records: AsyncIterable[BaseModel]) -> AsyncIterator[bytes]:
+    # Lines are coalesced into ~NDJSON_CHUNK_BYTES sends so a large statement does not cost one ASGI message per line.
+    buffer = bytearray()
+    async for record in records:
+        buffer += record.__pydantic_serializer__.to_json(record)
+        buffer += b"\n"
+        if len(buffer) >= NDJSON_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
@@ -6,23 +6,29 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, Response, status
 
 from app.api.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, MAX_LIMIT
-from app.api.deps import get_student_repo, get_student_statement_uc, require_admin
+from app.api.deps import get_statement_cache, get_student_repo, get_student_statement_uc, get_uow, require_admin
+from app.api.pagination import resolve_after_id, set_next_cursor
+from app.api.serialization import STUDENT_LIST_ADAPTER, PydanticJSONResponse, list_response
 from app.schemas import StudentCreate, StudentRead, StudentStatement, StudentUpdate
 from app.schemas.auth import UserClaims
 from app.services import students as student_service
-from app.services.ports import StudentRepo
-from app.services.use_cases import GetStudentStatement
+from app.services.ports import StatementCache, StudentRepo, UnitOfWork
+from app.services.use_cases import StatementJSONQuery
 
 router = APIRouter(prefix="/students", tags=["students"])
 
 StudentRepoDep = Annotated[StudentRepo, Depends(get_student_repo)]
-StudentStatementUCDep = Annotated[GetStudentStatement, Depends(get_student_statement_uc)]
+UnitOfWorkDep = Annotated[UnitOfWork, Depends(get_uow)]
+StudentStatementUCDep = Annotated[StatementJSONQuery, Depends(get_student_statement_uc)]
+StatementCacheDep = Annotated[StatementCache | None, Depends(get_statement_cache)]
 AdminUser = Annotated[UserClaims, Depends(require_admin)]
 
 
 @router.post("", response_model=StudentRead)
-async def create_student(student_in: StudentCreate, repo: StudentRepoDep, _admin: AdminUser) -> StudentRead:
-    student = await student_service.create_student(repo, data=student_in.model_dump())
+async def create_student(
+    student_in: StudentCreate, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser
+) -> StudentRead:
+    student = await student_service.create_student(uow, data=student_in.model_dump(), statement_cache=cache)
     return StudentRead.model_validate(student)
 
 
@@ -31,9 +37,13 @@ async def list_students(
     repo: StudentRepoDep,
     offset: int = Query(default=DEFAULT_OFFSET, ge=0),
     limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
-) -> list[StudentRead]:
-    students = await student_service.list_students(repo, offset=offset, limit=limit)
-    return [StudentRead.model_validate(student) for student in students]
+    cursor: str | None = Query(default=None),
+) -> Response:
+    after_id = resolve_after_id(cursor=cursor, offset=offset)
+    students = await student_service.list_students(repo, offset=offset, limit=limit, after_id=after_id)
+    response = list_response(STUDENT_LIST_ADAPTER, students)
+    set_next_cursor(response, [student.id for student in students], limit=limit)
+    return response
 
 
 @router.get("/{student_id}", response_model=StudentRead)
@@ -44,20 +54,20 @@ async def get_student(student_id: UUID, repo: StudentRepoDep) -> StudentRead:
 
 @router.patch("/{student_id}", response_model=StudentRead)
 async def patch_student(
-    student_id: UUID, student_in: StudentUpdate, repo: StudentRepoDep, _admin: AdminUser
+    student_id: UUID, student_in: StudentUpdate, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser
 ) -> StudentRead:
     student = await student_service.update_student(
-        repo, student_id=student_id, data=student_in.model_dump(exclude_unset=True)
+        uow, student_id=student_id, data=student_in.model_dump(exclude_unset=True), statement_cache=cache
     )
     return StudentRead.model_validate(student)
 
 
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_student(student_id: UUID, repo: StudentRepoDep, _admin: AdminUser) -> Response:
-    await student_service.delete_student(repo, student_id=student_id)
+async def delete_student(student_id: UUID, uow: UnitOfWorkDep, cache: StatementCacheDep, _admin: AdminUser) -> Response:
+    await student_service.delete_student(uow, student_id=student_id, statement_cache=cache)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/{student_id}/statement", response_model=StudentStatement)
-async def get_student_statement(student_id: UUID, use_case: StudentStatementUCDep) -> StudentStatement:
-    return await use_case(student_id)
+async def get_student_statement(student_id: UUID, use_case: StudentStatementUCDep) -> Response:
+    return PydanticJSONResponse(await use_case(student_id))
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from app.cache.memory_backend import InMemoryStatementCache
+from app.cache.redis_backend import RedisStatementCache, redis_client_from_url
+from app.core.settings import Settings, settings
+from app.services.ports import StatementCache
+
+_statement_cache: StatementCache | None = None
+_statement_cache_built = False
+
+
+def build_statement_cache(config: Settings) -> StatementCache | None:
+    if config.statement_cache_backend == "none":
+        return None
+    if config.statement_cache_backend == "redis":
+        if not config.redis_url:
+            raise RuntimeError("statement_cache_backend=redis requires REDIS_URL")
+        return RedisStatementCache(
+            redis_client_from_url(config.redis_url),
+            ttl_seconds=config.statement_cache_ttl_seconds,
+            key_prefix=f"{config.service_name}:",
+        )
+    return InMemoryStatementCache(
+        ttl_seconds=config.statement_cache_ttl_seconds,
+        max_entries=config.statement_cache_max_entries,
+    )
+
+
+def get_shared_statement_cache() -> StatementCache | None:
+    global _statement_cache, _statement_cache_built
+    if not _statement_cache_built:
+        _statement_cache = build_statement_cache(settings)
+        _statement_cache_built = True
+    return _statement_cache
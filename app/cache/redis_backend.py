@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Sequence
+from typing import Protocol, cast
+
+
+class RedisClient(Protocol):
+    async def get(self, name: str) -> bytes | None: ...
+
+    async def set(self, name: str, value: bytes, ex: int | None = None) -> object: ...
+
+    async def delete(self, *names: str) -> int: ...
+
+
+class RedisStatementCache:
+    # TTL is set per key; LRU eviction is delegated to the server (`maxmemory-policy allkeys-lru`).
+    def __init__(self, client: RedisClient, *, ttl_seconds: int, key_prefix: str = "") -> None:
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        self._key_prefix = key_prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(self._key_prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._client.set(self._key_prefix + key, value, ex=self._ttl_seconds)
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        if keys:
+            await self._client.delete(*(self._key_prefix + key for key in keys))
+
+
+def redis_client_from_url(url: str) -> RedisClient:
+    # redis is an optional runtime dependency: import lazily so the default in-process cache never needs it.
+    try:
+        redis_asyncio = importlib.import_module("redis.asyncio")
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("statement_cache_backend=redis requires the `redis` package") from exc
+    return cast(RedisClient, redis_asyncio.from_url(url))
@@ -1,13 +1,21 @@
 import logging
 import time
-from collections.abc import Awaitable, Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 
-from fastapi import Request, Response
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from uuid_extensions import uuid7
 
+from app.core.settings import settings
+
 logger = logging.getLogger("app.request")
 
+UNMATCHED_ROUTE = "<unmatched>"
+
 HTTP_REQUESTS_TOTAL = Counter(
     "http_requests_total",
     "Total HTTP requests",
@@ -20,39 +28,146 @@ HTTP_REQUEST_DURATION_SECONDS = Histogram(
     ["method", "path"],
 )
 
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["method", "path"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+
+DB_TIME_PER_REQUEST_SECONDS = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL statements per HTTP request",
+    ["method", "path"],
+)
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured number of persistent connections in the pool", ["pool"])
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out of the pool", ["pool"])
+DB_POOL_CHECKED_IN = Gauge("db_pool_checked_in", "Idle connections currently held by the pool", ["pool"])
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Overflow connections currently open beyond the pool size", ["pool"])
+
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent obtaining a connection from the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+DB_POOL_CHECKOUT_TIMEOUTS_TOTAL = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Pool checkouts that gave up after pool_timeout",
+    ["pool"],
+)
+
+STATEMENT_CACHE_REQUESTS_TOTAL = Counter(
+    "statement_cache_requests_total",
+    "Statement cache lookups by scope and result (hit/miss)",
+    ["scope", "result"],
+)
+
+STATEMENT_CACHE_EVICTIONS_TOTAL = Counter(
+    "statement_cache_evictions_total",
+    "Statement cache entries dropped by the in-process backend (capacity/expired)",
+    ["reason"],
+)
+
+STATEMENT_CACHE_INVALIDATIONS_TOTAL = Counter(
+    "statement_cache_invalidations_total",
+    "Statement cache keys invalidated by writes",
+    ["scope"],
+)
+
 
-async def request_logging_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    request_id = request.headers.get("x-request-id", str(uuid7()))
-    start = time.perf_counter()
-    response: Response | None = None
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
 
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _query_stats.set(stats)
     try:
-        response = await call_next(request)
+        yield stats
     finally:
-        elapsed = time.perf_counter() - start
-        path = request.url.path
-        method = request.method
-
-        status = getattr(locals().get("response", None), "status_code", 500)
-        HTTP_REQUESTS_TOTAL.labels(method=method, path=path, status=str(status)).inc()
-        HTTP_REQUEST_DURATION_SECONDS.labels(method=method, path=path).observe(elapsed)
-
-        logger.info(
-            "request",
-            extra={
-                "request_id": request_id,
-                "method": method,
-                "path": path,
-                "status": status,
-                "latency_ms": round(elapsed * 1000, 2),
-            },
-        )
-
-    if response is None:
-        raise RuntimeError("request pipeline returned no response")
-
-    response.headers["x-request-id"] = request_id
-    return response
+        _query_stats.reset(token)
+
+
+class RequestObservabilityMiddleware:
+    """Pure ASGI request logging/metrics middleware.
+
+    Metrics are labelled with the matched route template (`/invoices/{invoice_id}`) rather than the raw URL path,
+    so entity ids never create new Prometheus series. Requests that match no route share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid7())
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["x-request-id"] = request_id
+                if settings.db_timing_headers:
+                    headers["x-db-queries"] = str(query_stats.count)
+                    headers.append(
+                        "server-timing", f'db;dur={query_stats.seconds * 1000:.2f};desc="{query_stats.count} queries"'
+                    )
+            await send(message)
+
+        # Engine event hooks (app/db/session.py) add to query_stats for every statement run on behalf of the request.
+        with track_queries() as query_stats:
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            finally:
+                elapsed = time.perf_counter() - start
+                method = scope["method"]
+                route = route_template(scope)
+
+                HTTP_REQUESTS_TOTAL.labels(method=method, path=route, status=str(status)).inc()
+                HTTP_REQUEST_DURATION_SECONDS.labels(method=method, path=route).observe(elapsed)
+                DB_QUERIES_PER_REQUEST.labels(method=method, path=route).observe(query_stats.count)
+                DB_TIME_PER_REQUEST_SECONDS.labels(method=method, path=route).observe(query_stats.seconds)
+
+                logger.info(
+                    "request",
+                    extra={
+                        "request_id": request_id,
+                        "method": method,
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status,
+                        "latency_ms": round(elapsed * 1000, 2),
+                        "db_queries": query_stats.count,
+                        "db_ms": round(query_stats.seconds * 1000, 2),
+                    },
+                )
+
+
+def route_template(scope: Scope) -> str:
+    # The router stores the matched route on the shared scope dict, so it is visible once the app has run.
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    return path_format if isinstance(path_format, str) else UNMATCHED_ROUTE
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.settings import Settings, settings
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_built = False
+
+
+def build_process_pool(config: Settings) -> ProcessPoolExecutor | None:
+    if config.statement_offload_workers <= 0:
+        return None
+    # spawn rather than fork: a forked child would inherit the event loop, pool threads and any locks they hold.
+    return ProcessPoolExecutor(
+        max_workers=config.statement_offload_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def get_shared_process_pool() -> ProcessPoolExecutor | None:
+    # Workers start on first use, so a process that never builds a large statement never spawns any.
+    global _process_pool, _process_pool_built
+    if not _process_pool_built:
+        _process_pool = build_process_pool(settings)
+        _process_pool_built = True
+    return _process_pool
+
+
+def shutdown_shared_process_pool() -> None:
+    # Called when the app stops, so spawned workers never outlive it; a later get_shared_process_pool() starts afresh.
+    global _process_pool, _process_pool_built
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+    _process_pool = None
+    _process_pool_built = False
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,6 +15,45 @@ class Settings(BaseSettings):
     admin_username: str = "admin"
     admin_password: str = "change_me"
     service_name: str = "school-billing"
+    # optional read replica for GET endpoints; a client's own writes are read from the primary for
+    # read_your_writes_seconds afterwards (tracked with a cookie)
+    read_replica_url: str | None = None
+    read_your_writes_seconds: float = 5.0
+
+    # connection pool; pre-ping costs a round trip per checkout, pool_recycle already retires stale connections
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = False
+    # asyncpg prepared statement cache per connection; set 0 behind pgbouncer in transaction pooling mode
+    db_statement_cache_size: int = 100
+
+    # echo per-request SQL statement count/time as `x-db-queries` and `Server-Timing` response headers
+    db_timing_headers: bool = False
+
+    # a payment's Idempotency-Key replays its first response for this long; expired keys can be reused and are
+    # deleted by `db-purge-idempotency-keys`
+    idempotency_key_ttl_seconds: int = 24 * 60 * 60
+
+    # statement read-through cache: "redis" (needs redis_url), "memory" or "none". Off by default: "memory" is per
+    # process, so with several workers a write only invalidates the worker that handled it and the others serve stale
+    # statements until the TTL expires. Use it only with a single worker.
+    statement_cache_backend: Literal["memory", "redis", "none"] = "none"
+    statement_cache_ttl_seconds: int = 60
+    statement_cache_max_entries: int = 10_000
+    redis_url: str | None = None
+
+    # school statements page through students this many at a time, fetching each chunk's invoices in one query
+    statement_student_chunk_size: int = 500
+    # statement queries without a data dependency run concurrently, each on its own pooled session, this many per request
+    # (at least 2: school statements keep one session paging students)
+    statement_max_concurrency: int = 4
+    # school statements of at least statement_offload_min_invoices invoices (counted up front) build all their summaries
+    # in a process pool of statement_offload_workers (0 disables), statement_offload_chunk_invoices per task
+    statement_offload_min_invoices: int = 50_000
+    statement_offload_chunk_invoices: int = 5_000
+    statement_offload_workers: int = 2
 
 
 settings = Settings()
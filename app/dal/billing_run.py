@@ -0,0 +1,24 @@
+import uuid
+from typing import Any, cast
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal.update_types import BillingRunCreate
+from app.models.billing_run import BillingRun
+
+
+async def get_billing_run(session: AsyncSession, run_id: uuid.UUID) -> BillingRun | None:
+    return await session.get(BillingRun, run_id)
+
+
+async def create_billing_run(session: AsyncSession, data: BillingRunCreate) -> bool:
+    # False when the run id is already taken; a concurrent run with the same id waits here until the first commits.
+    stmt = (
+        insert(BillingRun)
+        .values(id=data["id"], school_id=data["school_id"], request_hash=data["request_hash"])
+        .on_conflict_do_nothing(index_elements=[BillingRun.id])
+    )
+    result = cast(CursorResult[Any], await session.execute(stmt))
+    return result.rowcount == 1
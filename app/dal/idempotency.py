@@ -0,0 +1,53 @@
+from typing import Any, cast
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal.update_types import IdempotencyKeyCreate
+from app.models.idempotency_key import IdempotencyKey
+
+
+async def get_idempotency_key(session: AsyncSession, scope: str, key: str) -> IdempotencyKey | None:
+    # An expired key is treated as never used.
+    stmt = select(IdempotencyKey).where(
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at > func.now(),
+    )
+    result = await session.scalars(stmt)
+    return result.first()
+
+
+async def create_idempotency_key(session: AsyncSession, data: IdempotencyKeyCreate) -> bool:
+    insert_stmt = insert(IdempotencyKey).values(
+        scope=data["scope"],
+        key=data["key"],
+        request_hash=data["request_hash"],
+        response_status=data["response_status"],
+        response_body=data["response_body"],
+        expires_at=data["expires_at"],
+    )
+    # A live key leaves the insert a no-op; an expired one not purged yet is taken over as if it were new.
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+        set_={
+            "request_hash": insert_stmt.excluded.request_hash,
+            "response_status": insert_stmt.excluded.response_status,
+            "response_body": insert_stmt.excluded.response_body,
+            "expires_at": insert_stmt.excluded.expires_at,
+            "created_at": func.now(),
+            "updated_at": func.now(),
+        },
+        where=IdempotencyKey.expires_at <= func.now(),
+    )
+    result = cast(CursorResult[Any], await session.execute(stmt))
+    return result.rowcount == 1
+
+
+async def delete_expired_idempotency_keys(session: AsyncSession) -> int:
+    result = cast(
+        CursorResult[Any], await session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now()))
+    )
+    return result.rowcount
@@ -1,88 +1,318 @@
 import uuid
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
+from datetime import date
+from decimal import Decimal
+from typing import Any, cast
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Date,
+    Numeric,
+    Select,
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    true,
+    update,
+    values,
+)
+from sqlalchemy import cast as sql_cast
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import CursorResult, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dal.update_types import InvoiceCreate, InvoiceUpdate
-from app.domain.enums import InvoiceStatus
-from app.models.invoice import Invoice
+from app.dal.update_types import BillingRunInvoiceCreate, InvoiceCreate, InvoiceTotalsUpdate, InvoiceUpdate
+from app.domain.dtos import InvoiceFiltersDTO
+from app.domain.enums import AgingBucket, InvoiceSort, InvoiceStatus, PaymentKind
+from app.models.invoice import OPEN_INVOICE_PREDICATE, Invoice
+from app.models.payment import Payment
+from app.models.student import Student
+
+# Ordered like InvoiceDTO's fields so read paths can build DTOs straight from Core rows, skipping ORM hydration.
+INVOICE_ROW_COLUMNS = (
+    Invoice.id,
+    Invoice.student_id,
+    Invoice.total_amount,
+    Invoice.due_date,
+    Invoice.issued_at,
+    Invoice.status,
+    Invoice.payments_total,
+    Invoice.refunds_total,
+    Invoice.description,
+    Invoice.created_at,
+    Invoice.updated_at,
+)
+
+# Keeps the scale of summed amounts at 2 so invoices without movements report "0.00", not "0".
+_ZERO_AMOUNT = sql_cast(0, Numeric(12, 2))
 
 
 async def create_invoice(session: AsyncSession, data: InvoiceCreate) -> Invoice:
-    invoice = Invoice(
-        student_id=data["student_id"],
-        total_amount=data["total_amount"],
-        due_date=data["due_date"],
-        status=data.get("status", InvoiceStatus.PENDING),
-        description=data.get("description"),
-    )
+    row: dict[str, object] = {
+        "student_id": data["student_id"],
+        "total_amount": data["total_amount"],
+        "due_date": data["due_date"],
+        "status": data.get("status", InvoiceStatus.PENDING),
+        "description": data.get("description"),
+    }
     issued_at = data.get("issued_at")
     if issued_at is not None:
-        invoice.issued_at = issued_at
+        row["issued_at"] = issued_at
 
-    session.add(invoice)
-    await session.commit()
-    await session.refresh(invoice)
-    return invoice
+    result = await session.scalars(insert(Invoice).values(row).returning(Invoice))
+    return result.one()
+
+
+async def insert_billing_run_invoices(
+    session: AsyncSession, billing_run_id: uuid.UUID, data: Sequence[BillingRunInvoiceCreate]
+) -> int:
+    # One multi-row INSERT per batch. Rows this run already created (same run, student and fee) hit the unique
+    # constraint and are skipped, so the returned count is only the new invoices and a rerun fills in what is missing.
+    if not data:
+        return 0
+    rows = [
+        {
+            "student_id": row["student_id"],
+            "fee_code": row["fee_code"],
+            "total_amount": row["total_amount"],
+            "due_date": row["due_date"],
+            "description": row["description"],
+            "status": InvoiceStatus.PENDING,
+            "billing_run_id": billing_run_id,
+        }
+        for row in data
+    ]
+    stmt = pg_insert(Invoice).values(rows).on_conflict_do_nothing(constraint="uq_invoices_billing_run_student_fee")
+    result = cast(CursorResult[Any], await session.execute(stmt))
+    return result.rowcount
 
 
 async def get_invoice_by_id(session: AsyncSession, invoice_id: uuid.UUID) -> Invoice | None:
     return await session.get(Invoice, invoice_id)
 
 
-async def list_invoices(session: AsyncSession, *, offset: int = 0, limit: int = 100) -> list[Invoice]:
-    stmt = select(Invoice).offset(offset).limit(limit)
+async def get_invoice_by_id_for_update(session: AsyncSession, invoice_id: uuid.UUID) -> Invoice | None:
+    stmt = select(Invoice).where(Invoice.id == invoice_id).with_for_update().execution_options(populate_existing=True)
     result = await session.scalars(stmt)
-    return list(result)
+    return result.first()
 
 
-async def list_invoices_by_student_id(session: AsyncSession, student_id: uuid.UUID) -> list[Invoice]:
-    stmt = select(Invoice).where(Invoice.student_id == student_id)
+async def list_invoices_by_ids_for_update(session: AsyncSession, invoice_ids: Sequence[uuid.UUID]) -> list[Invoice]:
+    if not invoice_ids:
+        return []
+    # Rows are locked in id order so concurrent multi-invoice writers always acquire locks in the same sequence.
+    stmt = (
+        select(Invoice)
+        .where(Invoice.id.in_(invoice_ids))
+        .order_by(Invoice.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
     result = await session.scalars(stmt)
     return list(result)
 
 
-async def list_invoices_by_student_ids(session: AsyncSession, student_ids: Sequence[uuid.UUID]) -> list[Invoice]:
+def invoice_list_query(
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
+    filters: InvoiceFiltersDTO | None = None,
+    sort: InvoiceSort = InvoiceSort.ID,
+) -> Select[Any]:
+    # Each filter and sort combination has an index to match; see Invoice.__table_args__.
+    stmt = select(*INVOICE_ROW_COLUMNS)
+    if filters is not None:
+        if filters.statuses:
+            stmt = stmt.where(Invoice.status.in_(filters.statuses))
+        if filters.due_after is not None:
+            stmt = stmt.where(Invoice.due_date > filters.due_after)
+        if filters.due_before is not None:
+            stmt = stmt.where(Invoice.due_date < filters.due_before)
+        if filters.student_id is not None:
+            stmt = stmt.where(Invoice.student_id == filters.student_id)
+        if filters.school_id is not None:
+            stmt = stmt.join(Student, Student.id == Invoice.student_id).where(Student.school_id == filters.school_id)
+    if after_id is not None:
+        stmt = stmt.where(Invoice.id > after_id)
+    if sort is InvoiceSort.DUE_DATE:
+        stmt = stmt.order_by(Invoice.due_date, Invoice.id)
+    elif sort is InvoiceSort.DUE_DATE_DESC:
+        stmt = stmt.order_by(Invoice.due_date.desc(), Invoice.id.desc())
+    else:
+        stmt = stmt.order_by(Invoice.id)
+    return stmt.offset(offset).limit(limit)
+
+
+async def list_invoices(
+    session: AsyncSession,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
+    filters: InvoiceFiltersDTO | None = None,
+    sort: InvoiceSort = InvoiceSort.ID,
+) -> list[Row[Any]]:
+    stmt = invoice_list_query(offset=offset, limit=limit, after_id=after_id, filters=filters, sort=sort)
+    result = await session.execute(stmt)
+    return list(result)
+
+
+async def list_invoices_with_payment_totals(
+    session: AsyncSession,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
+) -> list[Row[Any]]:
+    # One round trip: the page of invoices plus what their payments actually add up to. The LATERAL aggregate runs
+    # once per returned invoice over the payments.invoice_id index instead of grouping the whole payments table.
+    movements = (
+        select(
+            func.coalesce(func.sum(case((Payment.kind == PaymentKind.PAYMENT, Payment.amount))), _ZERO_AMOUNT).label(
+                "actual_payments_total"
+            ),
+            func.coalesce(func.sum(case((Payment.kind == PaymentKind.REFUND, Payment.amount))), _ZERO_AMOUNT).label(
+                "actual_refunds_total"
+            ),
+        )
+        .where(Payment.invoice_id == Invoice.id)
+        .lateral("movements")
+    )
+    stmt = (
+        select(*INVOICE_ROW_COLUMNS, movements.c.actual_payments_total, movements.c.actual_refunds_total)
+        .outerjoin(movements, true())
+        .order_by(Invoice.id)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Invoice.id > after_id)
+    stmt = stmt.offset(offset).limit(limit)
+    result = await session.execute(stmt)
+    return list(result)
+
+
+def aging_query(*, as_of: date, school_id: uuid.UUID | None = None) -> Select[Any]:
+    # One grouped aggregate over open invoices: date - date is a day count in Postgres, bucketed in SQL so only
+    # (school, bucket) totals cross the wire.
+    days_past_due = literal(as_of, Date) - Invoice.due_date
+    bucket = case(
+        (days_past_due <= 0, AgingBucket.CURRENT.value),
+        (days_past_due <= 30, AgingBucket.DAYS_1_30.value),
+        (days_past_due <= 60, AgingBucket.DAYS_31_60.value),
+        (days_past_due <= 90, AgingBucket.DAYS_61_90.value),
+        else_=AgingBucket.DAYS_OVER_90.value,
+    ).label("bucket")
+    balance = (Invoice.total_amount - Invoice.payments_total + Invoice.refunds_total).label("balance")
+    open_balances = (
+        select(Student.school_id, bucket, balance)
+        .join(Student, Student.id == Invoice.student_id)
+        .where(text(OPEN_INVOICE_PREDICATE))
+    )
+    if school_id is not None:
+        open_balances = open_balances.where(Student.school_id == school_id)
+    # Grouping on the subquery's columns keeps the bound CASE expression out of GROUP BY.
+    rows = open_balances.subquery("open_balances")
+    return (
+        select(rows.c.school_id, rows.c.bucket, func.count(), func.sum(rows.c.balance))
+        .group_by(rows.c.school_id, rows.c.bucket)
+        .order_by(rows.c.school_id)
+    )
+
+
+async def sum_open_balances_by_aging_bucket(
+    session: AsyncSession, *, as_of: date, school_id: uuid.UUID | None = None
+) -> list[tuple[uuid.UUID, AgingBucket, int, Decimal]]:
+    result = await session.execute(aging_query(as_of=as_of, school_id=school_id))
+    return [
+        (row_school_id, AgingBucket(row_bucket), count, total)
+        for row_school_id, row_bucket, count, total in result.tuples()
+    ]
+
+
+async def list_invoices_by_student_id(session: AsyncSession, student_id: uuid.UUID) -> list[Row[Any]]:
+    stmt = select(*INVOICE_ROW_COLUMNS).where(Invoice.student_id == student_id)
+    result = await session.execute(stmt)
+    return list(result)
+
+
+async def list_invoices_by_student_ids(session: AsyncSession, student_ids: Sequence[uuid.UUID]) -> list[Row[Any]]:
     if not student_ids:
         return []
-    stmt = select(Invoice).where(Invoice.student_id.in_(student_ids))
-    result = await session.scalars(stmt)
+    stmt = select(*INVOICE_ROW_COLUMNS).where(Invoice.student_id.in_(student_ids))
+    result = await session.execute(stmt)
     return list(result)
 
 
+async def count_invoices_by_school_id(session: AsyncSession, school_id: uuid.UUID) -> int:
+    stmt = (
+        select(func.count())
+        .select_from(Invoice)
+        .join(Student, Student.id == Invoice.student_id)
+        .where(Student.school_id == school_id)
+    )
+    return await session.scalar(stmt) or 0
+
+
+async def stream_invoices_by_school_id(
+    session: AsyncSession, school_id: uuid.UUID, *, chunk_size: int = 1000
+) -> AsyncIterator[Row[Any]]:
+    # Server-side cursor: rows arrive chunk_size at a time, so memory stays flat however large the school is.
+    stmt = (
+        select(*INVOICE_ROW_COLUMNS)
+        .join(Student, Student.id == Invoice.student_id)
+        .where(Student.school_id == school_id)
+        .order_by(Invoice.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)
+    async for row in result:
+        yield row
+
+
 async def update_invoice(
     session: AsyncSession,
     invoice_id: uuid.UUID,
     data: InvoiceUpdate,
 ) -> Invoice | None:
-    invoice = await get_invoice_by_id(session, invoice_id)
-    if invoice is None:
-        return None
-
-    if "student_id" in data:
-        invoice.student_id = data["student_id"]
-    if "total_amount" in data:
-        invoice.total_amount = data["total_amount"]
-    if "status" in data:
-        invoice.status = data["status"]
-    if "due_date" in data:
-        invoice.due_date = data["due_date"]
-    if "description" in data:
-        invoice.description = data["description"]
-    if "issued_at" in data and data["issued_at"] is not None:
-        invoice.issued_at = data["issued_at"]
-
-    await session.commit()
-    await session.refresh(invoice)
-    return invoice
+    # issued_at is server-defaulted and never cleared; a null in the payload means "leave as is".
+    changes = {key: value for key, value in data.items() if not (key == "issued_at" and value is None)}
+    if not changes:
+        return await get_invoice_by_id(session, invoice_id)
+    stmt = (
+        update(Invoice)
+        .where(Invoice.id == invoice_id)
+        .values(changes)
+        .returning(Invoice)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.scalars(stmt)
+    return result.first()
 
 
-async def delete_invoice(session: AsyncSession, invoice_id: uuid.UUID) -> bool:
-    invoice = await get_invoice_by_id(session, invoice_id)
-    if invoice is None:
-        return False
+async def update_invoice_totals(session: AsyncSession, data: Sequence[InvoiceTotalsUpdate]) -> int:
+    if not data:
+        return 0
+    columns = Invoice.__table__.c
+    totals = values(
+        column("id", columns.id.type),
+        column("status", columns.status.type),
+        column("payments_total", columns.payments_total.type),
+        column("refunds_total", columns.refunds_total.type),
+        name="totals",
+    ).data([(row["invoice_id"], row["status"], row["payments_total"], row["refunds_total"]) for row in data])
+    stmt = (
+        update(Invoice)
+        .where(Invoice.id == totals.c.id)
+        .values(status=totals.c.status, payments_total=totals.c.payments_total, refunds_total=totals.c.refunds_total)
+    )
+    result = cast(CursorResult[Any], await session.execute(stmt))
+    return result.rowcount
 
-    await session.delete(invoice)
-    await session.commit()
-    return True
+
+async def delete_invoice(session: AsyncSession, invoice_id: uuid.UUID) -> bool:
+    result = await session.scalars(delete(Invoice).where(Invoice.id == invoice_id).returning(Invoice.id))
+    return result.first() is not None
@@ -1,88 +1,142 @@
 import uuid
 from collections.abc import Sequence
+from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Numeric, case, cast, delete, func, insert, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dal.update_types import PaymentCreate, PaymentUpdate
 from app.domain.enums import PaymentKind
 from app.models.payment import Payment
 
+# Ordered like PaymentDTO's fields so read paths can build DTOs straight from Core rows, skipping ORM hydration.
+PAYMENT_ROW_COLUMNS = (
+    Payment.id,
+    Payment.invoice_id,
+    Payment.amount,
+    Payment.kind,
+    Payment.paid_at,
+    Payment.method,
+    Payment.reference,
+    Payment.created_at,
+    Payment.updated_at,
+)
+
+# Keeps the scale of summed amounts at 2 so invoices without refunds report "0.00", not "0".
+_ZERO_AMOUNT = cast(0, Numeric(12, 2))
+
 
 async def create_payment(session: AsyncSession, data: PaymentCreate) -> Payment:
-    payment = Payment(
-        invoice_id=data["invoice_id"],
-        amount=data["amount"],
-        kind=data.get("kind", PaymentKind.PAYMENT),
-        method=data.get("method"),
-        reference=data.get("reference"),
-    )
+    row: dict[str, object] = {
+        "invoice_id": data["invoice_id"],
+        "amount": data["amount"],
+        "kind": data.get("kind", PaymentKind.PAYMENT),
+        "method": data.get("method"),
+        "reference": data.get("reference"),
+    }
     paid_at = data.get("paid_at")
     if paid_at is not None:
-        payment.paid_at = paid_at
+        row["paid_at"] = paid_at
+
+    result = await session.scalars(insert(Payment).values(row).returning(Payment))
+    return result.one()
+
 
-    session.add(payment)
-    await session.commit()
-    await session.refresh(payment)
-    return payment
+async def create_payments(session: AsyncSession, data: Sequence[PaymentCreate]) -> list[Payment]:
+    if not data:
+        return []
+    rows = [
+        {
+            "invoice_id": row["invoice_id"],
+            "amount": row["amount"],
+            "kind": row.get("kind", PaymentKind.PAYMENT),
+            "method": row.get("method"),
+            "reference": row.get("reference"),
+            "paid_at": row.get("paid_at"),
+        }
+        for row in data
+    ]
+    result = await session.scalars(insert(Payment).returning(Payment, sort_by_parameter_order=True), rows)
+    return list(result)
 
 
 async def get_payment_by_id(session: AsyncSession, payment_id: uuid.UUID) -> Payment | None:
     return await session.get(Payment, payment_id)
 
 
-async def list_payments(session: AsyncSession, *, offset: int = 0, limit: int = 100) -> list[Payment]:
-    stmt = select(Payment).offset(offset).limit(limit)
+async def get_payment_by_id_for_update(session: AsyncSession, payment_id: uuid.UUID) -> Payment | None:
+    stmt = select(Payment).where(Payment.id == payment_id).with_for_update().execution_options(populate_existing=True)
     result = await session.scalars(stmt)
+    return result.first()
+
+
+async def list_payments(
+    session: AsyncSession,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
+) -> list[Row[Any]]:
+    stmt = select(*PAYMENT_ROW_COLUMNS).order_by(Payment.id)
+    if after_id is not None:
+        stmt = stmt.where(Payment.id > after_id)
+    stmt = stmt.offset(offset).limit(limit)
+    result = await session.execute(stmt)
     return list(result)
 
 
-async def list_payments_by_invoice_id(session: AsyncSession, invoice_id: uuid.UUID) -> list[Payment]:
-    stmt = select(Payment).where(Payment.invoice_id == invoice_id)
-    result = await session.scalars(stmt)
+async def list_payments_by_invoice_id(session: AsyncSession, invoice_id: uuid.UUID) -> list[Row[Any]]:
+    stmt = select(*PAYMENT_ROW_COLUMNS).where(Payment.invoice_id == invoice_id)
+    result = await session.execute(stmt)
     return list(result)
 
 
-async def list_payments_by_invoice_ids(session: AsyncSession, invoice_ids: Sequence[uuid.UUID]) -> list[Payment]:
+async def list_payments_by_invoice_ids(session: AsyncSession, invoice_ids: Sequence[uuid.UUID]) -> list[Row[Any]]:
     if not invoice_ids:
         return []
-    stmt = select(Payment).where(Payment.invoice_id.in_(invoice_ids))
-    result = await session.scalars(stmt)
+    stmt = select(*PAYMENT_ROW_COLUMNS).where(Payment.invoice_id.in_(invoice_ids))
+    result = await session.execute(stmt)
     return list(result)
 
 
+async def sum_payments_by_invoice_ids(
+    session: AsyncSession, invoice_ids: Sequence[uuid.UUID]
+) -> list[tuple[uuid.UUID, Decimal, Decimal]]:
+    if not invoice_ids:
+        return []
+    stmt = (
+        select(
+            Payment.invoice_id,
+            func.sum(case((Payment.kind == PaymentKind.PAYMENT, Payment.amount), else_=_ZERO_AMOUNT)),
+            func.sum(case((Payment.kind == PaymentKind.REFUND, Payment.amount), else_=_ZERO_AMOUNT)),
+        )
+        .where(Payment.invoice_id.in_(invoice_ids))
+        .group_by(Payment.invoice_id)
+    )
+    result = await session.execute(stmt)
+    return [(invoice_id, payments, refunds) for invoice_id, payments, refunds in result.tuples()]
+
+
 async def update_payment(
     session: AsyncSession,
     payment_id: uuid.UUID,
     data: PaymentUpdate,
 ) -> Payment | None:
-    payment = await get_payment_by_id(session, payment_id)
-    if payment is None:
-        return None
-
-    if "invoice_id" in data:
-        payment.invoice_id = data["invoice_id"]
-    if "amount" in data:
-        payment.amount = data["amount"]
-    if "kind" in data:
-        payment.kind = data["kind"]
-    if "method" in data:
-        payment.method = data["method"]
-    if "reference" in data:
-        payment.reference = data["reference"]
-    if "paid_at" in data:
-        payment.paid_at = data["paid_at"]
-
-    await session.commit()
-    await session.refresh(payment)
-    return payment
+    if not data:
+        return await get_payment_by_id(session, payment_id)
+    stmt = (
+        update(Payment)
+        .where(Payment.id == payment_id)
+        .values(dict(data))
+        .returning(Payment)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.scalars(stmt)
+    return result.first()
 
 
 async def delete_payment(session: AsyncSession, payment_id: uuid.UUID) -> bool:
-    payment = await get_payment_by_id(session, payment_id)
-    if payment is None:
-        return False
-
-    await session.delete(payment)
-    await session.commit()
-    return True
+    result = await session.scalars(delete(Payment).where(Payment.id == payment_id).returning(Payment.id))
+    return result.first() is not None
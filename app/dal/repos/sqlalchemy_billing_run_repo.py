@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal import billing_run as billing_run_dal
+from app.domain.dtos import BillingRunDTO
+
+
+class SQLAlchemyBillingRunRepo:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, run_id: UUID) -> BillingRunDTO | None:
+        run = await billing_run_dal.get_billing_run(self._session, run_id=run_id)
+        if run is None:
+            return None
+        return BillingRunDTO(id=run.id, school_id=run.school_id, request_hash=run.request_hash)
+
+    async def create(self, run: BillingRunDTO) -> bool:
+        return await billing_run_dal.create_billing_run(
+            self._session, data={"id": run.id, "school_id": run.school_id, "request_hash": run.request_hash}
+        )
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import cast
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal import idempotency as idempotency_dal
+from app.domain.dtos import IdempotencyRecordDTO
+
+
+class SQLAlchemyIdempotencyRepo:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, scope: str, key: str) -> IdempotencyRecordDTO | None:
+        record = await idempotency_dal.get_idempotency_key(self._session, scope=scope, key=key)
+        if record is None:
+            return None
+        return IdempotencyRecordDTO(
+            scope=record.scope,
+            key=record.key,
+            request_hash=record.request_hash,
+            response_status=record.response_status,
+            response_body=record.response_body,
+            expires_at=record.expires_at,
+            created_at=cast(datetime | None, getattr(record, "created_at", None)),
+        )
+
+    async def create(self, record: IdempotencyRecordDTO) -> bool:
+        return await idempotency_dal.create_idempotency_key(
+            self._session,
+            data={
+                "scope": record.scope,
+                "key": record.key,
+                "request_hash": record.request_hash,
+                "response_status": record.response_status,
+                "response_body": record.response_body,
+                "expires_at": record.expires_at,
+            },
+        )
+
+    async def purge_expired(self) -> int:
+        return await idempotency_dal.delete_expired_idempotency_keys(self._session)
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+from collections.abc import AsyncIterator, Mapping, Sequence
 from datetime import date, datetime
 from decimal import Decimal
-from typing import cast
+from typing import Any, cast
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dal import invoice as invoice_dal
-from app.dal.update_types import InvoiceCreate, InvoiceUpdate
-from app.domain.dtos import InvoiceDTO
-from app.domain.enums import InvoiceStatus
+from app.dal.update_types import BillingRunInvoiceCreate, InvoiceCreate, InvoiceTotalsUpdate, InvoiceUpdate
+from app.domain.dtos import (
+    AgingBucketTotalsDTO,
+    InvoiceDTO,
+    InvoiceFiltersDTO,
+    InvoicePaymentTotalsDTO,
+    InvoiceTotalsUpdateDTO,
+)
+from app.domain.enums import InvoiceSort, InvoiceStatus
 from app.models.invoice import Invoice
 
 
@@ -35,22 +41,82 @@ class SQLAlchemyInvoiceRepo:
         invoice = await invoice_dal.create_invoice(self._session, data=payload)
         return _to_invoice_dto(invoice)
 
-    async def list_all(self, *, offset: int, limit: int) -> list[InvoiceDTO]:
-        invoices = await invoice_dal.list_invoices(self._session, offset=offset, limit=limit)
-        return [_to_invoice_dto(invoice) for invoice in invoices]
+    async def create_for_billing_run(self, billing_run_id: UUID, rows: Sequence[Mapping[str, object]]) -> int:
+        payload: list[BillingRunInvoiceCreate] = [
+            {
+                "student_id": cast(UUID, row["student_id"]),
+                "fee_code": cast(str, row["fee_code"]),
+                "total_amount": cast(Decimal, row["total_amount"]),
+                "due_date": cast(date, row["due_date"]),
+                "description": cast(str | None, row.get("description")),
+            }
+            for row in rows
+        ]
+        return await invoice_dal.insert_billing_run_invoices(self._session, billing_run_id, payload)
+
+    async def list_all(
+        self,
+        *,
+        offset: int,
+        limit: int,
+        after_id: UUID | None = None,
+        filters: InvoiceFiltersDTO | None = None,
+        sort: InvoiceSort = InvoiceSort.ID,
+    ) -> list[InvoiceDTO]:
+        rows = await invoice_dal.list_invoices(
+            self._session, offset=offset, limit=limit, after_id=after_id, filters=filters, sort=sort
+        )
+        return [_invoice_dto_from_row(row) for row in rows]
+
+    async def list_with_payment_totals(
+        self, *, offset: int, limit: int, after_id: UUID | None = None
+    ) -> list[tuple[InvoiceDTO, InvoicePaymentTotalsDTO]]:
+        rows = await invoice_dal.list_invoices_with_payment_totals(
+            self._session, offset=offset, limit=limit, after_id=after_id
+        )
+        width = len(invoice_dal.INVOICE_ROW_COLUMNS)
+        return [
+            (
+                _invoice_dto_from_row(row[:width]),
+                InvoicePaymentTotalsDTO(invoice_id=row[0], payments_total=row[width], refunds_total=row[width + 1]),
+            )
+            for row in rows
+        ]
+
+    async def aging_by_school(self, *, as_of: date, school_id: UUID | None = None) -> list[AgingBucketTotalsDTO]:
+        rows = await invoice_dal.sum_open_balances_by_aging_bucket(self._session, as_of=as_of, school_id=school_id)
+        return [
+            AgingBucketTotalsDTO(school_id=row_school_id, bucket=bucket, invoices_count=count, balance_due=balance)
+            for row_school_id, bucket, count, balance in rows
+        ]
 
     async def list_by_student_id(self, student_id: UUID) -> list[InvoiceDTO]:
-        invoices = await invoice_dal.list_invoices_by_student_id(self._session, student_id=student_id)
-        return [_to_invoice_dto(invoice) for invoice in invoices]
+        rows = await invoice_dal.list_invoices_by_student_id(self._session, student_id=student_id)
+        return [_invoice_dto_from_row(row) for row in rows]
 
     async def list_by_student_ids(self, student_ids: Sequence[UUID]) -> list[InvoiceDTO]:
-        invoices = await invoice_dal.list_invoices_by_student_ids(self._session, student_ids=student_ids)
-        return [_to_invoice_dto(invoice) for invoice in invoices]
+        rows = await invoice_dal.list_invoices_by_student_ids(self._session, student_ids=student_ids)
+        return [_invoice_dto_from_row(row) for row in rows]
+
+    async def stream_by_school_id(self, school_id: UUID) -> AsyncIterator[InvoiceDTO]:
+        async for row in invoice_dal.stream_invoices_by_school_id(self._session, school_id=school_id):
+            yield _invoice_dto_from_row(row)
+
+    async def count_by_school_id(self, school_id: UUID) -> int:
+        return await invoice_dal.count_invoices_by_school_id(self._session, school_id=school_id)
 
     async def get_by_id(self, invoice_id: UUID) -> InvoiceDTO | None:
         invoice = await invoice_dal.get_invoice_by_id(self._session, invoice_id=invoice_id)
         return None if invoice is None else _to_invoice_dto(invoice)
 
+    async def get_by_id_for_update(self, invoice_id: UUID) -> InvoiceDTO | None:
+        invoice = await invoice_dal.get_invoice_by_id_for_update(self._session, invoice_id=invoice_id)
+        return None if invoice is None else _to_invoice_dto(invoice)
+
+    async def list_by_ids_for_update(self, invoice_ids: Sequence[UUID]) -> list[InvoiceDTO]:
+        invoices = await invoice_dal.list_invoices_by_ids_for_update(self._session, invoice_ids=invoice_ids)
+        return [_to_invoice_dto(invoice) for invoice in invoices]
+
     async def update(self, invoice_id: UUID, data: Mapping[str, object]) -> InvoiceDTO | None:
         payload: InvoiceUpdate = {}
         if "student_id" in data:
@@ -61,6 +127,10 @@ class SQLAlchemyInvoiceRepo:
             payload["due_date"] = cast(date, data["due_date"])
         if "status" in data:
             payload["status"] = cast(InvoiceStatus, data["status"])
+        if "payments_total" in data:
+            payload["payments_total"] = cast(Decimal, data["payments_total"])
+        if "refunds_total" in data:
+            payload["refunds_total"] = cast(Decimal, data["refunds_total"])
         if "description" in data:
             payload["description"] = cast(str | None, data["description"])
         if "issued_at" in data:
@@ -69,6 +139,18 @@ class SQLAlchemyInvoiceRepo:
         invoice = await invoice_dal.update_invoice(self._session, invoice_id=invoice_id, data=payload)
         return None if invoice is None else _to_invoice_dto(invoice)
 
+    async def update_totals_many(self, updates: Sequence[InvoiceTotalsUpdateDTO]) -> int:
+        payload: list[InvoiceTotalsUpdate] = [
+            {
+                "invoice_id": item.invoice_id,
+                "status": item.status,
+                "payments_total": item.payments_total,
+                "refunds_total": item.refunds_total,
+            }
+            for item in updates
+        ]
+        return await invoice_dal.update_invoice_totals(self._session, data=payload)
+
     async def delete(self, invoice_id: UUID) -> bool:
         return await invoice_dal.delete_invoice(self._session, invoice_id=invoice_id)
 
@@ -81,7 +163,14 @@ def _to_invoice_dto(invoice: Invoice) -> InvoiceDTO:
         due_date=invoice.due_date,
         issued_at=invoice.issued_at,
         status=invoice.status,
+        payments_total=invoice.payments_total,
+        refunds_total=invoice.refunds_total,
         description=invoice.description,
         created_at=cast(datetime | None, getattr(invoice, "created_at", None)),
         updated_at=cast(datetime | None, getattr(invoice, "updated_at", None)),
     )
+
+
+def _invoice_dto_from_row(row: Sequence[Any]) -> InvoiceDTO:
+    # Rows come from invoice_dal.INVOICE_ROW_COLUMNS, which follows the DTO field order.
+    return InvoiceDTO(*row)
@@ -3,9 +3,10 @@ from __future__ import annotations
 from collections.abc import Mapping, Sequence
 from datetime import datetime
 from decimal import Decimal
-from typing import cast
+from typing import Any, cast
 from uuid import UUID
 
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dal import payment as payment_dal
@@ -20,37 +21,33 @@ class SQLAlchemyPaymentRepo:
         self._session = session
 
     async def create(self, data: Mapping[str, object]) -> PaymentDTO:
-        payload: PaymentCreate = {
-            "invoice_id": cast(UUID, data["invoice_id"]),
-            "amount": cast(Decimal, data["amount"]),
-            "kind": cast(PaymentKind, data.get("kind", PaymentKind.PAYMENT)),
-        }
-        if "method" in data:
-            payload["method"] = cast(str | None, data["method"])
-        if "reference" in data:
-            payload["reference"] = cast(str | None, data["reference"])
-        if "paid_at" in data:
-            payload["paid_at"] = cast(datetime | None, data["paid_at"])
-
-        payment = await payment_dal.create_payment(self._session, data=payload)
+        payment = await payment_dal.create_payment(self._session, data=_to_payment_create(data))
         return _to_payment_dto(payment)
 
-    async def list_all(self, *, offset: int, limit: int) -> list[PaymentDTO]:
-        payments = await payment_dal.list_payments(self._session, offset=offset, limit=limit)
+    async def create_many(self, rows: Sequence[Mapping[str, object]]) -> list[PaymentDTO]:
+        payments = await payment_dal.create_payments(self._session, data=[_to_payment_create(row) for row in rows])
         return [_to_payment_dto(payment) for payment in payments]
 
+    async def list_all(self, *, offset: int, limit: int, after_id: UUID | None = None) -> list[PaymentDTO]:
+        rows = await payment_dal.list_payments(self._session, offset=offset, limit=limit, after_id=after_id)
+        return [_payment_dto_from_row(row) for row in rows]
+
     async def list_by_invoice_id(self, invoice_id: UUID) -> list[PaymentDTO]:
-        payments = await payment_dal.list_payments_by_invoice_id(self._session, invoice_id=invoice_id)
-        return [_to_payment_dto(payment) for payment in payments]
+        rows = await payment_dal.list_payments_by_invoice_id(self._session, invoice_id=invoice_id)
+        return [_payment_dto_from_row(row) for row in rows]
 
     async def list_by_invoice_ids(self, invoice_ids: Sequence[UUID]) -> list[PaymentDTO]:
-        payments = await payment_dal.list_payments_by_invoice_ids(self._session, invoice_ids=invoice_ids)
-        return [_to_payment_dto(payment) for payment in payments]
+        rows = await payment_dal.list_payments_by_invoice_ids(self._session, invoice_ids=invoice_ids)
+        return [_payment_dto_from_row(row) for row in rows]
 
     async def get_by_id(self, payment_id: UUID) -> PaymentDTO | None:
         payment = await payment_dal.get_payment_by_id(self._session, payment_id=payment_id)
         return None if payment is None else _to_payment_dto(payment)
 
+    async def get_by_id_for_update(self, payment_id: UUID) -> PaymentDTO | None:
+        payment = await payment_dal.get_payment_by_id_for_update(self._session, payment_id=payment_id)
+        return None if payment is None else _to_payment_dto(payment)
+
     async def update(self, payment_id: UUID, data: Mapping[str, object]) -> PaymentDTO | None:
         payload: PaymentUpdate = {}
         if "invoice_id" in data:
@@ -73,6 +70,21 @@ class SQLAlchemyPaymentRepo:
         return await payment_dal.delete_payment(self._session, payment_id=payment_id)
 
 
+def _to_payment_create(data: Mapping[str, object]) -> PaymentCreate:
+    payload: PaymentCreate = {
+        "invoice_id": cast(UUID, data["invoice_id"]),
+        "amount": cast(Decimal, data["amount"]),
+        "kind": cast(PaymentKind, data.get("kind", PaymentKind.PAYMENT)),
+    }
+    if "method" in data:
+        payload["method"] = cast(str | None, data["method"])
+    if "reference" in data:
+        payload["reference"] = cast(str | None, data["reference"])
+    if "paid_at" in data:
+        payload["paid_at"] = cast(datetime | None, data["paid_at"])
+    return payload
+
+
 def _to_payment_dto(payment: Payment) -> PaymentDTO:
     return PaymentDTO(
         id=payment.id,
@@ -85,3 +97,8 @@ def _to_payment_dto(payment: Payment) -> PaymentDTO:
         created_at=cast(datetime | None, getattr(payment, "created_at", None)),
         updated_at=cast(datetime | None, getattr(payment, "updated_at", None)),
     )
+
+
+def _payment_dto_from_row(row: Row[Any]) -> PaymentDTO:
+    # Rows come from payment_dal.PAYMENT_ROW_COLUMNS, which follows the DTO field order.
+    return PaymentDTO(*row)
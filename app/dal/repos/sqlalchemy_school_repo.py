@@ -22,8 +22,8 @@ class SQLAlchemySchoolRepo:
         school = await school_dal.create_school(self._session, data=payload)
         return _to_school_dto(school)
 
-    async def list_all(self, *, offset: int, limit: int) -> list[SchoolDTO]:
-        schools = await school_dal.list_schools(self._session, offset=offset, limit=limit)
+    async def list_all(self, *, offset: int, limit: int, after_id: UUID | None = None) -> list[SchoolDTO]:
+        schools = await school_dal.list_schools(self._session, offset=offset, limit=limit, after_id=after_id)
         return [_to_school_dto(school) for school in schools]
 
     async def get_by_id(self, school_id: UUID) -> SchoolDTO | None:
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import AsyncIterator, Mapping, Sequence
 from datetime import datetime
 from typing import cast
 from uuid import UUID
@@ -28,8 +28,8 @@ class SQLAlchemyStudentRepo:
         )
         return _to_student_dto(student)
 
-    async def list_all(self, *, offset: int, limit: int) -> list[StudentDTO]:
-        students = await student_dal.list_students(self._session, offset=offset, limit=limit)
+    async def list_all(self, *, offset: int, limit: int, after_id: UUID | None = None) -> list[StudentDTO]:
+        students = await student_dal.list_students(self._session, offset=offset, limit=limit, after_id=after_id)
         return [_to_student_dto(student) for student in students]
 
     async def list_by_school_id(self, school_id: UUID, *, offset: int = 0, limit: int = 100) -> list[StudentDTO]:
@@ -38,6 +38,25 @@ class SQLAlchemyStudentRepo:
         )
         return [_to_student_dto(student) for student in students]
 
+    async def iter_by_school_id(self, school_id: UUID, *, chunk_size: int = 500) -> AsyncIterator[list[StudentDTO]]:
+        # Keyset pagination by id, so each chunk is an index seek rather than an ever-growing OFFSET scan.
+        after_id: UUID | None = None
+        while True:
+            students = await student_dal.list_students_by_school_id(
+                self._session, school_id=school_id, limit=chunk_size, after_id=after_id
+            )
+            if students:
+                yield [_to_student_dto(student) for student in students]
+            if len(students) < chunk_size:
+                return
+            after_id = students[-1].id
+
+    async def list_school_ids_by_student_ids(self, student_ids: Sequence[UUID]) -> list[UUID]:
+        return await student_dal.list_school_ids_by_student_ids(self._session, student_ids=student_ids)
+
+    async def count_by_school_id(self, school_id: UUID) -> int:
+        return await student_dal.count_students_by_school_id(self._session, school_id=school_id)
+
     async def get_by_id(self, student_id: UUID) -> StudentDTO | None:
         student = await student_dal.get_student_by_id(self._session, student_id=student_id)
         return None if student is None else _to_student_dto(student)
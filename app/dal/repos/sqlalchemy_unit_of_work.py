@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal.repos.sqlalchemy_billing_run_repo import SQLAlchemyBillingRunRepo
+from app.dal.repos.sqlalchemy_idempotency_repo import SQLAlchemyIdempotencyRepo
+from app.dal.repos.sqlalchemy_invoice_repo import SQLAlchemyInvoiceRepo
+from app.dal.repos.sqlalchemy_payment_repo import SQLAlchemyPaymentRepo
+from app.dal.repos.sqlalchemy_school_repo import SQLAlchemySchoolRepo
+from app.dal.repos.sqlalchemy_student_repo import SQLAlchemyStudentRepo
+
+
+class SQLAlchemyUnitOfWork:
+    # Repos only flush; the unit of work owns the single commit for each service operation.
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+        self.schools = SQLAlchemySchoolRepo(session)
+        self.students = SQLAlchemyStudentRepo(session)
+        self.invoices = SQLAlchemyInvoiceRepo(session)
+        self.payments = SQLAlchemyPaymentRepo(session)
+        self.idempotency = SQLAlchemyIdempotencyRepo(session)
+        self.billing_runs = SQLAlchemyBillingRunRepo(session)
+
+    async def commit(self) -> None:
+        await self._session.commit()
+
+    async def rollback(self) -> None:
+        await self._session.rollback()
+
+
+def unit_of_work_factory(
+    session_local: Callable[[], AsyncSession],
+) -> Callable[[], AbstractAsyncContextManager[SQLAlchemyUnitOfWork]]:
+    """Return a callable that opens a unit of work on a new session, closing the session on exit."""
+
+    @asynccontextmanager
+    async def open_unit_of_work() -> AsyncIterator[SQLAlchemyUnitOfWork]:
+        async with session_local() as session:
+            yield SQLAlchemyUnitOfWork(session)
+
+    return open_unit_of_work
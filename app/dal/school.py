@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dal.update_types import SchoolCreate, SchoolUpdate
@@ -8,41 +8,43 @@ from app.models.school import School
 
 
 async def create_school(session: AsyncSession, data: SchoolCreate) -> School:
-    school = School(name=data["name"])
-    session.add(school)
-    await session.commit()
-    await session.refresh(school)
-    return school
+    result = await session.scalars(insert(School).values(name=data["name"]).returning(School))
+    return result.one()
 
 
 async def get_school_by_id(session: AsyncSession, school_id: uuid.UUID) -> School | None:
     return await session.get(School, school_id)
 
 
-async def list_schools(session: AsyncSession, *, offset: int = 0, limit: int = 100) -> list[School]:
-    stmt = select(School).offset(offset).limit(limit)
+async def list_schools(
+    session: AsyncSession,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
+) -> list[School]:
+    stmt = select(School).order_by(School.id)
+    if after_id is not None:
+        stmt = stmt.where(School.id > after_id)
+    stmt = stmt.offset(offset).limit(limit)
     result = await session.scalars(stmt)
     return list(result)
 
 
 async def update_school(session: AsyncSession, school_id: uuid.UUID, data: SchoolUpdate) -> School | None:
-    school = await get_school_by_id(session, school_id)
-    if school is None:
-        return None
-
-    if "name" in data:
-        school.name = data["name"]
-
-    await session.commit()
-    await session.refresh(school)
-    return school
+    if not data:
+        return await get_school_by_id(session, school_id)
+    stmt = (
+        update(School)
+        .where(School.id == school_id)
+        .values(dict(data))
+        .returning(School)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.scalars(stmt)
+    return result.first()
 
 
 async def delete_school(session: AsyncSession, school_id: uuid.UUID) -> bool:
-    school = await get_school_by_id(session, school_id)
-    if school is None:
-        return False
-
-    await session.delete(school)
-    await session.commit()
-    return True
+    result = await session.scalars(delete(School).where(School.id == school_id).returning(School.id))
+    return result.first() is not None
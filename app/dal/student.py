@@ -1,6 +1,7 @@
 import uuid
+from collections.abc import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import delete, distinct, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dal.update_types import StudentCreate, StudentUpdate
@@ -8,55 +9,75 @@ from app.models.student import Student
 
 
 async def create_student(session: AsyncSession, data: StudentCreate) -> Student:
-    student = Student(school_id=data["school_id"], full_name=data["full_name"])
-    session.add(student)
-    await session.commit()
-    await session.refresh(student)
-    return student
+    stmt = insert(Student).values(school_id=data["school_id"], full_name=data["full_name"]).returning(Student)
+    result = await session.scalars(stmt)
+    return result.one()
 
 
 async def get_student_by_id(session: AsyncSession, student_id: uuid.UUID) -> Student | None:
     return await session.get(Student, student_id)
 
 
-async def list_students(session: AsyncSession, *, offset: int = 0, limit: int = 100) -> list[Student]:
-    stmt = select(Student).offset(offset).limit(limit)
+async def list_students(
+    session: AsyncSession,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
+) -> list[Student]:
+    stmt = select(Student).order_by(Student.id)
+    if after_id is not None:
+        stmt = stmt.where(Student.id > after_id)
+    stmt = stmt.offset(offset).limit(limit)
     result = await session.scalars(stmt)
     return list(result)
 
 
 async def list_students_by_school_id(
-    session: AsyncSession, school_id: uuid.UUID, offset: int = 0, limit: int = 100
+    session: AsyncSession,
+    school_id: uuid.UUID,
+    offset: int = 0,
+    limit: int = 100,
+    after_id: uuid.UUID | None = None,
 ) -> list[Student]:
-    stmt = select(Student).where(Student.school_id == school_id).offset(offset).limit(limit)
+    stmt = select(Student).where(Student.school_id == school_id).order_by(Student.id)
+    if after_id is not None:
+        stmt = stmt.where(Student.id > after_id)
+    stmt = stmt.offset(offset).limit(limit)
     result = await session.scalars(stmt)
     return list(result)
 
 
+async def list_school_ids_by_student_ids(session: AsyncSession, student_ids: Sequence[uuid.UUID]) -> list[uuid.UUID]:
+    if not student_ids:
+        return []
+    result = await session.scalars(select(distinct(Student.school_id)).where(Student.id.in_(student_ids)))
+    return list(result)
+
+
+async def count_students_by_school_id(session: AsyncSession, school_id: uuid.UUID) -> int:
+    count = await session.scalar(select(func.count()).select_from(Student).where(Student.school_id == school_id))
+    return count or 0
+
+
 async def update_student(
     session: AsyncSession,
     student_id: uuid.UUID,
     data: StudentUpdate,
 ) -> Student | None:
-    student = await get_student_by_id(session, student_id)
-    if student is None:
-        return None
-
-    if "school_id" in data:
-        student.school_id = data["school_id"]
-    if "full_name" in data:
-        student.full_name = data["full_name"]
-
-    await session.commit()
-    await session.refresh(student)
-    return student
+    if not data:
+        return await get_student_by_id(session, student_id)
+    stmt = (
+        update(Student)
+        .where(Student.id == student_id)
+        .values(dict(data))
+        .returning(Student)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.scalars(stmt)
+    return result.first()
 
 
 async def delete_student(session: AsyncSession, student_id: uuid.UUID) -> bool:
-    student = await get_student_by_id(session, student_id)
-    if student is None:
-        return False
-
-    await session.delete(student)
-    await session.commit()
-    return True
+    result = await session.scalars(delete(Student).where(Student.id == student_id).returning(Student.id))
+    return result.first() is not None
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
-from typing import NotRequired, TypedDict
+from typing import Any, NotRequired, TypedDict
 
 from app.domain.enums import InvoiceStatus, PaymentKind
 
@@ -35,15 +35,32 @@ class InvoiceCreate(TypedDict):
     issued_at: NotRequired[datetime | None]
 
 
+class BillingRunInvoiceCreate(TypedDict):
+    student_id: uuid.UUID
+    fee_code: str
+    total_amount: Decimal
+    due_date: date
+    description: str | None
+
+
 class InvoiceUpdate(TypedDict, total=False):
     student_id: uuid.UUID
     total_amount: Decimal
     status: InvoiceStatus
+    payments_total: Decimal
+    refunds_total: Decimal
     due_date: date
     description: str | None
     issued_at: datetime | None
 
 
+class InvoiceTotalsUpdate(TypedDict):
+    invoice_id: uuid.UUID
+    status: InvoiceStatus
+    payments_total: Decimal
+    refunds_total: Decimal
+
+
 class PaymentCreate(TypedDict):
     invoice_id: uuid.UUID
     amount: Decimal
@@ -60,3 +77,18 @@ class PaymentUpdate(TypedDict, total=False):
     method: str | None
     reference: str | None
     paid_at: datetime | None
+
+
+class BillingRunCreate(TypedDict):
+    id: uuid.UUID
+    school_id: uuid.UUID
+    request_hash: str
+
+
+class IdempotencyKeyCreate(TypedDict):
+    scope: str
+    key: str
+    request_hash: str
+    response_status: int
+    response_body: dict[str, Any]
+    expires_at: datetime
@@ -3,9 +3,17 @@ from __future__ import annotations
 import argparse
 import asyncio
 import subprocess
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
 
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
 from app.db.seed import seed_db
 from app.db.session import SessionLocal
+from app.domain.dtos import BillingRunResultDTO, FeeDTO
+from app.services.billing_runs import DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE, run_term_billing
+from app.services.idempotency import purge_expired_idempotency_keys
+from app.services.invoice_totals import check_invoice_totals
 
 
 def db_upgrade() -> None:
@@ -35,3 +43,120 @@ async def _db_seed_async() -> None:
         except Exception:
             await session.rollback()
             raise
+
+
+def db_check_totals() -> None:
+    parser = argparse.ArgumentParser(description="Recompute invoice movement totals and report drift.")
+    parser.add_argument("--fix", action="store_true", help="rewrite drifted invoices with the recomputed totals")
+    args = parser.parse_args()
+
+    drift_count = asyncio.run(_db_check_totals_async(fix=args.fix))
+    if drift_count and not args.fix:
+        raise SystemExit(1)
+
+
+async def _db_check_totals_async(*, fix: bool) -> int:
+    async with SessionLocal() as session:
+        drift = await check_invoice_totals(SQLAlchemyUnitOfWork(session), fix=fix)
+
+    for item in drift:
+        print(
+            f"invoice {item.invoice_id}: "
+            f"stored payments={item.stored.payments_total} refunds={item.stored.refunds_total}, "
+            f"actual payments={item.actual.payments_total} refunds={item.actual.refunds_total}"
+        )
+    action = "fixed" if fix else "found"
+    print(f"{len(drift)} invoice(s) with drifted totals {action}")
+    return len(drift)
+
+
+def db_purge_idempotency_keys() -> None:
+    argparse.ArgumentParser(description="Delete payment idempotency keys past their expiry.").parse_args()
+    asyncio.run(_db_purge_idempotency_keys_async())
+
+
+async def _db_purge_idempotency_keys_async() -> None:
+    async with SessionLocal() as session:
+        purged = await purge_expired_idempotency_keys(SQLAlchemyUnitOfWork(session))
+    print(f"{purged} expired idempotency key(s) deleted")
+
+
+def db_bill_term() -> None:
+    parser = argparse.ArgumentParser(description="Invoice every student of a school once per fee, in one transaction.")
+    parser.add_argument("--school-id", type=UUID, required=True)
+    parser.add_argument("--due-date", type=date.fromisoformat, required=True)
+    parser.add_argument(
+        "--run-id", type=UUID, required=True, help="rerunning with the same id only creates invoices still missing"
+    )
+    parser.add_argument(
+        "--fee",
+        dest="fees",
+        type=_parse_fee,
+        action="append",
+        required=True,
+        metavar="CODE=AMOUNT[:DESCRIPTION]",
+        help="repeat once per fee, e.g. --fee tuition=1200.00 --fee 'books=80.00:Books and materials'",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=_parse_batch_size,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"invoices per INSERT, 1-{MAX_BATCH_SIZE}",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        _db_bill_term_async(
+            run_id=args.run_id,
+            school_id=args.school_id,
+            fees=args.fees,
+            due_date=args.due_date,
+            batch_size=args.batch_size,
+        )
+    )
+
+
+def _parse_fee(value: str) -> FeeDTO:
+    code, _, rest = value.partition("=")
+    amount, _, description = rest.partition(":")
+    try:
+        return FeeDTO(code=code.strip(), amount=Decimal(amount), description=description or None)
+    except InvalidOperation as exc:
+        raise argparse.ArgumentTypeError(f"invalid fee {value!r}, expected CODE=AMOUNT[:DESCRIPTION]") from exc
+
+
+def _parse_batch_size(value: str) -> int:
+    try:
+        batch_size = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid batch size {value!r}") from exc
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise argparse.ArgumentTypeError(f"batch size must be between 1 and {MAX_BATCH_SIZE}")
+    return batch_size
+
+
+async def _db_bill_term_async(
+    *, run_id: UUID, school_id: UUID, fees: list[FeeDTO], due_date: date, batch_size: int
+) -> None:
+    async with SessionLocal() as session:
+        try:
+            result = await run_term_billing(
+                SQLAlchemyUnitOfWork(session),
+                run_id=run_id,
+                school_id=school_id,
+                fees=fees,
+                due_date=due_date,
+                batch_size=batch_size,
+                on_progress=_print_billing_progress,
+            )
+        except Exception:
+            await session.rollback()
+            raise
+    print(f"billing run {result.run_id} committed")
+
+
+def _print_billing_progress(progress: BillingRunResultDTO) -> None:
+    print(
+        f"{progress.students} student(s): "
+        f"{progress.invoices_created} invoice(s) created, {progress.invoices_skipped} already billed"
+    )
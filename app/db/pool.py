@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+from app.core.observability import (
+    DB_POOL_CHECKED_IN,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS_TOTAL,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+)
+
+DEFAULT_POOL_NAME = "primary"
+
+
+def pool_name(pool: QueuePool) -> str:
+    # Engines pass `pool_logging_name`, which doubles as the `pool` metric label.
+    return pool.logging_name or DEFAULT_POOL_NAME
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited and how many checkouts timed out."""
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        name = pool_name(self)
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS_TOTAL.labels(pool=name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.labels(pool=name).observe(time.perf_counter() - started)
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def register_pool_gauges(pool: QueuePool) -> None:
+    # Gauges read the live pool at scrape time instead of being updated on every checkout/checkin.
+    name = pool_name(pool)
+    DB_POOL_SIZE.labels(pool=name).set_function(pool.size)
+    DB_POOL_CHECKED_OUT.labels(pool=name).set_function(pool.checkedout)
+    DB_POOL_CHECKED_IN.labels(pool=name).set_function(pool.checkedin)
+    DB_POOL_OVERFLOW.labels(pool=name).set_function(lambda: max(pool.overflow(), 0))
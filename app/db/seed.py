@@ -157,4 +157,8 @@ async def seed_db(session: AsyncSession) -> None:
     )
 
     paid_invoice.status = InvoiceStatus.PAID
+    paid_invoice.payments_total = Decimal("1000.00")
+    paid_invoice.refunds_total = Decimal("0.00")
     partial_invoice.status = InvoiceStatus.PARTIAL
+    partial_invoice.payments_total = Decimal("300.00")
+    partial_invoice.refunds_total = Decimal("50.00")
@@ -1,20 +1,142 @@
-from collections.abc import AsyncIterator
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
 
+from sqlalchemy import Connection, Engine, ExceptionContext, event, make_url
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.core.settings import settings
+from app.core.observability import current_query_stats
+from app.core.settings import Settings, settings
+from app.db.pool import DEFAULT_POOL_NAME, InstrumentedAsyncAdaptedQueuePool, register_pool_gauges
+
+_QUERY_STARTED_AT = "query_started_at"
+
+REPLICA_POOL_NAME = "replica"
 
 _engine: AsyncEngine | None = None
 _session_maker: async_sessionmaker[AsyncSession] | None = None
+_read_engine: AsyncEngine | None = None
+_read_session_maker: async_sessionmaker[AsyncSession] | None = None
+
+
+@dataclass(slots=True)
+class PrimaryCommits:
+    count: int = 0
+
+
+_primary_commits: ContextVar[PrimaryCommits | None] = ContextVar("primary_commits", default=None)
+
+
+@contextmanager
+def track_primary_commits() -> Iterator[PrimaryCommits]:
+    """Count the transactions committed on the primary while the block runs, e.g. to tell writes from reads."""
+    commits = PrimaryCommits()
+    token = _primary_commits.set(commits)
+    try:
+        yield commits
+    finally:
+        _primary_commits.reset(token)
 
 
 def get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
-        _engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+        _engine = _create_engine(settings.database_url, pool_name=DEFAULT_POOL_NAME)
+        event.listen(_engine.sync_engine, "commit", _count_primary_commit)
     return _engine
 
 
+def get_read_engine() -> AsyncEngine:
+    """Engine for read-only work: the replica when `READ_REPLICA_URL` is set, otherwise the primary."""
+    global _read_engine
+    if settings.read_replica_url is None:
+        return get_engine()
+    if _read_engine is None:
+        _read_engine = _create_engine(settings.read_replica_url, pool_name=REPLICA_POOL_NAME)
+    return _read_engine
+
+
+def _create_engine(url: str, *, pool_name: str) -> AsyncEngine:
+    engine = create_async_engine(url, **engine_options(settings, url=url, pool_name=pool_name))
+    instrument_engine(engine.sync_engine)
+    if isinstance(engine.sync_engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        register_pool_gauges(engine.sync_engine.pool)
+    return engine
+
+
+def engine_options(config: Settings, *, url: str | None = None, pool_name: str = DEFAULT_POOL_NAME) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool,
+        "pool_logging_name": pool_name,
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout_seconds,
+        "pool_recycle": config.db_pool_recycle_seconds,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    if make_url(url or config.database_url).get_driver_name() == "asyncpg":
+        # SQLAlchemy keeps its own prepared statement cache on top of asyncpg's; size both together.
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.db_statement_cache_size,
+            "statement_cache_size": config.db_statement_cache_size,
+        }
+    return options
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute every statement's count and duration to the current request's `QueryStats`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    conn.info.setdefault(_QUERY_STARTED_AT, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    started_at = conn.info[_QUERY_STARTED_AT].pop()
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(time.perf_counter() - started_at)
+
+
+def _count_primary_commit(conn: Connection) -> None:
+    commits = _primary_commits.get()
+    if commits is not None:
+        commits.count += 1
+
+
+def _handle_error(exception_context: ExceptionContext) -> None:
+    # Failed statements never reach after_cursor_execute; drop their start time and still count them.
+    conn = exception_context.connection
+    started = conn.info.get(_QUERY_STARTED_AT) if conn is not None else None
+    if not started:
+        return
+    started_at = started.pop()
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(time.perf_counter() - started_at)
+
+
 def get_session_maker() -> async_sessionmaker[AsyncSession]:
     global _session_maker
     if _session_maker is None:
@@ -22,10 +144,26 @@ def get_session_maker() -> async_sessionmaker[AsyncSession]:
     return _session_maker
 
 
+def get_read_session_maker() -> async_sessionmaker[AsyncSession]:
+    global _read_session_maker
+    if _read_session_maker is None:
+        _read_session_maker = async_sessionmaker(bind=get_read_engine(), autoflush=False, expire_on_commit=False)
+    return _read_session_maker
+
+
 def SessionLocal() -> AsyncSession:
     return get_session_maker()()
 
 
+def ReadSessionLocal() -> AsyncSession:
+    return get_read_session_maker()()
+
+
 async def get_db() -> AsyncIterator[AsyncSession]:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncIterator[AsyncSession]:
+    async with ReadSessionLocal() as session:
+        yield session
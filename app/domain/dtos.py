@@ -3,9 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
 
-from app.domain.enums import InvoiceStatus, PaymentKind
+from app.domain.enums import AgingBucket, InvoiceStatus, PaymentKind
 
 
 @dataclass(frozen=True, slots=True)
@@ -33,11 +34,23 @@ class InvoiceDTO:
     due_date: date
     issued_at: datetime
     status: InvoiceStatus
+    payments_total: Decimal = Decimal("0.00")
+    refunds_total: Decimal = Decimal("0.00")
     description: str | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class InvoiceFiltersDTO:
+    # Due date bounds are exclusive, so `due_before=today` lists exactly the overdue invoices.
+    statuses: tuple[InvoiceStatus, ...] = ()
+    due_after: date | None = None
+    due_before: date | None = None
+    student_id: UUID | None = None
+    school_id: UUID | None = None
+
+
 @dataclass(frozen=True, slots=True)
 class PaymentDTO:
     id: UUID
@@ -49,3 +62,67 @@ class PaymentDTO:
     reference: str | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class InvoiceTotalsUpdateDTO:
+    invoice_id: UUID
+    status: InvoiceStatus
+    payments_total: Decimal
+    refunds_total: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class BulkPaymentResultDTO:
+    index: int
+    payment: PaymentDTO | None = None
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class InvoicePaymentTotalsDTO:
+    invoice_id: UUID
+    payments_total: Decimal
+    refunds_total: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotencyRecordDTO:
+    scope: str
+    key: str
+    request_hash: str
+    response_status: int
+    response_body: dict[str, Any]
+    expires_at: datetime
+    created_at: datetime | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class AgingBucketTotalsDTO:
+    school_id: UUID
+    bucket: AgingBucket
+    invoices_count: int
+    balance_due: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class FeeDTO:
+    code: str
+    amount: Decimal
+    description: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BillingRunDTO:
+    id: UUID
+    school_id: UUID
+    request_hash: str
+
+
+@dataclass(frozen=True, slots=True)
+class BillingRunResultDTO:
+    run_id: UUID
+    school_id: UUID
+    students: int
+    invoices_created: int
+    invoices_skipped: int
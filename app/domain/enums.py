@@ -7,6 +7,22 @@ class InvoiceStatus(StrEnum):
     PAID = "PAID"
 
 
+class AgingBucket(StrEnum):
+    # Days past due_date of an open invoice, in report order.
+    CURRENT = "current"
+    DAYS_1_30 = "1-30"
+    DAYS_31_60 = "31-60"
+    DAYS_61_90 = "61-90"
+    DAYS_OVER_90 = "90+"
+
+
+class InvoiceSort(StrEnum):
+    # A leading "-" sorts descending; every key is tie-broken by id so pages are stable.
+    ID = "id"
+    DUE_DATE = "due_date"
+    DUE_DATE_DESC = "-due_date"
+
+
 class PaymentKind(StrEnum):
     PAYMENT = "PAYMENT"
     REFUND = "REFUND"
@@ -1,26 +1,39 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.auth import router as auth_router
+from app.api.constants import NEXT_CURSOR_HEADER
 from app.api.exception_handlers import register_exception_handlers
 from app.api.health import router as health_router
 from app.api.invoices import router as invoices_router
 from app.api.metrics import router as metrics_router
 from app.api.payments import router as payments_router
+from app.api.read_routing import ReadYourWritesMiddleware
+from app.api.reports import router as reports_router
 from app.api.schools import router as schools_router
 from app.api.students import router as students_router
 from app.core.logging import configure_logging
-from app.core.observability import request_logging_middleware
+from app.core.observability import RequestObservabilityMiddleware
+from app.core.process_pool import shutdown_shared_process_pool
 from app.core.settings import settings
 
 configure_logging()
 log = logging.getLogger("app")
 
-app = FastAPI(title=settings.service_name)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    yield
+    shutdown_shared_process_pool()
+
+
+app = FastAPI(title=settings.service_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +44,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["Authorization", "content-type", "Accept"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
-app.middleware("http")(request_logging_middleware)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RequestObservabilityMiddleware)
 
 app.include_router(health_router, tags=["health"])
 app.include_router(metrics_router, tags=["metrics"])
@@ -41,6 +56,7 @@ app.include_router(schools_router)
 app.include_router(students_router)
 app.include_router(invoices_router)
 app.include_router(payments_router)
+app.include_router(reports_router)
 
 register_exception_handlers(app)
 
@@ -1,6 +1,8 @@
 from app.db.base import Base
 
 # Import models so SQLAlchemy registers them in Base.metadata
+from app.models.billing_run import BillingRun
+from app.models.idempotency_key import IdempotencyKey
 from app.models.invoice import Invoice
 from app.models.payment import Payment
 from app.models.school import School
@@ -12,4 +14,6 @@ __all__ = [
     "Student",
     "Invoice",
     "Payment",
+    "IdempotencyKey",
+    "BillingRun",
 ]
@@ -5,7 +5,19 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import CheckConstraint, Date, DateTime, Enum, ForeignKey, Numeric, String, func
+from sqlalchemy import (
+    CheckConstraint,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from uuid_extensions import uuid7
@@ -17,10 +29,35 @@ if TYPE_CHECKING:
     from app.models.payment import Payment
     from app.models.student import Student
 
+# Predicate of the partial indexes over open invoices. Queries that want those indexes repeat it verbatim, as SQL text,
+# so the planner can match it even when the statement runs as a generic prepared plan.
+OPEN_INVOICE_PREDICATE = "status <> 'PAID'"
+
 
 class Invoice(Base):
     __tablename__ = "invoices"
-    __table_args__ = (CheckConstraint("total_amount >= 0", name="ck_invoices_total_amount_non_negative"),)
+    __table_args__ = (
+        CheckConstraint("total_amount >= 0", name="ck_invoices_total_amount_non_negative"),
+        CheckConstraint(
+            "payments_total >= 0 AND refunds_total >= 0",
+            name="ck_invoices_movement_totals_non_negative",
+        ),
+        # A billing run bills each student once per fee, however often it is retried. Invoices created one by one
+        # leave both columns NULL, and NULLs never collide.
+        UniqueConstraint("billing_run_id", "student_id", "fee_code", name="uq_invoices_billing_run_student_fee"),
+        # Back the GET /invoices filters and sorts.
+        Index("ix_invoices_student_id_due_date", "student_id", "due_date"),
+        Index("ix_invoices_due_date_id", "due_date", "id"),
+        # Open invoices by status and due date (overdue lists, dunning); settled invoices never enter the index.
+        Index("ix_invoices_open_status_due_date", "status", "due_date", postgresql_where=text(OPEN_INVOICE_PREDICATE)),
+        # Covers the aging report: a school's open balances come from an index-only scan, never the heap.
+        Index(
+            "ix_invoices_open_student_id_aging",
+            "student_id",
+            postgresql_include=["due_date", "total_amount", "payments_total", "refunds_total"],
+            postgresql_where=text(OPEN_INVOICE_PREDICATE),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     student_id: Mapped[uuid.UUID] = mapped_column(
@@ -36,9 +73,18 @@ class Invoice(Base):
         default=InvoiceStatus.PENDING,
         server_default=InvoiceStatus.PENDING.value,
     )
+    # Running movement totals, kept in sync by the payment service in the same transaction as each write.
+    payments_total: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0.00"), server_default="0"
+    )
+    refunds_total: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0.00"), server_default="0"
+    )
     issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     due_date: Mapped[date] = mapped_column(Date, nullable=False)
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    billing_run_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    fee_code: Mapped[str | None] = mapped_column(String(50), nullable=True)
 
     student: Mapped[Student] = relationship(back_populates="invoices")
     payments: Mapped[list[Payment]] = relationship(back_populates="invoice")
@@ -1,8 +1,22 @@
+from app.schemas.aging import AgingBucketTotals, AgingReport, SchoolAging
 from app.schemas.auth import LoginRequest, Token, UserClaims
+from app.schemas.billing_run import BillingRunCreate, BillingRunResult, FeeCreate
 from app.schemas.invoice import InvoiceCreate, InvoiceRead, InvoiceUpdate
-from app.schemas.payment import PaymentCreate, PaymentRead, PaymentUpdate
+from app.schemas.payment import (
+    PaymentBulkResult,
+    PaymentBulkRowResult,
+    PaymentCreate,
+    PaymentRead,
+    PaymentUpdate,
+)
 from app.schemas.school import SchoolCreate, SchoolRead, SchoolUpdate
-from app.schemas.statement import InvoiceSummary, SchoolStatement, StatementTotals, StudentStatement
+from app.schemas.statement import (
+    InvoiceSummary,
+    SchoolStatement,
+    SchoolStatementTrailer,
+    StatementTotals,
+    StudentStatement,
+)
 from app.schemas.student import StudentCreate, StudentRead, StudentUpdate
 
 __all__ = [
@@ -18,10 +32,19 @@ __all__ = [
     "PaymentCreate",
     "PaymentUpdate",
     "PaymentRead",
+    "PaymentBulkRowResult",
+    "PaymentBulkResult",
     "StatementTotals",
     "InvoiceSummary",
     "StudentStatement",
     "SchoolStatement",
+    "SchoolStatementTrailer",
+    "AgingBucketTotals",
+    "SchoolAging",
+    "AgingReport",
+    "FeeCreate",
+    "BillingRunCreate",
+    "BillingRunResult",
     "LoginRequest",
     "Token",
     "UserClaims",
@@ -0,0 +1,32 @@
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from app.domain.enums import AgingBucket
+from app.schemas.base import SchemaModel
+
+
+class AgingBucketTotals(SchemaModel):
+    bucket: AgingBucket
+    invoices_count: int
+    balance_due: Decimal
+
+
+class SchoolAging(SchemaModel):
+    """Open balances of one school, bucketed by days past due as of `as_of`. Every bucket is listed, empty or not."""
+
+    school_id: UUID
+    as_of: date
+    invoices_count: int
+    balance_due: Decimal
+    buckets: list[AgingBucketTotals]
+
+
+class AgingReport(SchemaModel):
+    """Aging across all schools; `schools` lists only schools with open balances."""
+
+    as_of: date
+    invoices_count: int
+    balance_due: Decimal
+    buckets: list[AgingBucketTotals]
+    schools: list[SchoolAging]
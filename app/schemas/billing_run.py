@@ -0,0 +1,29 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import Field
+
+from app.schemas.base import SchemaModel
+from app.schemas.types import PositiveAmount
+
+
+class FeeCreate(SchemaModel):
+    code: str = Field(min_length=1, max_length=50)
+    amount: PositiveAmount
+    description: str | None = Field(default=None, max_length=500)
+
+
+class BillingRunCreate(SchemaModel):
+    """One invoice per student of the school per fee. Reusing a `run_id` never bills the same student and fee twice."""
+
+    run_id: UUID
+    due_date: date
+    fees: list[FeeCreate] = Field(min_length=1)
+
+
+class BillingRunResult(SchemaModel):
+    run_id: UUID
+    school_id: UUID
+    students: int
+    invoices_created: int
+    invoices_skipped: int
@@ -1,5 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 from uuid import UUID
 
 from pydantic import field_validator
@@ -43,3 +44,16 @@ class PaymentRead(ReadSchemaModel):
     paid_at: datetime | None = None
     method: str | None = None
     reference: str | None = None
+
+
+class PaymentBulkRowResult(SchemaModel):
+    index: int
+    status: Literal["created", "rejected"]
+    payment: PaymentRead | None = None
+    error: str | None = None
+
+
+class PaymentBulkResult(SchemaModel):
+    created: int
+    rejected: int
+    results: list[PaymentBulkRowResult]
@@ -39,3 +39,11 @@ class SchoolStatement(SchemaModel):
     totals: StatementTotals
     students_count: int
     invoices: list[InvoiceSummary]
+
+
+class SchoolStatementTrailer(SchemaModel):
+    """Last line of an NDJSON school statement, after one `InvoiceSummary` line per invoice."""
+
+    school_id: UUID
+    totals: StatementTotals
+    students_count: int
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from app.domain.dtos import AgingBucketTotalsDTO
+from app.domain.enums import AgingBucket
+from app.schemas.aging import AgingBucketTotals, AgingReport, SchoolAging
+from app.services.billing_rules import ZERO
+
+
+def aging_as_of(as_of: date | None) -> date:
+    # Reports age balances as of today (UTC) unless the caller asks for another day.
+    return as_of if as_of is not None else datetime.now(UTC).date()
+
+
+def build_school_aging(school_id: UUID, as_of: date, rows: Iterable[AgingBucketTotalsDTO]) -> SchoolAging:
+    buckets = _bucket_totals(rows)
+    return SchoolAging(
+        school_id=school_id,
+        as_of=as_of,
+        invoices_count=sum(bucket.invoices_count for bucket in buckets),
+        balance_due=sum((bucket.balance_due for bucket in buckets), ZERO),
+        buckets=buckets,
+    )
+
+
+def build_aging_report(as_of: date, rows: Sequence[AgingBucketTotalsDTO]) -> AgingReport:
+    rows_by_school: dict[UUID, list[AgingBucketTotalsDTO]] = defaultdict(list)
+    for row in rows:
+        rows_by_school[row.school_id].append(row)
+    schools = [build_school_aging(school_id, as_of, school_rows) for school_id, school_rows in rows_by_school.items()]
+    buckets = _bucket_totals(rows)
+    return AgingReport(
+        as_of=as_of,
+        invoices_count=sum(school.invoices_count for school in schools),
+        balance_due=sum((school.balance_due for school in schools), ZERO),
+        buckets=buckets,
+        schools=schools,
+    )
+
+
+def _bucket_totals(rows: Iterable[AgingBucketTotalsDTO]) -> list[AgingBucketTotals]:
+    counts = dict.fromkeys(AgingBucket, 0)
+    balances: dict[AgingBucket, Decimal] = dict.fromkeys(AgingBucket, ZERO)
+    for row in rows:
+        counts[row.bucket] += row.invoices_count
+        balances[row.bucket] += row.balance_due
+    return [
+        AgingBucketTotals(bucket=bucket, invoices_count=counts[bucket], balance_due=balances[bucket])
+        for bucket in AgingBucket
+    ]
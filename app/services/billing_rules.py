@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Protocol
+from uuid import UUID
 
+from app.domain.dtos import InvoiceDTO
 from app.domain.enums import InvoiceStatus, PaymentKind
 from app.domain.errors import ConflictError
 
@@ -18,24 +21,70 @@ class SupportsMovement(Protocol):
     def kind(self) -> PaymentKind: ...
 
 
-def net_paid_total(movements: Iterable[SupportsMovement]) -> Decimal:
-    return payments_total(movements) - refunds_total(movements)
+class SupportsInvoiceMovement(SupportsMovement, Protocol):
+    @property
+    def invoice_id(self) -> UUID: ...
 
 
-def payments_total(movements: Iterable[SupportsMovement]) -> Decimal:
-    total = ZERO
+@dataclass(frozen=True, slots=True)
+class MovementTotals:
+    payments_total: Decimal = ZERO
+    refunds_total: Decimal = ZERO
+
+    @property
+    def net_paid(self) -> Decimal:
+        return self.payments_total - self.refunds_total
+
+    def apply(self, kind: PaymentKind, amount: Decimal) -> MovementTotals:
+        if kind == PaymentKind.REFUND:
+            return MovementTotals(self.payments_total, self.refunds_total + amount)
+        return MovementTotals(self.payments_total + amount, self.refunds_total)
+
+    def revert(self, kind: PaymentKind, amount: Decimal) -> MovementTotals:
+        if kind == PaymentKind.REFUND:
+            return MovementTotals(self.payments_total, self.refunds_total - amount)
+        return MovementTotals(self.payments_total - amount, self.refunds_total)
+
+
+def invoice_movement_totals(invoice: InvoiceDTO) -> MovementTotals:
+    return MovementTotals(invoice.payments_total, invoice.refunds_total)
+
+
+def movement_totals(movements: Iterable[SupportsMovement]) -> MovementTotals:
+    """Sum payments and refunds in one pass, so one-shot iterables work and nothing is walked twice."""
+    payments = refunds = ZERO
     for movement in movements:
-        if movement.kind == PaymentKind.PAYMENT:
-            total += movement.amount
-    return total
+        if movement.kind == PaymentKind.REFUND:
+            refunds += movement.amount
+        else:
+            payments += movement.amount
+    return MovementTotals(payments, refunds)
 
 
-def refunds_total(movements: Iterable[SupportsMovement]) -> Decimal:
-    total = ZERO
+def movement_totals_by_invoice(movements: Iterable[SupportsInvoiceMovement]) -> dict[UUID, MovementTotals]:
+    # One pass over every movement, folding into per-invoice [payments, refunds] pairs instead of grouping lists first.
+    running: dict[UUID, list[Decimal]] = {}
     for movement in movements:
+        totals = running.get(movement.invoice_id)
+        if totals is None:
+            totals = running[movement.invoice_id] = [ZERO, ZERO]
         if movement.kind == PaymentKind.REFUND:
-            total += movement.amount
-    return total
+            totals[1] += movement.amount
+        else:
+            totals[0] += movement.amount
+    return {invoice_id: MovementTotals(payments, refunds) for invoice_id, (payments, refunds) in running.items()}
+
+
+def net_paid_total(movements: Iterable[SupportsMovement]) -> Decimal:
+    return movement_totals(movements).net_paid
+
+
+def payments_total(movements: Iterable[SupportsMovement]) -> Decimal:
+    return movement_totals(movements).payments_total
+
+
+def refunds_total(movements: Iterable[SupportsMovement]) -> Decimal:
+    return movement_totals(movements).refunds_total
 
 
 def movement_delta(kind: PaymentKind, amount: Decimal) -> Decimal:
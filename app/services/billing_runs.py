@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from datetime import date
+from uuid import UUID
+
+from app.api.constants import SCHOOLS
+from app.domain.dtos import BillingRunDTO, BillingRunResultDTO, FeeDTO
+from app.domain.errors import ConflictError, DomainError, NotFoundError
+from app.services.idempotency import request_fingerprint
+from app.services.ports import BillingRunRepo, StatementCache, UnitOfWork
+from app.services.statement_cache import invalidate_school_roster_statements
+
+DEFAULT_BATCH_SIZE = 1_000
+# asyncpg binds at most 32,767 parameters per statement and every invoice row of a batch binds 10.
+MAX_BATCH_SIZE = 3_000
+DEFAULT_STUDENT_CHUNK_SIZE = 500
+
+BillingRunProgress = Callable[[BillingRunResultDTO], None]
+
+
+async def run_term_billing(
+    uow: UnitOfWork,
+    *,
+    run_id: UUID,
+    school_id: UUID,
+    fees: Sequence[FeeDTO],
+    due_date: date,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    student_chunk_size: int = DEFAULT_STUDENT_CHUNK_SIZE,
+    on_progress: BillingRunProgress | None = None,
+    statement_cache: StatementCache | None = None,
+) -> BillingRunResultDTO:
+    """Invoice every student of a school once per fee, in one transaction.
+
+    Students are streamed in keyset chunks and invoices go out in multi-row INSERT batches of `batch_size`. Invoices
+    are keyed by (run_id, student, fee), so rerunning a run id creates only what an earlier run did not and
+    `invoices_skipped` counts the rest. A run id is bound to the school, due date and fees it was first used with;
+    reusing it with anything else raises `ConflictError`. `on_progress` receives the running totals after every
+    student chunk.
+    """
+    _validate_fees(fees)
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise DomainError(f"batch size must be between 1 and {MAX_BATCH_SIZE}")
+    if await uow.schools.get_by_id(school_id) is None:
+        raise NotFoundError(SCHOOLS, str(school_id))
+    await _claim_run(uow.billing_runs, BillingRunDTO(run_id, school_id, _run_fingerprint(fees, due_date)))
+
+    student_ids: list[UUID] = []
+    pending: list[dict[str, object]] = []
+    attempted = 0
+    created = 0
+    async for students in uow.students.iter_by_school_id(school_id, chunk_size=student_chunk_size):
+        for student in students:
+            student_ids.append(student.id)
+            pending.extend(
+                {
+                    "student_id": student.id,
+                    "fee_code": fee.code,
+                    "total_amount": fee.amount,
+                    "due_date": due_date,
+                    "description": fee.description,
+                }
+                for fee in fees
+            )
+        while len(pending) >= batch_size:
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            attempted += len(batch)
+            created += await uow.invoices.create_for_billing_run(run_id, batch)
+        if on_progress is not None:
+            on_progress(_result(run_id, school_id, len(student_ids), attempted, created))
+    attempted += len(pending)
+    created += await uow.invoices.create_for_billing_run(run_id, pending)
+    await uow.commit()
+
+    if created:
+        await invalidate_school_roster_statements(statement_cache, school_id, student_ids)
+    result = _result(run_id, school_id, len(student_ids), attempted, created)
+    if on_progress is not None:
+        on_progress(result)
+    return result
+
+
+def _validate_fees(fees: Sequence[FeeDTO]) -> None:
+    if not fees:
+        raise DomainError("a billing run needs at least one fee")
+    codes = [fee.code for fee in fees]
+    if len(set(codes)) != len(codes):
+        raise DomainError("fee codes must be unique within a billing run")
+    if any(fee.amount <= 0 for fee in fees):
+        raise DomainError("fee amounts must be positive")
+
+
+async def _claim_run(runs: BillingRunRepo, run: BillingRunDTO) -> None:
+    if await runs.create(run):
+        return
+    existing = await runs.get(run.id)
+    if existing is not None and existing.school_id != run.school_id:
+        raise ConflictError("billing run id was already used for another school")
+    if existing is None or existing.request_hash != run.request_hash:
+        raise ConflictError("billing run id was already used with a different due date or fees")
+
+
+def _run_fingerprint(fees: Sequence[FeeDTO], due_date: date) -> str:
+    # Fee order only changes the order invoices are written in, so it is not part of the run's identity.
+    return request_fingerprint(
+        {
+            "due_date": due_date,
+            "fees": [
+                {"code": fee.code, "amount": fee.amount, "description": fee.description}
+                for fee in sorted(fees, key=lambda fee: fee.code)
+            ],
+        }
+    )
+
+
+def _result(run_id: UUID, school_id: UUID, students: int, attempted: int, created: int) -> BillingRunResultDTO:
+    return BillingRunResultDTO(
+        run_id=run_id,
+        school_id=school_id,
+        students=students,
+        invoices_created=created,
+        invoices_skipped=attempted - created,
+    )
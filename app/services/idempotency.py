@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from app.domain.dtos import IdempotencyRecordDTO
+from app.domain.errors import ConflictError
+from app.services.ports import UnitOfWork
+
+DEFAULT_IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+_CENT = Decimal("0.01")
+
+
+def request_fingerprint(data: Mapping[str, object]) -> str:
+    canonical = json.dumps(_canonical(data), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _canonical(value: object) -> object:
+    # Amounts are stored to the cent, so a retry sending 10 where the first request sent 10.00 is the same request.
+    if isinstance(value, Decimal):
+        return value.quantize(_CENT) if value.is_finite() else value
+    if isinstance(value, Mapping):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def idempotency_key_expiry(ttl: timedelta) -> datetime:
+    return datetime.now(UTC) + ttl
+
+
+def ensure_same_request(record: IdempotencyRecordDTO, request_hash: str) -> None:
+    if record.request_hash != request_hash:
+        raise ConflictError("idempotency key was already used for a different request")
+
+
+async def purge_expired_idempotency_keys(uow: UnitOfWork) -> int:
+    purged = await uow.idempotency.purge_expired()
+    await uow.commit()
+    return purged
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.domain.dtos import InvoiceDTO, InvoicePaymentTotalsDTO
+from app.services.billing_rules import (
+    MovementTotals,
+    derive_invoice_status,
+    invoice_movement_totals,
+    movement_totals_by_invoice,
+)
+from app.services.ports import UnitOfWork
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True, slots=True)
+class InvoiceTotalsDrift:
+    invoice_id: UUID
+    stored: MovementTotals
+    actual: MovementTotals
+
+
+async def check_invoice_totals(
+    uow: UnitOfWork,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    fix: bool = False,
+) -> list[InvoiceTotalsDrift]:
+    drift: list[InvoiceTotalsDrift] = []
+    after_id: UUID | None = None
+    while True:
+        # Each batch is one query: the invoices joined with what their payments actually add up to.
+        rows = await uow.invoices.list_with_payment_totals(offset=0, limit=batch_size, after_id=after_id)
+        if not rows:
+            break
+
+        batch_drift = _find_batch_drift(rows)
+        if fix and batch_drift:
+            await _repair_invoice_totals(uow, [item.invoice_id for item in batch_drift])
+            await uow.commit()
+        drift.extend(batch_drift)
+
+        if len(rows) < batch_size:
+            break
+        after_id = rows[-1][0].id
+    return drift
+
+
+def _find_batch_drift(rows: list[tuple[InvoiceDTO, InvoicePaymentTotalsDTO]]) -> list[InvoiceTotalsDrift]:
+    batch_drift: list[InvoiceTotalsDrift] = []
+    for invoice, aggregated in rows:
+        stored = invoice_movement_totals(invoice)
+        actual = MovementTotals(aggregated.payments_total, aggregated.refunds_total)
+        if stored != actual:
+            batch_drift.append(InvoiceTotalsDrift(invoice_id=invoice.id, stored=stored, actual=actual))
+    return batch_drift
+
+
+async def _repair_invoice_totals(uow: UnitOfWork, invoice_ids: list[UUID]) -> None:
+    # The drift was found by an unlocked read. Take the invoice locks payment writes take and recount the movements
+    # under them, so a payment committed in between is counted instead of overwritten.
+    invoices = await uow.invoices.list_by_ids_for_update(invoice_ids)
+    actual_by_invoice = movement_totals_by_invoice(await uow.payments.list_by_invoice_ids(invoice_ids))
+    for invoice in invoices:
+        actual = actual_by_invoice.get(invoice.id, MovementTotals())
+        if invoice_movement_totals(invoice) == actual:
+            continue
+        await uow.invoices.update(
+            invoice.id,
+            {
+                "status": derive_invoice_status(invoice.total_amount, actual.net_paid),
+                "payments_total": actual.payments_total,
+                "refunds_total": actual.refunds_total,
+            },
+        )
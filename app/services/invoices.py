@@ -7,18 +7,17 @@ from typing import TypedDict, cast
 from uuid import UUID
 
 from app.api.constants import INVOICES
-from app.domain.dtos import InvoiceDTO, PaymentDTO
-from app.domain.enums import InvoiceStatus
+from app.domain.dtos import InvoiceDTO, InvoiceFiltersDTO
+from app.domain.enums import InvoiceSort, InvoiceStatus
 from app.domain.errors import NotFoundError
 from app.services.billing_rules import (
     balance_due,
     derive_invoice_status,
-    net_paid_total,
-    payments_total,
-    refunds_total,
+    invoice_movement_totals,
     validate_net_paid_bounds,
 )
-from app.services.ports import InvoiceRepo, PaymentRepo
+from app.services.ports import InvoiceRepo, StatementCache, UnitOfWork
+from app.services.statement_cache import invalidate_student_statements
 
 
 class InvoiceComputed(TypedDict):
@@ -37,14 +36,27 @@ class InvoiceComputed(TypedDict):
     balance_due: Decimal
 
 
-async def create_invoice(repo: InvoiceRepo, data: Mapping[str, object]) -> InvoiceDTO:
+async def create_invoice(
+    uow: UnitOfWork, data: Mapping[str, object], *, statement_cache: StatementCache | None = None
+) -> InvoiceDTO:
     payload = dict(data)
     payload.setdefault("status", InvoiceStatus.PENDING)
-    return await repo.create(payload)
+    invoice = await uow.invoices.create(payload)
+    await uow.commit()
+    await invalidate_student_statements(statement_cache, uow.students, [invoice.student_id])
+    return invoice
 
 
-async def list_invoices(repo: InvoiceRepo, *, offset: int, limit: int) -> list[InvoiceDTO]:
-    return await repo.list_all(offset=offset, limit=limit)
+async def list_invoices(
+    repo: InvoiceRepo,
+    *,
+    offset: int,
+    limit: int,
+    after_id: UUID | None = None,
+    filters: InvoiceFiltersDTO | None = None,
+    sort: InvoiceSort = InvoiceSort.ID,
+) -> list[InvoiceDTO]:
+    return await repo.list_all(offset=offset, limit=limit, after_id=after_id, filters=filters, sort=sort)
 
 
 async def list_invoices_by_student_id(repo: InvoiceRepo, *, student_id: UUID) -> list[InvoiceDTO]:
@@ -64,69 +76,66 @@ async def get_invoice_by_id(repo: InvoiceRepo, invoice_id: UUID) -> InvoiceDTO:
 
 async def list_invoices_with_totals(
     invoice_repo: InvoiceRepo,
-    payment_repo: PaymentRepo,
     *,
     offset: int,
     limit: int,
+    after_id: UUID | None = None,
+    filters: InvoiceFiltersDTO | None = None,
+    sort: InvoiceSort = InvoiceSort.ID,
 ) -> list[InvoiceComputed]:
-    invoices = await list_invoices(invoice_repo, offset=offset, limit=limit)
-    if not invoices:
-        return []
-
-    invoice_ids = [invoice.id for invoice in invoices]
-    payments = await payment_repo.list_by_invoice_ids(invoice_ids)
-    payments_by_invoice: dict[UUID, list[PaymentDTO]] = {invoice_id: [] for invoice_id in invoice_ids}
-    for payment in payments:
-        payments_by_invoice.setdefault(payment.invoice_id, []).append(payment)
+    invoices = await list_invoices(
+        invoice_repo, offset=offset, limit=limit, after_id=after_id, filters=filters, sort=sort
+    )
+    return [serialize_invoice_with_totals(invoice) for invoice in invoices]
 
-    return [serialize_invoice_with_totals(invoice, payments_by_invoice[invoice.id]) for invoice in invoices]
 
-
-async def get_invoice_with_totals(
-    invoice_repo: InvoiceRepo,
-    payment_repo: PaymentRepo,
-    invoice_id: UUID,
-) -> InvoiceComputed:
+async def get_invoice_with_totals(invoice_repo: InvoiceRepo, invoice_id: UUID) -> InvoiceComputed:
     invoice = await get_invoice_by_id(invoice_repo, invoice_id=invoice_id)
-    payments = await payment_repo.list_by_invoice_id(invoice.id)
-    return serialize_invoice_with_totals(invoice, payments)
+    return serialize_invoice_with_totals(invoice)
 
 
 async def update_invoice(
-    invoice_repo: InvoiceRepo,
-    payment_repo: PaymentRepo,
+    uow: UnitOfWork,
     invoice_id: UUID,
     data: Mapping[str, object],
+    *,
+    statement_cache: StatementCache | None = None,
 ) -> InvoiceDTO:
-    invoice = await invoice_repo.get_by_id(invoice_id)
+    # Locked like the payment paths, so the bounds check and the derived status see the totals a concurrent payment
+    # commits rather than overwriting them with stale ones.
+    invoice = await uow.invoices.get_by_id_for_update(invoice_id)
     if invoice is None:
         raise NotFoundError(INVOICES, str(invoice_id))
 
     next_total_amount = cast(Decimal, data.get("total_amount", invoice.total_amount))
-    payments = await payment_repo.list_by_invoice_id(invoice_id)
-    net_paid = net_paid_total(payments)
+    net_paid = invoice_movement_totals(invoice).net_paid
     validate_net_paid_bounds(next_total_amount, net_paid)
 
     payload = dict(data)
     payload["status"] = derive_invoice_status(next_total_amount, net_paid)
 
-    updated = await invoice_repo.update(invoice_id, payload)
+    updated = await uow.invoices.update(invoice_id, payload)
     if updated is None:
         raise NotFoundError(INVOICES, str(invoice_id))
+    await uow.commit()
+    await invalidate_student_statements(statement_cache, uow.students, [invoice.student_id, updated.student_id])
     return updated
 
 
-async def delete_invoice(repo: InvoiceRepo, invoice_id: UUID) -> bool:
-    deleted = await repo.delete(invoice_id)
+async def delete_invoice(uow: UnitOfWork, invoice_id: UUID, *, statement_cache: StatementCache | None = None) -> bool:
+    # The owning student is only needed to invalidate cached statements once the row is gone.
+    invoice = await uow.invoices.get_by_id(invoice_id) if statement_cache is not None else None
+    deleted = await uow.invoices.delete(invoice_id)
     if not deleted:
         raise NotFoundError(INVOICES, str(invoice_id))
+    await uow.commit()
+    if invoice is not None:
+        await invalidate_student_statements(statement_cache, uow.students, [invoice.student_id])
     return deleted
 
 
-def serialize_invoice_with_totals(invoice: InvoiceDTO, payments: Sequence[PaymentDTO]) -> InvoiceComputed:
-    invoice_payments_total = payments_total(payments)
-    invoice_refunds_total = refunds_total(payments)
-    net_paid = invoice_payments_total - invoice_refunds_total
+def serialize_invoice_with_totals(invoice: InvoiceDTO) -> InvoiceComputed:
+    net_paid = invoice_movement_totals(invoice).net_paid
     return {
         "id": invoice.id,
         "student_id": invoice.student_id,
@@ -137,8 +146,8 @@ def serialize_invoice_with_totals(invoice: InvoiceDTO, payments: Sequence[Paymen
         "issued_at": invoice.issued_at,
         "due_date": invoice.due_date,
         "description": invoice.description,
-        "payments_total": invoice_payments_total,
-        "refunds_total": invoice_refunds_total,
+        "payments_total": invoice.payments_total,
+        "refunds_total": invoice.refunds_total,
         "paid_total": net_paid,
         "balance_due": balance_due(invoice.total_amount, net_paid),
     }
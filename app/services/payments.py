@@ -1,43 +1,144 @@
 from __future__ import annotations
 
 from collections.abc import Mapping, Sequence
+from datetime import timedelta
 from decimal import Decimal
 from typing import cast
 from uuid import UUID
 
+from pydantic import TypeAdapter
+
 from app.api.constants import INVOICES, PAYMENTS
-from app.domain.dtos import InvoiceDTO, PaymentDTO
+from app.domain.dtos import (
+    BulkPaymentResultDTO,
+    IdempotencyRecordDTO,
+    InvoiceDTO,
+    InvoiceTotalsUpdateDTO,
+    PaymentDTO,
+)
 from app.domain.enums import PaymentKind
-from app.domain.errors import ConflictError, NotFoundError
+from app.domain.errors import ConflictError, DomainError, NotFoundError
 from app.services.billing_rules import (
+    MovementTotals,
     derive_invoice_status,
-    movement_delta,
-    net_paid_total,
+    invoice_movement_totals,
     validate_net_paid_bounds,
 )
-from app.services.ports import InvoiceRepo, PaymentRepo
+from app.services.idempotency import (
+    DEFAULT_IDEMPOTENCY_KEY_TTL,
+    ensure_same_request,
+    idempotency_key_expiry,
+    request_fingerprint,
+)
+from app.services.ports import InvoiceRepo, PaymentRepo, StatementCache, UnitOfWork
+from app.services.statement_cache import invalidate_student_statements
+
+PAYMENT_CREATE_SCOPE = "payments:create"
+
+_payment_adapter = TypeAdapter(PaymentDTO)
 
 
 async def create_payment(
-    payment_repo: PaymentRepo, invoice_repo: InvoiceRepo, data: Mapping[str, object]
+    uow: UnitOfWork,
+    data: Mapping[str, object],
+    *,
+    idempotency_key: str | None = None,
+    idempotency_ttl: timedelta = DEFAULT_IDEMPOTENCY_KEY_TTL,
+    statement_cache: StatementCache | None = None,
 ) -> PaymentDTO:
+    request_hash = request_fingerprint(data) if idempotency_key is not None else ""
+    if idempotency_key is not None:
+        replayed = await _replay_payment(uow, idempotency_key, request_hash)
+        if replayed is not None:
+            return replayed
+
     invoice_id = cast(UUID, data["invoice_id"])
-    invoice = await _get_invoice_or_raise(invoice_repo, invoice_id)
+    invoice = await _lock_invoice_or_raise(uow.invoices, invoice_id)
 
-    payments = await payment_repo.list_by_invoice_id(invoice.id)
     candidate_kind = cast(PaymentKind, data.get("kind", PaymentKind.PAYMENT))
     candidate_amount = cast(Decimal, data["amount"])
     _validate_movement_payload(kind=candidate_kind, amount=candidate_amount)
-    next_net_paid = net_paid_total(payments) + movement_delta(candidate_kind, candidate_amount)
-    validate_net_paid_bounds(invoice.total_amount, next_net_paid)
-
-    created = await payment_repo.create(data)
-    await _persist_invoice_status(invoice_repo, invoice, next_net_paid)
+    next_totals = invoice_movement_totals(invoice).apply(candidate_kind, candidate_amount)
+    validate_net_paid_bounds(invoice.total_amount, next_totals.net_paid)
+
+    created = await uow.payments.create(data)
+    await _persist_invoice_totals(uow.invoices, invoice, next_totals)
+    if idempotency_key is not None:
+        record = IdempotencyRecordDTO(
+            scope=PAYMENT_CREATE_SCOPE,
+            key=idempotency_key,
+            request_hash=request_hash,
+            response_status=200,
+            response_body=_payment_adapter.dump_python(created, mode="json"),
+            expires_at=idempotency_key_expiry(idempotency_ttl),
+        )
+        if not await uow.idempotency.create(record):
+            # A concurrent request with the same key committed first: drop this attempt and replay its result.
+            await uow.rollback()
+            replayed = await _replay_payment(uow, idempotency_key, request_hash)
+            if replayed is None:
+                raise ConflictError("idempotency key is being processed by another request")
+            return replayed
+    await uow.commit()
+    await invalidate_student_statements(statement_cache, uow.students, [invoice.student_id])
     return created
 
 
-async def list_payments(repo: PaymentRepo, *, offset: int, limit: int) -> list[PaymentDTO]:
-    return await repo.list_all(offset=offset, limit=limit)
+async def create_payments_bulk(
+    uow: UnitOfWork, rows: Sequence[Mapping[str, object]], *, statement_cache: StatementCache | None = None
+) -> list[BulkPaymentResultDTO]:
+    invoice_ids = sorted({cast(UUID, row["invoice_id"]) for row in rows})
+    invoices = {invoice.id: invoice for invoice in await uow.invoices.list_by_ids_for_update(invoice_ids)}
+    running_totals = {invoice_id: invoice_movement_totals(invoice) for invoice_id, invoice in invoices.items()}
+
+    accepted: list[int] = []
+    errors: dict[int, str] = {}
+    for index, row in enumerate(rows):
+        invoice_id = cast(UUID, row["invoice_id"])
+        try:
+            invoice = invoices.get(invoice_id)
+            if invoice is None:
+                raise NotFoundError(INVOICES, str(invoice_id))
+            kind = cast(PaymentKind, row.get("kind", PaymentKind.PAYMENT))
+            amount = cast(Decimal, row["amount"])
+            _validate_movement_payload(kind=kind, amount=amount)
+            next_totals = running_totals[invoice_id].apply(kind, amount)
+            validate_net_paid_bounds(invoice.total_amount, next_totals.net_paid)
+        except DomainError as exc:
+            errors[index] = exc.message()
+            continue
+        running_totals[invoice_id] = next_totals
+        accepted.append(index)
+
+    created = await uow.payments.create_many([rows[index] for index in accepted])
+    touched_invoice_ids = sorted({payment.invoice_id for payment in created})
+    await uow.invoices.update_totals_many(
+        [
+            InvoiceTotalsUpdateDTO(
+                invoice_id=invoice_id,
+                status=derive_invoice_status(invoices[invoice_id].total_amount, running_totals[invoice_id].net_paid),
+                payments_total=running_totals[invoice_id].payments_total,
+                refunds_total=running_totals[invoice_id].refunds_total,
+            )
+            for invoice_id in touched_invoice_ids
+        ]
+    )
+    await uow.commit()
+    await invalidate_student_statements(
+        statement_cache, uow.students, [invoices[invoice_id].student_id for invoice_id in touched_invoice_ids]
+    )
+
+    created_by_index = dict(zip(accepted, created, strict=True))
+    return [
+        BulkPaymentResultDTO(index=index, payment=created_by_index.get(index), error=errors.get(index))
+        for index in range(len(rows))
+    ]
+
+
+async def list_payments(
+    repo: PaymentRepo, *, offset: int, limit: int, after_id: UUID | None = None
+) -> list[PaymentDTO]:
+    return await repo.list_all(offset=offset, limit=limit, after_id=after_id)
 
 
 async def list_payments_by_invoice_id(repo: PaymentRepo, invoice_id: UUID) -> list[PaymentDTO]:
@@ -56,12 +157,13 @@ async def get_payment_by_id(repo: PaymentRepo, payment_id: UUID) -> PaymentDTO:
 
 
 async def update_payment(
-    payment_repo: PaymentRepo,
-    invoice_repo: InvoiceRepo,
+    uow: UnitOfWork,
     payment_id: UUID,
     data: Mapping[str, object],
+    *,
+    statement_cache: StatementCache | None = None,
 ) -> PaymentDTO:
-    payment = await payment_repo.get_by_id(payment_id)
+    payment = await uow.payments.get_by_id_for_update(payment_id)
     if payment is None:
         raise NotFoundError(PAYMENTS, str(payment_id))
 
@@ -69,75 +171,98 @@ async def update_payment(
     updated_kind = cast(PaymentKind, data.get("kind", payment.kind))
     updated_amount = cast(Decimal, data.get("amount", payment.amount))
     _validate_movement_payload(kind=updated_kind, amount=updated_amount)
-    updated_delta = movement_delta(updated_kind, updated_amount)
-    old_delta = movement_delta(payment.kind, payment.amount)
 
     if target_invoice_id == payment.invoice_id:
-        invoice = await _get_invoice_or_raise(invoice_repo, payment.invoice_id)
-        payments = await payment_repo.list_by_invoice_id(invoice.id)
-        current_net_paid = net_paid_total(payments)
-        next_net_paid = current_net_paid - old_delta + updated_delta
-        validate_net_paid_bounds(invoice.total_amount, next_net_paid)
+        invoice = await _lock_invoice_or_raise(uow.invoices, payment.invoice_id)
+        next_totals = (
+            invoice_movement_totals(invoice).revert(payment.kind, payment.amount).apply(updated_kind, updated_amount)
+        )
+        validate_net_paid_bounds(invoice.total_amount, next_totals.net_paid)
 
-        updated = await payment_repo.update(payment_id, data)
+        updated = await uow.payments.update(payment_id, data)
         if updated is None:
             raise NotFoundError(PAYMENTS, str(payment_id))
-        await _persist_invoice_status(invoice_repo, invoice, next_net_paid)
+        await _persist_invoice_totals(uow.invoices, invoice, next_totals)
+        await uow.commit()
+        await invalidate_student_statements(statement_cache, uow.students, [invoice.student_id])
         return updated
 
-    source_invoice = await _get_invoice_or_raise(invoice_repo, payment.invoice_id)
-    target_invoice = await _get_invoice_or_raise(invoice_repo, target_invoice_id)
+    locked = await _lock_invoices_or_raise(uow.invoices, [payment.invoice_id, target_invoice_id])
+    source_invoice = locked[payment.invoice_id]
+    target_invoice = locked[target_invoice_id]
 
-    source_payments = await payment_repo.list_by_invoice_id(source_invoice.id)
-    source_next_net_paid = net_paid_total(source_payments) - old_delta
-    validate_net_paid_bounds(source_invoice.total_amount, source_next_net_paid)
+    source_next_totals = invoice_movement_totals(source_invoice).revert(payment.kind, payment.amount)
+    validate_net_paid_bounds(source_invoice.total_amount, source_next_totals.net_paid)
 
-    target_payments = await payment_repo.list_by_invoice_id(target_invoice.id)
-    target_next_net_paid = net_paid_total(target_payments) + updated_delta
-    validate_net_paid_bounds(target_invoice.total_amount, target_next_net_paid)
+    target_next_totals = invoice_movement_totals(target_invoice).apply(updated_kind, updated_amount)
+    validate_net_paid_bounds(target_invoice.total_amount, target_next_totals.net_paid)
 
-    updated = await payment_repo.update(payment_id, data)
+    updated = await uow.payments.update(payment_id, data)
     if updated is None:
         raise NotFoundError(PAYMENTS, str(payment_id))
 
-    await _persist_invoice_status(invoice_repo, source_invoice, source_next_net_paid)
-    await _persist_invoice_status(invoice_repo, target_invoice, target_next_net_paid)
+    await _persist_invoice_totals(uow.invoices, source_invoice, source_next_totals)
+    await _persist_invoice_totals(uow.invoices, target_invoice, target_next_totals)
+    await uow.commit()
+    await invalidate_student_statements(
+        statement_cache, uow.students, [source_invoice.student_id, target_invoice.student_id]
+    )
     return updated
 
 
-async def delete_payment(payment_repo: PaymentRepo, invoice_repo: InvoiceRepo, payment_id: UUID) -> bool:
-    payment = await payment_repo.get_by_id(payment_id)
+async def delete_payment(uow: UnitOfWork, payment_id: UUID, *, statement_cache: StatementCache | None = None) -> bool:
+    payment = await uow.payments.get_by_id_for_update(payment_id)
     if payment is None:
         raise NotFoundError(PAYMENTS, str(payment_id))
 
-    invoice = await _get_invoice_or_raise(invoice_repo, payment.invoice_id)
-    payments = await payment_repo.list_by_invoice_id(invoice.id)
-    current_net_paid = net_paid_total(payments)
-    next_net_paid = current_net_paid - movement_delta(payment.kind, payment.amount)
-    validate_net_paid_bounds(invoice.total_amount, next_net_paid)
+    invoice = await _lock_invoice_or_raise(uow.invoices, payment.invoice_id)
+    next_totals = invoice_movement_totals(invoice).revert(payment.kind, payment.amount)
+    validate_net_paid_bounds(invoice.total_amount, next_totals.net_paid)
 
-    deleted = await payment_repo.delete(payment_id)
+    deleted = await uow.payments.delete(payment_id)
     if not deleted:
         raise NotFoundError(PAYMENTS, str(payment_id))
 
-    await _persist_invoice_status(invoice_repo, invoice, next_net_paid)
+    await _persist_invoice_totals(uow.invoices, invoice, next_totals)
+    await uow.commit()
+    await invalidate_student_statements(statement_cache, uow.students, [invoice.student_id])
     return deleted
 
 
-async def _persist_invoice_status(invoice_repo: InvoiceRepo, invoice: InvoiceDTO, next_net_paid: Decimal) -> None:
-    next_status = derive_invoice_status(invoice.total_amount, next_net_paid)
-    if next_status == invoice.status:
-        return
-    await invoice_repo.update(invoice.id, {"status": next_status})
+async def _replay_payment(uow: UnitOfWork, idempotency_key: str, request_hash: str) -> PaymentDTO | None:
+    record = await uow.idempotency.get(PAYMENT_CREATE_SCOPE, idempotency_key)
+    if record is None:
+        return None
+    ensure_same_request(record, request_hash)
+    return _payment_adapter.validate_python(record.response_body)
+
 
+async def _persist_invoice_totals(invoice_repo: InvoiceRepo, invoice: InvoiceDTO, next_totals: MovementTotals) -> None:
+    await invoice_repo.update(
+        invoice.id,
+        {
+            "status": derive_invoice_status(invoice.total_amount, next_totals.net_paid),
+            "payments_total": next_totals.payments_total,
+            "refunds_total": next_totals.refunds_total,
+        },
+    )
 
-async def _get_invoice_or_raise(invoice_repo: InvoiceRepo, invoice_id: UUID) -> InvoiceDTO:
-    invoice = await invoice_repo.get_by_id(invoice_id)
+
+async def _lock_invoice_or_raise(invoice_repo: InvoiceRepo, invoice_id: UUID) -> InvoiceDTO:
+    invoice = await invoice_repo.get_by_id_for_update(invoice_id)
     if invoice is None:
         raise NotFoundError(INVOICES, str(invoice_id))
     return invoice
 
 
+async def _lock_invoices_or_raise(invoice_repo: InvoiceRepo, invoice_ids: Sequence[UUID]) -> dict[UUID, InvoiceDTO]:
+    locked = {invoice.id: invoice for invoice in await invoice_repo.list_by_ids_for_update(invoice_ids)}
+    for invoice_id in invoice_ids:
+        if invoice_id not in locked:
+            raise NotFoundError(INVOICES, str(invoice_id))
+    return locked
+
+
 def _validate_movement_payload(*, kind: PaymentKind | None, amount: Decimal | None) -> None:
     if kind is None:
         raise ConflictError("payment movement kind cannot be null")
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from contextlib import AbstractAsyncContextManager
+from datetime import date
 from typing import Protocol
 from uuid import UUID
 
-from app.domain.dtos import InvoiceDTO, PaymentDTO, SchoolDTO, StudentDTO
+from app.domain.dtos import (
+    AgingBucketTotalsDTO,
+    BillingRunDTO,
+    IdempotencyRecordDTO,
+    InvoiceDTO,
+    InvoiceFiltersDTO,
+    InvoicePaymentTotalsDTO,
+    InvoiceTotalsUpdateDTO,
+    PaymentDTO,
+    SchoolDTO,
+    StudentDTO,
+)
+from app.domain.enums import InvoiceSort
 
 
 class SchoolRepo(Protocol):
     async def create(self, data: Mapping[str, object]) -> SchoolDTO: ...
 
-    async def list_all(self, *, offset: int, limit: int) -> list[SchoolDTO]: ...
+    async def list_all(self, *, offset: int, limit: int, after_id: UUID | None = None) -> list[SchoolDTO]: ...
 
     async def get_by_id(self, school_id: UUID) -> SchoolDTO | None: ...
 
@@ -22,10 +36,16 @@ class SchoolRepo(Protocol):
 class StudentRepo(Protocol):
     async def create(self, data: Mapping[str, object]) -> StudentDTO: ...
 
-    async def list_all(self, *, offset: int, limit: int) -> list[StudentDTO]: ...
+    async def list_all(self, *, offset: int, limit: int, after_id: UUID | None = None) -> list[StudentDTO]: ...
 
     async def list_by_school_id(self, school_id: UUID, *, offset: int = 0, limit: int = 100) -> list[StudentDTO]: ...
 
+    def iter_by_school_id(self, school_id: UUID, *, chunk_size: int = 500) -> AsyncIterator[list[StudentDTO]]: ...
+
+    async def count_by_school_id(self, school_id: UUID) -> int: ...
+
+    async def list_school_ids_by_student_ids(self, student_ids: Sequence[UUID]) -> list[UUID]: ...
+
     async def get_by_id(self, student_id: UUID) -> StudentDTO | None: ...
 
     async def update(self, student_id: UUID, data: Mapping[str, object]) -> StudentDTO | None: ...
@@ -36,23 +56,51 @@ class StudentRepo(Protocol):
 class InvoiceRepo(Protocol):
     async def create(self, data: Mapping[str, object]) -> InvoiceDTO: ...
 
-    async def list_all(self, *, offset: int, limit: int) -> list[InvoiceDTO]: ...
+    async def create_for_billing_run(self, billing_run_id: UUID, rows: Sequence[Mapping[str, object]]) -> int: ...
+
+    async def list_all(
+        self,
+        *,
+        offset: int,
+        limit: int,
+        after_id: UUID | None = None,
+        filters: InvoiceFiltersDTO | None = None,
+        sort: InvoiceSort = InvoiceSort.ID,
+    ) -> list[InvoiceDTO]: ...
+
+    async def list_with_payment_totals(
+        self, *, offset: int, limit: int, after_id: UUID | None = None
+    ) -> list[tuple[InvoiceDTO, InvoicePaymentTotalsDTO]]: ...
+
+    async def aging_by_school(self, *, as_of: date, school_id: UUID | None = None) -> list[AgingBucketTotalsDTO]: ...
 
     async def list_by_student_id(self, student_id: UUID) -> list[InvoiceDTO]: ...
 
     async def list_by_student_ids(self, student_ids: Sequence[UUID]) -> list[InvoiceDTO]: ...
 
+    def stream_by_school_id(self, school_id: UUID) -> AsyncIterator[InvoiceDTO]: ...
+
+    async def count_by_school_id(self, school_id: UUID) -> int: ...
+
     async def get_by_id(self, invoice_id: UUID) -> InvoiceDTO | None: ...
 
+    async def get_by_id_for_update(self, invoice_id: UUID) -> InvoiceDTO | None: ...
+
+    async def list_by_ids_for_update(self, invoice_ids: Sequence[UUID]) -> list[InvoiceDTO]: ...
+
     async def update(self, invoice_id: UUID, data: Mapping[str, object]) -> InvoiceDTO | None: ...
 
+    async def update_totals_many(self, updates: Sequence[InvoiceTotalsUpdateDTO]) -> int: ...
+
     async def delete(self, invoice_id: UUID) -> bool: ...
 
 
 class PaymentRepo(Protocol):
     async def create(self, data: Mapping[str, object]) -> PaymentDTO: ...
 
-    async def list_all(self, *, offset: int, limit: int) -> list[PaymentDTO]: ...
+    async def create_many(self, rows: Sequence[Mapping[str, object]]) -> list[PaymentDTO]: ...
+
+    async def list_all(self, *, offset: int, limit: int, after_id: UUID | None = None) -> list[PaymentDTO]: ...
 
     async def list_by_invoice_id(self, invoice_id: UUID) -> list[PaymentDTO]: ...
 
@@ -60,6 +108,69 @@ class PaymentRepo(Protocol):
 
     async def get_by_id(self, payment_id: UUID) -> PaymentDTO | None: ...
 
+    async def get_by_id_for_update(self, payment_id: UUID) -> PaymentDTO | None: ...
+
     async def update(self, payment_id: UUID, data: Mapping[str, object]) -> PaymentDTO | None: ...
 
     async def delete(self, payment_id: UUID) -> bool: ...
+
+
+class IdempotencyRepo(Protocol):
+    async def get(self, scope: str, key: str) -> IdempotencyRecordDTO | None: ...
+
+    async def create(self, record: IdempotencyRecordDTO) -> bool: ...
+
+    async def purge_expired(self) -> int: ...
+
+
+class BillingRunRepo(Protocol):
+    async def get(self, run_id: UUID) -> BillingRunDTO | None: ...
+
+    async def create(self, run: BillingRunDTO) -> bool: ...
+
+
+class UnitOfWork(Protocol):
+    @property
+    def schools(self) -> SchoolRepo: ...
+
+    @property
+    def students(self) -> StudentRepo: ...
+
+    @property
+    def invoices(self) -> InvoiceRepo: ...
+
+    @property
+    def payments(self) -> PaymentRepo: ...
+
+    @property
+    def idempotency(self) -> IdempotencyRepo: ...
+
+    @property
+    def billing_runs(self) -> BillingRunRepo: ...
+
+    async def commit(self) -> None: ...
+
+    async def rollback(self) -> None: ...
+
+
+class StatementRepos(Protocol):
+    @property
+    def schools(self) -> SchoolRepo: ...
+
+    @property
+    def students(self) -> StudentRepo: ...
+
+    @property
+    def invoices(self) -> InvoiceRepo: ...
+
+
+# Each call opens repos on a fresh session, so independent reads can run concurrently on separate connections.
+StatementReposFactory = Callable[[], AbstractAsyncContextManager[StatementRepos]]
+
+
+class StatementCache(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes) -> None: ...
+
+    async def delete_many(self, keys: Sequence[str]) -> None: ...
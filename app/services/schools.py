@@ -6,15 +6,18 @@ from uuid import UUID
 from app.api.constants import SCHOOLS
 from app.domain.dtos import SchoolDTO
 from app.domain.errors import NotFoundError
-from app.services.ports import SchoolRepo
+from app.services.ports import SchoolRepo, StatementCache, UnitOfWork
+from app.services.statement_cache import invalidate_school_roster_statements
 
 
-async def create_school(repo: SchoolRepo, data: Mapping[str, object]) -> SchoolDTO:
-    return await repo.create(data)
+async def create_school(uow: UnitOfWork, data: Mapping[str, object]) -> SchoolDTO:
+    school = await uow.schools.create(data)
+    await uow.commit()
+    return school
 
 
-async def list_schools(repo: SchoolRepo, *, offset: int, limit: int) -> list[SchoolDTO]:
-    return await repo.list_all(offset=offset, limit=limit)
+async def list_schools(repo: SchoolRepo, *, offset: int, limit: int, after_id: UUID | None = None) -> list[SchoolDTO]:
+    return await repo.list_all(offset=offset, limit=limit, after_id=after_id)
 
 
 async def get_school_by_id(repo: SchoolRepo, school_id: UUID) -> SchoolDTO:
@@ -24,15 +27,24 @@ async def get_school_by_id(repo: SchoolRepo, school_id: UUID) -> SchoolDTO:
     return school
 
 
-async def update_school(repo: SchoolRepo, school_id: UUID, data: Mapping[str, object]) -> SchoolDTO:
-    school = await repo.update(school_id, data)
+async def update_school(uow: UnitOfWork, school_id: UUID, data: Mapping[str, object]) -> SchoolDTO:
+    school = await uow.schools.update(school_id, data)
     if school is None:
         raise NotFoundError(SCHOOLS, str(school_id))
+    await uow.commit()
     return school
 
 
-async def delete_school(repo: SchoolRepo, school_id: UUID) -> bool:
-    deleted = await repo.delete(school_id)
+async def delete_school(uow: UnitOfWork, school_id: UUID, *, statement_cache: StatementCache | None = None) -> bool:
+    # Read before the delete, while the roster is still reachable, so a school removed together with its students
+    # (e.g. by a cascading foreign key) leaves none of their cached statements behind.
+    student_ids: list[UUID] = []
+    if statement_cache is not None:
+        async for students in uow.students.iter_by_school_id(school_id):
+            student_ids.extend(student.id for student in students)
+    deleted = await uow.schools.delete(school_id)
     if not deleted:
         raise NotFoundError(SCHOOLS, str(school_id))
+    await uow.commit()
+    await invalidate_school_roster_statements(statement_cache, school_id, student_ids)
     return deleted
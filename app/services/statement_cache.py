@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable
+from uuid import UUID
+
+from uuid_extensions import uuid7
+
+from app.core.observability import STATEMENT_CACHE_INVALIDATIONS_TOTAL, STATEMENT_CACHE_REQUESTS_TOTAL
+from app.services.ports import StatementCache, StudentRepo
+from app.services.use_cases import StatementJSONQuery
+
+STUDENT_SCOPE = "student"
+SCHOOL_SCOPE = "school"
+
+
+def student_statement_key(student_id: UUID) -> str:
+    return f"statement:{STUDENT_SCOPE}:{student_id}"
+
+
+def school_statement_key(school_id: UUID) -> str:
+    return f"statement:{SCHOOL_SCOPE}:{school_id}"
+
+
+class _CachedStatementJSON:
+    """Serves a statement's JSON bytes from the cache as they were stored, filling the cache on a miss.
+
+    The statement key holds a generation token and the JSON is stored under key + token. Invalidation deletes the
+    token, and a miss that finds none writes a fresh one before it reads the database. A fill that read the
+    database before a write committed therefore lands under a token nobody looks up any more, instead of being
+    served until it expires.
+
+    Reads from a replica may still miss a write that invalidated the token. Tokens record when they were minted,
+    and with `settle_seconds` (the replica lag bound) a fill is served but only stored once its token is that old.
+    """
+
+    def __init__(
+        self,
+        inner: StatementJSONQuery,
+        cache: StatementCache,
+        *,
+        scope: str,
+        key: Callable[[UUID], str],
+        settle_seconds: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._inner = inner
+        self._cache = cache
+        self._scope = scope
+        self._key = key
+        self._settle_seconds = settle_seconds
+        self._clock = clock
+
+    async def __call__(self, entity_id: UUID) -> bytes:
+        key = self._key(entity_id)
+        generation = await self._cache.get(key)
+        if generation is None:
+            generation = _new_generation(self._clock())
+            await self._cache.set(key, generation)
+        else:
+            cached = await self._cache.get(_entry_key(key, generation))
+            if cached is not None:
+                STATEMENT_CACHE_REQUESTS_TOTAL.labels(scope=self._scope, result="hit").inc()
+                return cached
+
+        STATEMENT_CACHE_REQUESTS_TOTAL.labels(scope=self._scope, result="miss").inc()
+        settled = not self._settle_seconds or self._clock() - _minted_at(generation) >= self._settle_seconds
+        body = await self._inner(entity_id)
+        if settled:
+            await self._cache.set(_entry_key(key, generation), body)
+        return body
+
+
+class CachedGetStudentStatement(_CachedStatementJSON):
+    def __init__(self, inner: StatementJSONQuery, cache: StatementCache, *, settle_seconds: float = 0.0) -> None:
+        super().__init__(inner, cache, scope=STUDENT_SCOPE, key=student_statement_key, settle_seconds=settle_seconds)
+
+
+class CachedGetSchoolStatement(_CachedStatementJSON):
+    def __init__(self, inner: StatementJSONQuery, cache: StatementCache, *, settle_seconds: float = 0.0) -> None:
+        super().__init__(inner, cache, scope=SCHOOL_SCOPE, key=school_statement_key, settle_seconds=settle_seconds)
+
+
+async def invalidate_student_statements(
+    cache: StatementCache | None, student_repo: StudentRepo, student_ids: Iterable[UUID]
+) -> None:
+    """Drop the statements of the given students and of the schools they belong to (looked up in one query)."""
+    if cache is None:
+        return
+    unique_ids = sorted(set(student_ids))
+    await _delete(cache, STUDENT_SCOPE, [student_statement_key(student_id) for student_id in unique_ids])
+    await invalidate_school_statements(cache, await student_repo.list_school_ids_by_student_ids(unique_ids))
+
+
+async def invalidate_school_roster_statements(
+    cache: StatementCache | None, school_id: UUID, student_ids: Iterable[UUID]
+) -> None:
+    """Drop the statements of a school and of students already known to belong to it, without looking them up."""
+    if cache is None:
+        return
+    await _delete(cache, STUDENT_SCOPE, [student_statement_key(student_id) for student_id in sorted(set(student_ids))])
+    await invalidate_school_statements(cache, [school_id])
+
+
+async def invalidate_school_statements(cache: StatementCache | None, school_ids: Iterable[UUID]) -> None:
+    if cache is None:
+        return
+    await _delete(cache, SCHOOL_SCOPE, [school_statement_key(school_id) for school_id in sorted(set(school_ids))])
+
+
+def _new_generation(now: float) -> bytes:
+    return f"{uuid7().hex}-{now:.3f}".encode()
+
+
+def _minted_at(generation: bytes) -> float:
+    # Tokens written before they carried a timestamp came from primary-only fills, so they count as settled.
+    _, separator, minted_at = generation.rpartition(b"-")
+    return float(minted_at) if separator else 0.0
+
+
+def _entry_key(key: str, generation: bytes) -> str:
+    return f"{key}:{generation.decode()}"
+
+
+async def _delete(cache: StatementCache, scope: str, keys: list[str]) -> None:
+    if not keys:
+        return
+    await cache.delete_many(keys)
+    STATEMENT_CACHE_INVALIDATIONS_TOTAL.labels(scope=scope).inc(len(keys))
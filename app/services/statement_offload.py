@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass
+
+from app.domain.dtos import InvoiceDTO
+from app.schemas.statement import StatementTotals
+from app.services.statements import INVOICE_SUMMARIES_ADAPTER, InvoiceRow, invoice_row, summarize_invoice_rows
+
+
+@dataclass(frozen=True, slots=True)
+class StatementOffload:
+    """Builds the invoice summaries of large statements in worker processes instead of on the event loop."""
+
+    executor: Executor
+    min_invoices: int
+    chunk_invoices: int
+
+    def applies_to(self, invoice_count: int) -> bool:
+        """Whether a statement with this many invoices in total is built in the workers, all of its chunks."""
+        return invoice_count >= self.min_invoices
+
+    async def summarize(self, invoices: Sequence[InvoiceDTO]) -> list[tuple[bytes, StatementTotals]]:
+        # Chunks go out as plain tuples and come back in order as JSON arrays, which are spliced into the response
+        # as they are. The loop only builds each chunk's rows, yielding in between so other requests keep running.
+        loop = asyncio.get_running_loop()
+        pending = []
+        for start in range(0, len(invoices), self.chunk_invoices):
+            rows = [invoice_row(invoice) for invoice in invoices[start : start + self.chunk_invoices]]
+            pending.append(loop.run_in_executor(self.executor, encode_invoice_summaries, rows))
+            await asyncio.sleep(0)
+        return [await chunk for chunk in pending]
+
+
+def encode_invoice_summaries(rows: Sequence[InvoiceRow]) -> tuple[bytes, StatementTotals]:
+    # Runs in a worker, which also pays for encoding: the parent only copies the bytes into the response.
+    summaries, totals = summarize_invoice_rows(rows)
+    return INVOICE_SUMMARIES_ADAPTER.dump_json(summaries), totals
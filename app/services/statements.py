@@ -1,20 +1,44 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
 from uuid import UUID
 
+from pydantic import TypeAdapter
+
 from app.domain.dtos import InvoiceDTO, PaymentDTO, SchoolDTO, StudentDTO
-from app.schemas.statement import InvoiceSummary, SchoolStatement, StatementTotals, StudentStatement
-from app.services.billing_rules import ZERO, balance_due, net_paid_total, payments_total, refunds_total
+from app.domain.enums import InvoiceStatus
+from app.schemas.statement import (
+    InvoiceSummary,
+    SchoolStatement,
+    SchoolStatementTrailer,
+    StatementTotals,
+    StudentStatement,
+)
+from app.services.billing_rules import (
+    ZERO,
+    MovementTotals,
+    balance_due,
+    invoice_movement_totals,
+    movement_totals_by_invoice,
+)
 
+# The InvoiceDTO fields an invoice summary needs, as a plain tuple that is cheap to pickle to a worker process:
+# id, student_id, total_amount, due_date, description, payments_total, refunds_total, status.
+InvoiceRow = tuple[UUID, UUID, Decimal, date, str | None, Decimal, Decimal, InvoiceStatus]
 
-def build_student_statement(
-    student: StudentDTO,
-    invoices: list[InvoiceDTO],
-    payments: list[PaymentDTO],
-) -> StudentStatement:
-    payments_by_invoice = _group_payments_by_invoice(payments)
-    invoice_summaries = [_build_invoice_summary(invoice, payments_by_invoice[invoice.id]) for invoice in invoices]
+# Encodes invoice summaries exactly as they appear inside a serialized SchoolStatement.
+INVOICE_SUMMARIES_ADAPTER = TypeAdapter(list[InvoiceSummary])
+
+
+def encode_statement(statement: StudentStatement | SchoolStatement) -> bytes:
+    return statement.__pydantic_serializer__.to_json(statement)
+
+
+def build_student_statement(student: StudentDTO, invoices: list[InvoiceDTO]) -> StudentStatement:
+    invoice_summaries = [_build_invoice_summary(invoice, invoice_movement_totals(invoice)) for invoice in invoices]
 
     return StudentStatement(
         student_id=student.id,
@@ -28,10 +52,98 @@ def build_school_statement(
     school: SchoolDTO,
     students: list[StudentDTO],
     invoices: list[InvoiceDTO],
+) -> SchoolStatement:
+    accumulator = SchoolStatementAccumulator(school.id)
+    accumulator.add(students, invoices)
+    return accumulator.build()
+
+
+class SchoolStatementAccumulator:
+    """Folds a school statement one student chunk at a time, so callers never hold every student at once.
+
+    Summaries are kept per chunk, either as models or as the JSON array a worker process encoded them to.
+    `build_json` splices those arrays into the response without decoding them.
+    """
+
+    def __init__(self, school_id: UUID) -> None:
+        self._school_id = school_id
+        self._students_count = 0
+        self._chunks: list[list[InvoiceSummary] | bytes] = []
+        self._running = _RunningTotals()
+
+    def add(self, students: list[StudentDTO], invoices: list[InvoiceDTO]) -> None:
+        self._students_count += len(students)
+        summaries = []
+        for invoice in invoices:
+            summary = _build_invoice_summary(invoice, invoice_movement_totals(invoice))
+            self._running.add(summary)
+            summaries.append(summary)
+        self._chunks.append(summaries)
+
+    def add_encoded_summaries(self, encoded: bytes, totals: StatementTotals) -> None:
+        """Merge a JSON array of summaries built elsewhere (see `summarize_invoice_rows`) and its partial totals."""
+        self._chunks.append(encoded)
+        self._running.merge(totals)
+
+    def build(self) -> SchoolStatement:
+        return self._statement(
+            [
+                summary
+                for chunk in self._chunks
+                for summary in (INVOICE_SUMMARIES_ADAPTER.validate_json(chunk) if isinstance(chunk, bytes) else chunk)
+            ]
+        )
+
+    def build_json(self) -> bytes:
+        """Same bytes as `encode_statement(self.build())`, without decoding the encoded chunks."""
+        arrays = [
+            chunk if isinstance(chunk, bytes) else INVOICE_SUMMARIES_ADAPTER.dump_json(chunk) for chunk in self._chunks
+        ]
+        # `invoices` is the statement's last field, so its encoding ends with `[]}` when the list is empty.
+        head = encode_statement(self._statement([]))
+        parts: list[bytes | memoryview] = [memoryview(head)[: -len(b"]}")]]
+        for array in arrays:
+            if array == b"[]":
+                continue
+            if len(parts) > 1:
+                parts.append(b",")
+            # Views, so the tens of megabytes of summaries are copied once, by the join.
+            parts.append(memoryview(array)[1:-1])
+        parts.append(b"]}")
+        return b"".join(parts)
+
+    def _statement(self, summaries: list[InvoiceSummary]) -> SchoolStatement:
+        return SchoolStatement(
+            school_id=self._school_id,
+            students_count=self._students_count,
+            totals=self._running.to_totals(),
+            invoices=summaries,
+        )
+
+
+async def stream_school_statement(
+    school: SchoolDTO, students_count: int, invoices: AsyncIterable[InvoiceDTO]
+) -> AsyncIterator[InvoiceSummary | SchoolStatementTrailer]:
+    """Yield one summary per invoice as it arrives, then a trailer with the totals folded along the way."""
+    running = _RunningTotals()
+    async for invoice in invoices:
+        summary = _build_invoice_summary(invoice, invoice_movement_totals(invoice))
+        running.add(summary)
+        yield summary
+    yield SchoolStatementTrailer(school_id=school.id, students_count=students_count, totals=running.to_totals())
+
+
+def build_school_statement_from_payments(
+    school: SchoolDTO,
+    students: list[StudentDTO],
+    invoices: list[InvoiceDTO],
     payments: list[PaymentDTO],
 ) -> SchoolStatement:
-    payments_by_invoice = _group_payments_by_invoice(payments)
-    invoice_summaries = [_build_invoice_summary(invoice, payments_by_invoice[invoice.id]) for invoice in invoices]
+    # Reference path: ignores the stored running totals and re-sums raw movements in Python.
+    totals_by_invoice = movement_totals_by_invoice(payments)
+    invoice_summaries = [
+        _build_invoice_summary(invoice, totals_by_invoice.get(invoice.id, MovementTotals())) for invoice in invoices
+    ]
 
     return SchoolStatement(
         school_id=school.id,
@@ -41,38 +153,104 @@ def build_school_statement(
     )
 
 
-def _group_payments_by_invoice(payments: list[PaymentDTO]) -> dict[UUID, list[PaymentDTO]]:
-    grouped: dict[UUID, list[PaymentDTO]] = defaultdict(list)
-    for payment in payments:
-        grouped[payment.invoice_id].append(payment)
-    return grouped
+def invoice_row(invoice: InvoiceDTO) -> InvoiceRow:
+    return (
+        invoice.id,
+        invoice.student_id,
+        invoice.total_amount,
+        invoice.due_date,
+        invoice.description,
+        invoice.payments_total,
+        invoice.refunds_total,
+        invoice.status,
+    )
+
+
+def summarize_invoice_rows(rows: Sequence[InvoiceRow]) -> tuple[list[InvoiceSummary], StatementTotals]:
+    """Build summaries from stored running totals plus their partial totals; runs in worker processes."""
+    running = _RunningTotals()
+    summaries = []
+    for invoice_id, student_id, total_amount, due_date, description, paid_in, refunded, status in rows:
+        summary = _invoice_summary(
+            invoice_id, student_id, total_amount, due_date, description, MovementTotals(paid_in, refunded), status
+        )
+        running.add(summary)
+        summaries.append(summary)
+    return summaries, running.to_totals()
 
 
-def _build_invoice_summary(invoice: InvoiceDTO, payments: list[PaymentDTO]) -> InvoiceSummary:
-    summary_payments_total = payments_total(payments)
-    summary_refunds_total = refunds_total(payments)
-    summary_paid_total = net_paid_total(payments)
-    summary_balance_due = balance_due(invoice.total_amount, summary_paid_total)
+def _build_invoice_summary(invoice: InvoiceDTO, totals: MovementTotals) -> InvoiceSummary:
+    return _invoice_summary(
+        invoice.id,
+        invoice.student_id,
+        invoice.total_amount,
+        invoice.due_date,
+        invoice.description,
+        totals,
+        invoice.status,
+    )
+
+
+def _invoice_summary(
+    invoice_id: UUID,
+    student_id: UUID,
+    total_amount: Decimal,
+    due_date: date,
+    description: str | None,
+    totals: MovementTotals,
+    status: InvoiceStatus,
+) -> InvoiceSummary:
+    summary_paid_total = totals.net_paid
+    summary_balance_due = balance_due(total_amount, summary_paid_total)
 
     return InvoiceSummary(
-        id=invoice.id,
-        student_id=invoice.student_id,
-        total_amount=invoice.total_amount,
-        due_date=invoice.due_date,
-        description=invoice.description,
-        payments_total=summary_payments_total,
-        refunds_total=summary_refunds_total,
+        id=invoice_id,
+        student_id=student_id,
+        total_amount=total_amount,
+        due_date=due_date,
+        description=description,
+        payments_total=totals.payments_total,
+        refunds_total=totals.refunds_total,
         paid_total=summary_paid_total,
         balance_due=summary_balance_due,
-        status=invoice.status,
+        status=status,
     )
 
 
-def _statement_totals(invoice_summaries: list[InvoiceSummary]) -> StatementTotals:
-    return StatementTotals(
-        invoiced_total=sum((item.total_amount for item in invoice_summaries), start=ZERO),
-        payments_total=sum((item.payments_total for item in invoice_summaries), start=ZERO),
-        refunds_total=sum((item.refunds_total for item in invoice_summaries), start=ZERO),
-        paid_total=sum((item.paid_total for item in invoice_summaries), start=ZERO),
-        balance_due_total=sum((item.balance_due for item in invoice_summaries), start=ZERO),
-    )
+@dataclass(slots=True)
+class _RunningTotals:
+    invoiced_total: Decimal = ZERO
+    payments_total: Decimal = ZERO
+    refunds_total: Decimal = ZERO
+    paid_total: Decimal = ZERO
+    balance_due_total: Decimal = ZERO
+
+    def add(self, summary: InvoiceSummary) -> None:
+        self.invoiced_total += summary.total_amount
+        self.payments_total += summary.payments_total
+        self.refunds_total += summary.refunds_total
+        self.paid_total += summary.paid_total
+        self.balance_due_total += summary.balance_due
+
+    def merge(self, totals: StatementTotals) -> None:
+        self.invoiced_total += totals.invoiced_total
+        self.payments_total += totals.payments_total
+        self.refunds_total += totals.refunds_total
+        self.paid_total += totals.paid_total
+        self.balance_due_total += totals.balance_due_total
+
+    def to_totals(self) -> StatementTotals:
+        return StatementTotals(
+            invoiced_total=self.invoiced_total,
+            payments_total=self.payments_total,
+            refunds_total=self.refunds_total,
+            paid_total=self.paid_total,
+            balance_due_total=self.balance_due_total,
+        )
+
+
+def _statement_totals(invoice_summaries: Iterable[InvoiceSummary]) -> StatementTotals:
+    running = _RunningTotals()
+    for summary in invoice_summaries:
+        running.add(summary)
+    return running.to_totals()
@@ -6,15 +6,23 @@ from uuid import UUID
 from app.api.constants import STUDENTS
 from app.domain.dtos import StudentDTO
 from app.domain.errors import NotFoundError
-from app.services.ports import StudentRepo
+from app.services.ports import StatementCache, StudentRepo, UnitOfWork
+from app.services.statement_cache import invalidate_school_statements, invalidate_student_statements
 
 
-async def create_student(repo: StudentRepo, data: Mapping[str, object]) -> StudentDTO:
-    return await repo.create(data)
+async def create_student(
+    uow: UnitOfWork, data: Mapping[str, object], *, statement_cache: StatementCache | None = None
+) -> StudentDTO:
+    student = await uow.students.create(data)
+    await uow.commit()
+    await invalidate_school_statements(statement_cache, [student.school_id])
+    return student
 
 
-async def list_students(repo: StudentRepo, *, offset: int, limit: int) -> list[StudentDTO]:
-    return await repo.list_all(offset=offset, limit=limit)
+async def list_students(
+    repo: StudentRepo, *, offset: int, limit: int, after_id: UUID | None = None
+) -> list[StudentDTO]:
+    return await repo.list_all(offset=offset, limit=limit, after_id=after_id)
 
 
 async def list_students_by_school_id(repo: StudentRepo, school_id: UUID, offset: int, limit: int) -> list[StudentDTO]:
@@ -28,15 +36,33 @@ async def get_student_by_id(repo: StudentRepo, student_id: UUID) -> StudentDTO:
     return student
 
 
-async def update_student(repo: StudentRepo, student_id: UUID, data: Mapping[str, object]) -> StudentDTO:
-    student = await repo.update(student_id, data)
+async def update_student(
+    uow: UnitOfWork,
+    student_id: UUID,
+    data: Mapping[str, object],
+    *,
+    statement_cache: StatementCache | None = None,
+) -> StudentDTO:
+    previous = await uow.students.get_by_id(student_id) if statement_cache is not None else None
+    student = await uow.students.update(student_id, data)
     if student is None:
         raise NotFoundError(STUDENTS, str(student_id))
+    await uow.commit()
+    if previous is not None:
+        # A school move changes the old school's statement as well as the new one.
+        await invalidate_school_statements(statement_cache, [previous.school_id])
+    await invalidate_student_statements(statement_cache, uow.students, [student_id])
     return student
 
 
-async def delete_student(repo: StudentRepo, student_id: UUID) -> bool:
-    deleted = await repo.delete(student_id)
+async def delete_student(uow: UnitOfWork, student_id: UUID, *, statement_cache: StatementCache | None = None) -> bool:
+    # Resolve the school before the row is gone so its cached statement can be invalidated.
+    student = await uow.students.get_by_id(student_id) if statement_cache is not None else None
+    deleted = await uow.students.delete(student_id)
     if not deleted:
         raise NotFoundError(STUDENTS, str(student_id))
+    await uow.commit()
+    if student is not None:
+        await invalidate_student_statements(statement_cache, uow.students, [student_id])
+        await invalidate_school_statements(statement_cache, [student.school_id])
     return deleted
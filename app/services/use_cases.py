@@ -1,56 +1,155 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import date
 from uuid import UUID
 
 from app.api.constants import INVOICES, SCHOOLS, STUDENTS
-from app.domain.dtos import PaymentDTO
+from app.domain.dtos import InvoiceDTO, PaymentDTO, SchoolDTO, StudentDTO
 from app.domain.errors import NotFoundError
-from app.schemas.statement import SchoolStatement, StudentStatement
-from app.services.ports import InvoiceRepo, PaymentRepo, SchoolRepo, StudentRepo
-from app.services.statements import build_school_statement, build_student_statement
+from app.schemas.aging import AgingReport, SchoolAging
+from app.schemas.statement import InvoiceSummary, SchoolStatement, SchoolStatementTrailer, StudentStatement
+from app.services.aging import aging_as_of, build_aging_report, build_school_aging
+from app.services.ports import InvoiceRepo, PaymentRepo, SchoolRepo, StatementRepos, StatementReposFactory, StudentRepo
+from app.services.statement_offload import StatementOffload
+from app.services.statements import (
+    SchoolStatementAccumulator,
+    build_student_statement,
+    encode_statement,
+    stream_school_statement,
+)
+
+# Statements leave the service layer as encoded JSON, so a cache hit is returned without a decode/encode round trip.
+StatementJSONQuery = Callable[[UUID], Awaitable[bytes]]
 
 
 class GetStudentStatement:
-    def __init__(self, student_repo: StudentRepo, invoice_repo: InvoiceRepo, payment_repo: PaymentRepo) -> None:
-        self._student_repo = student_repo
-        self._invoice_repo = invoice_repo
-        self._payment_repo = payment_repo
+    """Looks up the student and its invoices concurrently, each on its own session from `repos`."""
+
+    def __init__(self, repos: StatementReposFactory, *, max_concurrency: int = 4) -> None:
+        self._repos = repos
+        self._max_concurrency = max_concurrency
 
     async def __call__(self, student_id: UUID) -> StudentStatement:
-        student = await self._student_repo.get_by_id(student_id)
+        limit = asyncio.Semaphore(self._max_concurrency)
+
+        async def get_student() -> StudentDTO | None:
+            async with _bounded(self._repos, limit) as repos:
+                return await repos.students.get_by_id(student_id)
+
+        async def list_invoices() -> list[InvoiceDTO]:
+            async with _bounded(self._repos, limit) as repos:
+                return await repos.invoices.list_by_student_id(student_id)
+
+        async with asyncio.TaskGroup() as tasks:
+            student_task = tasks.create_task(get_student())
+            invoices_task = tasks.create_task(list_invoices())
+
+        student = student_task.result()
         if student is None:
             raise NotFoundError(STUDENTS, str(student_id))
+        return build_student_statement(student, invoices_task.result())
 
-        invoices = await self._invoice_repo.list_by_student_id(student.id)
-        invoice_ids = [invoice.id for invoice in invoices]
-        payments = await self._payment_repo.list_by_invoice_ids(invoice_ids)
-        return build_student_statement(student, invoices, payments)
+    async def json(self, student_id: UUID) -> bytes:
+        return encode_statement(await self(student_id))
 
 
 class GetSchoolStatement:
+    """Pipelines a school statement: while student chunks are paged on one session, the school lookup and each
+    chunk's invoice query run on sessions of their own, at most `max_concurrency` at a time per call. Chunks are
+    folded in order as their queries finish, so at most `max_concurrency` chunks are held at once. When the school
+    has enough invoices for `offload` (counted up front, alongside the school lookup), every chunk builds its
+    summaries in worker processes, keeping the event loop free."""
+
     def __init__(
         self,
-        school_repo: SchoolRepo,
-        student_repo: StudentRepo,
-        invoice_repo: InvoiceRepo,
-        payment_repo: PaymentRepo,
+        repos: StatementReposFactory,
+        *,
+        chunk_size: int = 500,
+        max_concurrency: int = 4,
+        offload: StatementOffload | None = None,
     ) -> None:
+        if max_concurrency < 2:
+            # One session stays open paging students while the oldest chunk's invoice query needs another.
+            raise ValueError("max_concurrency must be at least 2")
+        self._repos = repos
+        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
+        self._offload = offload
+
+    async def __call__(self, school_id: UUID) -> SchoolStatement:
+        return (await self._fold(school_id)).build()
+
+    async def json(self, school_id: UUID) -> bytes:
+        # Chunks summarized in worker processes stay encoded all the way into the response and the cache entry.
+        return (await self._fold(school_id)).build_json()
+
+    async def _fold(self, school_id: UUID) -> SchoolStatementAccumulator:
+        limit = asyncio.Semaphore(self._max_concurrency)
+
+        async def get_school() -> SchoolDTO | None:
+            async with _bounded(self._repos, limit) as repos:
+                return await repos.schools.get_by_id(school_id)
+
+        async def list_invoices(student_ids: list[UUID]) -> list[InvoiceDTO]:
+            async with _bounded(self._repos, limit) as repos:
+                return await repos.invoices.list_by_student_ids(student_ids)
+
+        offload = self._offload
+
+        async def is_large() -> bool:
+            if offload is None:
+                return False
+            async with _bounded(self._repos, limit) as repos:
+                return offload.applies_to(await repos.invoices.count_by_school_id(school_id))
+
+        accumulator = SchoolStatementAccumulator(school_id)
+
+        async def fold_oldest() -> None:
+            students, invoices_task = pending.popleft()
+            invoices = await invoices_task
+            if offload is None or not await large_task:
+                accumulator.add(students, invoices)
+                return
+            accumulator.add(students, [])
+            for encoded, totals in await offload.summarize(invoices):
+                accumulator.add_encoded_summaries(encoded, totals)
+
+        pending: deque[tuple[list[StudentDTO], asyncio.Task[list[InvoiceDTO]]]] = deque()
+        async with asyncio.TaskGroup() as tasks:
+            school_task = tasks.create_task(get_school())
+            large_task = tasks.create_task(is_large())
+            async with _bounded(self._repos, limit) as repos:
+                async for students in repos.students.iter_by_school_id(school_id, chunk_size=self._chunk_size):
+                    pending.append((students, tasks.create_task(list_invoices([student.id for student in students]))))
+                    # The chunk being paged counts too: fold the oldest before paging further.
+                    if len(pending) >= self._max_concurrency:
+                        await fold_oldest()
+            while pending:
+                await fold_oldest()
+
+        if school_task.result() is None:
+            raise NotFoundError(SCHOOLS, str(school_id))
+        return accumulator
+
+
+class StreamSchoolStatement:
+    def __init__(self, school_repo: SchoolRepo, student_repo: StudentRepo, invoice_repo: InvoiceRepo) -> None:
         self._school_repo = school_repo
         self._student_repo = student_repo
         self._invoice_repo = invoice_repo
-        self._payment_repo = payment_repo
 
-    async def __call__(self, school_id: UUID) -> SchoolStatement:
+    async def __call__(self, school_id: UUID) -> AsyncIterator[InvoiceSummary | SchoolStatementTrailer]:
+        # Lookups that can fail run here, before the caller starts a response; only the invoice scan is deferred.
         school = await self._school_repo.get_by_id(school_id)
         if school is None:
             raise NotFoundError(SCHOOLS, str(school_id))
 
-        students = await self._student_repo.list_by_school_id(school.id)
-        student_ids = [student.id for student in students]
-        invoices = await self._invoice_repo.list_by_student_ids(student_ids)
-        invoice_ids = [invoice.id for invoice in invoices]
-        payments = await self._payment_repo.list_by_invoice_ids(invoice_ids)
-        return build_school_statement(school, students, invoices, payments)
+        students_count = await self._student_repo.count_by_school_id(school.id)
+        return stream_school_statement(school, students_count, self._invoice_repo.stream_by_school_id(school.id))
 
 
 class ListInvoicePayments:
@@ -63,3 +162,34 @@ class ListInvoicePayments:
         if invoice is None:
             raise NotFoundError(INVOICES, str(invoice_id))
         return await self._payment_repo.list_by_invoice_id(invoice_id)
+
+
+class GetSchoolAging:
+    def __init__(self, school_repo: SchoolRepo, invoice_repo: InvoiceRepo) -> None:
+        self._school_repo = school_repo
+        self._invoice_repo = invoice_repo
+
+    async def __call__(self, school_id: UUID, as_of: date | None = None) -> SchoolAging:
+        school = await self._school_repo.get_by_id(school_id)
+        if school is None:
+            raise NotFoundError(SCHOOLS, str(school_id))
+        day = aging_as_of(as_of)
+        return build_school_aging(
+            school_id, day, await self._invoice_repo.aging_by_school(as_of=day, school_id=school_id)
+        )
+
+
+class GetAgingReport:
+    def __init__(self, invoice_repo: InvoiceRepo) -> None:
+        self._invoice_repo = invoice_repo
+
+    async def __call__(self, as_of: date | None = None) -> AgingReport:
+        day = aging_as_of(as_of)
+        return build_aging_report(day, await self._invoice_repo.aging_by_school(as_of=day))
+
+
+@asynccontextmanager
+async def _bounded(repos: StatementReposFactory, limit: asyncio.Semaphore) -> AsyncIterator[StatementRepos]:
+    # The slot is taken before the session is opened, so a call never holds more than `limit` pooled connections.
+    async with limit, repos() as opened:
+        yield opened
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from uuid_extensions import uuid7
+
+from app.domain.dtos import InvoiceDTO, PaymentDTO, SchoolDTO, StudentDTO
+from app.domain.enums import InvoiceStatus, PaymentKind
+from app.services.billing_rules import ZERO, MovementTotals, movement_totals_by_invoice
+from app.services.statements import build_school_statement_from_payments
+
+CENTS = Decimal(100)
+
+
+@dataclass(frozen=True, slots=True)
+class FoldResult:
+    name: str
+    movements: int
+    best_seconds: float
+
+
+def two_pass_totals(payments: list[PaymentDTO]) -> dict[UUID, MovementTotals]:
+    # The previous fold: group movements into per-invoice lists, then walk each list once for payments and once for
+    # refunds.
+    grouped: dict[UUID, list[PaymentDTO]] = defaultdict(list)
+    for payment in payments:
+        grouped[payment.invoice_id].append(payment)
+    totals: dict[UUID, MovementTotals] = {}
+    for invoice_id, invoice_payments in grouped.items():
+        paid = ZERO
+        for payment in invoice_payments:
+            if payment.kind == PaymentKind.PAYMENT:
+                paid += payment.amount
+        refunded = ZERO
+        for payment in invoice_payments:
+            if payment.kind == PaymentKind.REFUND:
+                refunded += payment.amount
+        totals[invoice_id] = MovementTotals(paid, refunded)
+    return totals
+
+
+def integer_cents_totals(payments: list[PaymentDTO]) -> dict[UUID, MovementTotals]:
+    # The same single pass over integer cents. Amounts arrive as Decimal, so every movement pays a conversion that
+    # costs more than the Decimal addition it replaces.
+    running: dict[UUID, list[int]] = {}
+    for payment in payments:
+        totals = running.get(payment.invoice_id)
+        if totals is None:
+            totals = running[payment.invoice_id] = [0, 0]
+        cents = int(payment.amount * CENTS)
+        if payment.kind == PaymentKind.REFUND:
+            totals[1] += cents
+        else:
+            totals[0] += cents
+    return {
+        invoice_id: MovementTotals(Decimal(paid).scaleb(-2), Decimal(refunded).scaleb(-2))
+        for invoice_id, (paid, refunded) in running.items()
+    }
+
+
+def make_statement_inputs(
+    *, movements: int, invoices: int, students: int
+) -> tuple[SchoolDTO, list[StudentDTO], list[InvoiceDTO], list[PaymentDTO]]:
+    rng = random.Random(0)
+    school = SchoolDTO(id=uuid7(), name="Totals Academy")
+    student_rows = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {i}") for i in range(students)]
+    invoice_rows = [
+        InvoiceDTO(
+            id=uuid7(),
+            student_id=student_rows[index % students].id,
+            total_amount=Decimal("10000.00"),
+            due_date=date(2026, 3, 1),
+            issued_at=datetime(2026, 2, 1),
+            status=InvoiceStatus.PARTIAL,
+        )
+        for index in range(invoices)
+    ]
+    payment_rows = [
+        PaymentDTO(
+            id=uuid7(),
+            invoice_id=rng.choice(invoice_rows).id,
+            amount=Decimal(rng.randrange(1, 10_000)).scaleb(-2),
+            kind=PaymentKind.REFUND if rng.random() < 0.1 else PaymentKind.PAYMENT,
+        )
+        for _ in range(movements)
+    ]
+    return school, student_rows, invoice_rows, payment_rows
+
+
+def best_of(name: str, fold: Callable[[], Any], *, movements: int, repeat: int) -> FoldResult:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fold()
+        best = min(best, time.perf_counter() - started)
+    return FoldResult(name=name, movements=movements, best_seconds=best)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Statement totals fold: two-pass vs single-pass, Decimal vs cents.")
+    parser.add_argument("--movements", type=int, default=100_000)
+    parser.add_argument("--invoices", type=int, default=20_000)
+    parser.add_argument("--students", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    school, students, invoices, payments = make_statement_inputs(
+        movements=args.movements, invoices=args.invoices, students=args.students
+    )
+    assert two_pass_totals(payments) == integer_cents_totals(payments) == movement_totals_by_invoice(payments)
+
+    results = [
+        best_of("two-pass decimal", lambda: two_pass_totals(payments), movements=args.movements, repeat=args.repeat),
+        best_of("one-pass cents", lambda: integer_cents_totals(payments), movements=args.movements, repeat=args.repeat),
+        best_of(
+            "one-pass decimal",
+            lambda: movement_totals_by_invoice(payments),
+            movements=args.movements,
+            repeat=args.repeat,
+        ),
+        best_of(
+            "full statement",
+            lambda: build_school_statement_from_payments(school, students, invoices, payments),
+            movements=args.movements,
+            repeat=args.repeat,
+        ),
+    ]
+    for result in results:
+        print(f"{result.name:<18} movements={result.movements:<7} best={result.best_seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from uuid_extensions import uuid7
+
+from app.domain.dtos import InvoiceDTO, PaymentDTO, SchoolDTO, StudentDTO
+from app.domain.enums import InvoiceStatus, PaymentKind
+from app.services.columnar_statements import ColumnarStatementEngine
+from app.services.statements import build_school_statement_from_payments
+
+
+@dataclass(frozen=True, slots=True)
+class EngineResult:
+    name: str
+    movements: int
+    best_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class ReportInputs:
+    schools: list[SchoolDTO]
+    students: list[StudentDTO]
+    invoices: list[InvoiceDTO]
+    payments: list[PaymentDTO]
+
+
+def make_inputs(*, schools: int, students: int, invoices: int, movements: int) -> ReportInputs:
+    rng = random.Random(0)
+    school_rows = [SchoolDTO(id=uuid7(), name=f"School {index}") for index in range(schools)]
+    student_rows = [
+        StudentDTO(id=uuid7(), school_id=school_rows[index % schools].id, full_name=f"Student {index}")
+        for index in range(students)
+    ]
+    invoice_rows = [
+        InvoiceDTO(
+            id=uuid7(),
+            student_id=rng.choice(student_rows).id,
+            total_amount=Decimal("10000.00"),
+            due_date=date(2026, 3, 1),
+            issued_at=datetime(2026, 2, 1),
+            status=InvoiceStatus.PARTIAL,
+        )
+        for _ in range(invoices)
+    ]
+    payment_rows = [
+        PaymentDTO(
+            id=uuid7(),
+            invoice_id=rng.choice(invoice_rows).id,
+            amount=Decimal(rng.randrange(1, 10_000)).scaleb(-2),
+            kind=PaymentKind.REFUND if rng.random() < 0.1 else PaymentKind.PAYMENT,
+        )
+        for _ in range(movements)
+    ]
+    return ReportInputs(schools=school_rows, students=student_rows, invoices=invoice_rows, payments=payment_rows)
+
+
+def per_object_report(inputs: ReportInputs) -> list[Any]:
+    # What a nightly job does today: partition by school, then run the per-object reference builder per school.
+    students_by_school: dict[UUID, list[StudentDTO]] = defaultdict(list)
+    for student in inputs.students:
+        students_by_school[student.school_id].append(student)
+    school_of_student = {student.id: student.school_id for student in inputs.students}
+    invoices_by_school: dict[UUID, list[InvoiceDTO]] = defaultdict(list)
+    for invoice in inputs.invoices:
+        invoices_by_school[school_of_student[invoice.student_id]].append(invoice)
+    school_of_invoice = {invoice.id: school_of_student[invoice.student_id] for invoice in inputs.invoices}
+    payments_by_school: dict[UUID, list[PaymentDTO]] = defaultdict(list)
+    for payment in inputs.payments:
+        payments_by_school[school_of_invoice[payment.invoice_id]].append(payment)
+    return [
+        build_school_statement_from_payments(
+            school, students_by_school[school.id], invoices_by_school[school.id], payments_by_school[school.id]
+        )
+        for school in inputs.schools
+    ]
+
+
+def columnar_report(inputs: ReportInputs) -> list[Any]:
+    engine = ColumnarStatementEngine(inputs.students, inputs.invoices, inputs.payments)
+    return [engine.school_statement(school.id) for school in inputs.schools]
+
+
+def columnar_totals(inputs: ReportInputs) -> list[Any]:
+    engine = ColumnarStatementEngine(inputs.students, inputs.invoices, inputs.payments)
+    return [engine.school_totals(), engine.student_totals()]
+
+
+def best_of(
+    name: str, report: Callable[[ReportInputs], list[Any]], inputs: ReportInputs, *, repeat: int
+) -> EngineResult:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        report(inputs)
+        best = min(best, time.perf_counter() - started)
+    return EngineResult(name=name, movements=len(inputs.payments), best_seconds=best)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk school statements: per-object builders vs the columnar engine.")
+    parser.add_argument("--schools", type=int, default=20)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--invoices", type=int, default=200_000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = make_inputs(schools=args.schools, students=args.students, invoices=args.invoices, movements=args.movements)
+    assert per_object_report(inputs) == columnar_report(inputs)
+
+    for result in (
+        best_of("per-object statements", per_object_report, inputs, repeat=args.repeat),
+        best_of("columnar statements", columnar_report, inputs, repeat=args.repeat),
+        best_of("columnar totals only", columnar_totals, inputs, repeat=args.repeat),
+    ):
+        print(f"{result.name:<24} movements={result.movements:<8} best={result.best_seconds:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
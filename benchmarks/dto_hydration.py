@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from uuid_extensions import uuid7
+
+from app.dal.repos.sqlalchemy_invoice_repo import SQLAlchemyInvoiceRepo
+from app.dal.repos.sqlalchemy_payment_repo import SQLAlchemyPaymentRepo
+from app.db.base import Base
+from app.domain.dtos import InvoiceDTO, PaymentDTO
+from app.domain.enums import InvoiceStatus, PaymentKind
+from app.models import Invoice, Payment, School, Student
+
+
+@dataclass(frozen=True, slots=True)
+class HydrationResult:
+    name: str
+    rows: int
+    best_seconds: float
+
+    @property
+    def microseconds_per_row(self) -> float:
+        return self.best_seconds / self.rows * 1_000_000
+
+
+async def orm_invoices(session: AsyncSession, student_id: Any) -> list[InvoiceDTO]:
+    # The previous repo path: hydrate ORM instances, then copy each one into a DTO.
+    invoices = await session.scalars(select(Invoice).where(Invoice.student_id == student_id))
+    return [
+        InvoiceDTO(
+            id=invoice.id,
+            student_id=invoice.student_id,
+            total_amount=invoice.total_amount,
+            due_date=invoice.due_date,
+            issued_at=invoice.issued_at,
+            status=invoice.status,
+            payments_total=invoice.payments_total,
+            refunds_total=invoice.refunds_total,
+            description=invoice.description,
+            created_at=invoice.created_at,
+            updated_at=invoice.updated_at,
+        )
+        for invoice in invoices
+    ]
+
+
+async def orm_payments(session: AsyncSession, invoice_ids: list[Any]) -> list[PaymentDTO]:
+    payments = await session.scalars(select(Payment).where(Payment.invoice_id.in_(invoice_ids)))
+    return [
+        PaymentDTO(
+            id=payment.id,
+            invoice_id=payment.invoice_id,
+            amount=payment.amount,
+            kind=payment.kind,
+            paid_at=payment.paid_at,
+            method=payment.method,
+            reference=payment.reference,
+            created_at=payment.created_at,
+            updated_at=payment.updated_at,
+        )
+        for payment in payments
+    ]
+
+
+async def seed(session_maker: async_sessionmaker[AsyncSession], rows: int) -> tuple[Any, list[Any]]:
+    school_id, student_id = uuid7(), uuid7()
+    invoice_ids = [uuid7() for _ in range(rows)]
+    async with session_maker() as session:
+        await session.execute(insert(School).values(id=school_id, name="Hydration Academy"))
+        await session.execute(insert(Student).values(id=student_id, school_id=school_id, full_name="Hydration"))
+        await session.execute(
+            insert(Invoice),
+            [
+                {
+                    "id": invoice_id,
+                    "student_id": student_id,
+                    "total_amount": Decimal("100.00"),
+                    "due_date": date(2026, 3, 1),
+                    "status": InvoiceStatus.PARTIAL,
+                    "payments_total": Decimal("10.00"),
+                }
+                for invoice_id in invoice_ids
+            ],
+        )
+        await session.execute(
+            insert(Payment),
+            [
+                {"invoice_id": invoice_id, "amount": Decimal("10.00"), "kind": PaymentKind.PAYMENT, "method": "card"}
+                for invoice_id in invoice_ids
+            ],
+        )
+        await session.commit()
+    return student_id, invoice_ids
+
+
+async def best_of(
+    session_maker: async_sessionmaker[AsyncSession],
+    name: str,
+    load: Callable[[AsyncSession], Awaitable[list[Any]]],
+    *,
+    repeat: int,
+) -> HydrationResult:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        # A fresh session per run, so the ORM path never reuses instances from its identity map.
+        async with session_maker() as session:
+            started = time.perf_counter()
+            rows = len(await load(session))
+            best = min(best, time.perf_counter() - started)
+    return HydrationResult(name=name, rows=rows, best_seconds=best)
+
+
+async def run_benchmark(database_url: str, *, rows: int, repeat: int) -> list[HydrationResult]:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        student_id, invoice_ids = await seed(session_maker, rows)
+        return [
+            await best_of(session_maker, "invoices orm", lambda s: orm_invoices(s, student_id), repeat=repeat),
+            await best_of(
+                session_maker,
+                "invoices core",
+                lambda s: SQLAlchemyInvoiceRepo(s).list_by_student_id(student_id),
+                repeat=repeat,
+            ),
+            await best_of(session_maker, "payments orm", lambda s: orm_payments(s, invoice_ids), repeat=repeat),
+            await best_of(
+                session_maker,
+                "payments core",
+                lambda s: SQLAlchemyPaymentRepo(s).list_by_invoice_ids(invoice_ids),
+                repeat=repeat,
+            ),
+        ]
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ORM vs Core-row hydration of invoice and payment DTOs.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite+aiosqlite:///{Path(directory) / 'hydration.db'}"
+        results = asyncio.run(run_benchmark(database_url, rows=args.rows, repeat=args.repeat))
+    for result in results:
+        print(
+            f"{result.name:<14} rows={result.rows:<6} best={result.best_seconds * 1000:8.1f} ms "
+            f"{result.microseconds_per_row:6.2f} us/row"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request, Response
+from prometheus_client import REGISTRY
+from starlette.types import ASGIApp, Message
+from uuid_extensions import uuid7
+
+from app.core.observability import (
+    HTTP_REQUEST_DURATION_SECONDS,
+    HTTP_REQUESTS_TOTAL,
+    RequestObservabilityMiddleware,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class VariantResult:
+    name: str
+    requests: int
+    elapsed_seconds: float
+    new_series: int
+
+    @property
+    def microseconds_per_request(self) -> float:
+        return self.elapsed_seconds / self.requests * 1_000_000
+
+
+async def base_http_middleware(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    # The previous `app.middleware("http")` implementation, labelling metrics with the raw URL path.
+    request_id = request.headers.get("x-request-id", str(uuid7()))
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    path = request.url.path
+    HTTP_REQUESTS_TOTAL.labels(method=request.method, path=path, status=str(response.status_code)).inc()
+    HTTP_REQUEST_DURATION_SECONDS.labels(method=request.method, path=path).observe(elapsed)
+    logging.getLogger("app.request").info("request", extra={"request_id": request_id, "path": path})
+    response.headers["x-request-id"] = request_id
+    return response
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str) -> dict[str, str]:
+        return {"id": item_id}
+
+    if variant == "base_http":
+        app.middleware("http")(base_http_middleware)
+    elif variant == "pure_asgi":
+        app.add_middleware(RequestObservabilityMiddleware)
+    return app
+
+
+async def drive(app: ASGIApp, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: Message) -> None:
+        return None
+
+    await app(scope, receive, send)
+
+
+def _series_count() -> int:
+    return sum(len(metric.samples) for metric in REGISTRY.collect() if metric.name.startswith("http_request"))
+
+
+async def run_variant(name: str, *, requests: int, warmup: int) -> VariantResult:
+    app = build_app(name)
+    paths = [f"/items/{uuid7()}" for _ in range(warmup + requests)]
+    for path in paths[:warmup]:
+        await drive(app, path)
+
+    series_before = _series_count()
+    started = time.perf_counter()
+    for path in paths[warmup:]:
+        await drive(app, path)
+    elapsed = time.perf_counter() - started
+    return VariantResult(
+        name=name, requests=requests, elapsed_seconds=elapsed, new_series=_series_count() - series_before
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request overhead of the request observability middleware.")
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--warmup", type=int, default=500)
+    args = parser.parse_args()
+
+    # Measure middleware cost, not log handler I/O.
+    logging.getLogger("app.request").disabled = True
+
+    async def _run() -> list[VariantResult]:
+        return [
+            await run_variant(name, requests=args.requests, warmup=args.warmup)
+            for name in ("none", "base_http", "pure_asgi")
+        ]
+
+    results = asyncio.run(_run())
+    baseline = results[0].microseconds_per_request
+    for result in results:
+        print(
+            f"{result.name:<10} {result.microseconds_per_request:8.1f} us/request "
+            f"overhead={result.microseconds_per_request - baseline:7.1f} us new_metric_samples={result.new_series}"
+        )
+
+
+if __name__ == "__main__":
+    main()
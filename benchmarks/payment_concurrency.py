@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.settings import settings
+from app.dal.payment import sum_payments_by_invoice_ids
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.domain.errors import ConflictError
+from app.services import invoices as invoice_service
+from app.services import payments as payment_service
+from app.services import schools as school_service
+from app.services import students as student_service
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkResult:
+    accepted: int
+    rejected: int
+    elapsed_seconds: float
+    invoice_total: Decimal
+    stored_payments_total: Decimal
+    recomputed_payments_total: Decimal
+
+    @property
+    def consistent(self) -> bool:
+        return (
+            self.stored_payments_total == self.recomputed_payments_total
+            and self.stored_payments_total <= self.invoice_total
+        )
+
+
+async def run_benchmark(
+    engine: AsyncEngine, *, tasks: int, posts_per_task: int, amount: Decimal, invoice_total: Decimal
+) -> BenchmarkResult:
+    session_maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    invoice_id = await _create_target_invoice(session_maker, invoice_total)
+
+    async def post_payments() -> tuple[int, int]:
+        accepted = rejected = 0
+        for _ in range(posts_per_task):
+            async with session_maker() as session:
+                try:
+                    await payment_service.create_payment(
+                        SQLAlchemyUnitOfWork(session), {"invoice_id": invoice_id, "amount": amount}
+                    )
+                    accepted += 1
+                except ConflictError:
+                    rejected += 1
+        return accepted, rejected
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(post_payments() for _ in range(tasks)))
+    elapsed = time.perf_counter() - started
+
+    async with session_maker() as session:
+        uow = SQLAlchemyUnitOfWork(session)
+        invoice = await uow.invoices.get_by_id(invoice_id)
+        assert invoice is not None
+        recomputed = await sum_payments_by_invoice_ids(session, invoice_ids=[invoice_id])
+
+    return BenchmarkResult(
+        accepted=sum(accepted for accepted, _ in outcomes),
+        rejected=sum(rejected for _, rejected in outcomes),
+        elapsed_seconds=elapsed,
+        invoice_total=invoice.total_amount,
+        stored_payments_total=invoice.payments_total,
+        recomputed_payments_total=recomputed[0][1] if recomputed else Decimal("0.00"),
+    )
+
+
+async def _create_target_invoice(session_maker: async_sessionmaker[AsyncSession], invoice_total: Decimal) -> UUID:
+    async with session_maker() as session:
+        uow = SQLAlchemyUnitOfWork(session)
+        school = await school_service.create_school(uow, {"name": "Benchmark School"})
+        student = await student_service.create_student(uow, {"school_id": school.id, "full_name": "Benchmark Student"})
+        invoice = await invoice_service.create_invoice(
+            uow,
+            {
+                "student_id": student.id,
+                "total_amount": invoice_total,
+                "due_date": date.today(),
+                "description": "payment concurrency benchmark",
+            },
+        )
+    return invoice.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hammer one invoice with concurrent payment posts.")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--posts-per-task", type=int, default=20)
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1.00"))
+    parser.add_argument("--invoice-total", type=Decimal, default=Decimal("500.00"))
+    args = parser.parse_args()
+
+    async def _run() -> BenchmarkResult:
+        engine = create_async_engine(args.database_url, pool_size=args.tasks, max_overflow=0)
+        try:
+            return await run_benchmark(
+                engine,
+                tasks=args.tasks,
+                posts_per_task=args.posts_per_task,
+                amount=args.amount,
+                invoice_total=args.invoice_total,
+            )
+        finally:
+            await engine.dispose()
+
+    result = asyncio.run(_run())
+    attempts = result.accepted + result.rejected
+    print(f"attempts={attempts} accepted={result.accepted} rejected={result.rejected}")
+    print(f"elapsed={result.elapsed_seconds:.3f}s throughput={attempts / result.elapsed_seconds:.1f} posts/s")
+    print(
+        f"invoice_total={result.invoice_total} stored_payments_total={result.stored_payments_total} "
+        f"recomputed_payments_total={result.recomputed_payments_total} consistent={result.consistent}"
+    )
+    if not result.consistent:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
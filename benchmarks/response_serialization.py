@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi import FastAPI, Response
+from pydantic import TypeAdapter
+from uuid_extensions import uuid7
+
+from app.api.serialization import INVOICE_LIST_ADAPTER, list_response, model_response
+from app.domain.dtos import InvoiceDTO, StudentDTO
+from app.domain.enums import InvoiceStatus
+from app.schemas import InvoiceRead, StudentStatement
+from app.services.invoices import serialize_invoice_with_totals
+from app.services.statements import build_student_statement
+from benchmarks.middleware_overhead import drive
+
+# Statement routes return bytes the use case already encoded; this adapter is only the fast path's stand-in here.
+STUDENT_STATEMENT_ADAPTER = TypeAdapter(StudentStatement)
+
+
+@dataclass(frozen=True, slots=True)
+class RouteResult:
+    name: str
+    requests: int
+    elapsed_seconds: float
+
+    @property
+    def milliseconds_per_request(self) -> float:
+        return self.elapsed_seconds / self.requests * 1000
+
+
+def make_invoices(count: int, student_id: UUID) -> list[InvoiceDTO]:
+    return [
+        InvoiceDTO(
+            id=uuid7(),
+            student_id=student_id,
+            total_amount=Decimal("100.00"),
+            due_date=date(2026, 3, 1),
+            issued_at=datetime(2026, 2, 1),
+            status=InvoiceStatus.PARTIAL,
+            payments_total=Decimal("30.00"),
+            refunds_total=Decimal("5.00"),
+            description=f"Invoice {index}",
+            created_at=datetime(2026, 2, 1),
+            updated_at=datetime(2026, 2, 1),
+        )
+        for index in range(count)
+    ]
+
+
+def build_app(*, page_size: int, statement_size: int) -> FastAPI:
+    student = StudentDTO(id=uuid7(), school_id=uuid7(), full_name="Benchmark Student")
+    page = [serialize_invoice_with_totals(invoice) for invoice in make_invoices(page_size, student.id)]
+    statement = build_student_statement(student, make_invoices(statement_size, student.id))
+    app = FastAPI()
+
+    # The previous route shape: validate each item, then let response_model validate and encode the list again.
+    @app.get("/legacy/invoices", response_model=list[InvoiceRead])
+    async def legacy_invoices() -> list[InvoiceRead]:
+        return [InvoiceRead.model_validate(invoice) for invoice in page]
+
+    @app.get("/fast/invoices", response_model=list[InvoiceRead])
+    async def fast_invoices() -> Response:
+        return list_response(INVOICE_LIST_ADAPTER, page)
+
+    @app.get("/legacy/statement", response_model=StudentStatement)
+    async def legacy_statement() -> StudentStatement:
+        return statement
+
+    @app.get("/fast/statement", response_model=StudentStatement)
+    async def fast_statement() -> Response:
+        return model_response(STUDENT_STATEMENT_ADAPTER, statement)
+
+    return app
+
+
+async def run_route(app: FastAPI, path: str, *, requests: int, warmup: int) -> RouteResult:
+    for _ in range(warmup):
+        await drive(app, path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await drive(app, path)
+    return RouteResult(name=path, requests=requests, elapsed_seconds=time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response build time: per-item validation vs prebuilt TypeAdapters.")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--statement-invoices", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    args = parser.parse_args()
+
+    app = build_app(page_size=args.page_size, statement_size=args.statement_invoices)
+
+    async def _run() -> list[RouteResult]:
+        return [
+            await run_route(app, path, requests=args.requests, warmup=args.warmup)
+            for path in ("/legacy/invoices", "/fast/invoices", "/legacy/statement", "/fast/statement")
+        ]
+
+    for result in asyncio.run(_run()):
+        print(f"{result.name:<18} {result.milliseconds_per_request:8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import statistics
+import time
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import httpx
+from uuid_extensions import uuid7
+
+from app.api.deps import get_school_statement_uc
+from app.domain.dtos import InvoiceDTO, SchoolDTO, StudentDTO
+from app.domain.enums import InvoiceStatus
+from app.main import app
+from app.services.statement_offload import StatementOffload
+from app.services.use_cases import GetSchoolStatement
+
+
+@dataclass(frozen=True, slots=True)
+class LagResult:
+    name: str
+    response_bytes: int
+    statement_seconds: float
+    max_lag_seconds: float
+    p99_lag_seconds: float
+
+
+class InMemoryRepos:
+    """Serves one pre-built school from memory, so only statement building and event loop lag are measured."""
+
+    def __init__(self, school: SchoolDTO, students: list[StudentDTO], invoices: list[InvoiceDTO]) -> None:
+        self.school = school
+        self.by_student: dict[UUID, list[InvoiceDTO]] = {student.id: [] for student in students}
+        for invoice in invoices:
+            self.by_student[invoice.student_id].append(invoice)
+        self.students_list = students
+
+    @property
+    def schools(self) -> InMemoryRepos:
+        return self
+
+    @property
+    def students(self) -> InMemoryRepos:
+        return self
+
+    @property
+    def invoices(self) -> InMemoryRepos:
+        return self
+
+    async def get_by_id(self, school_id: UUID) -> SchoolDTO | None:
+        return self.school if school_id == self.school.id else None
+
+    async def iter_by_school_id(self, school_id: UUID, *, chunk_size: int = 500) -> AsyncIterator[list[StudentDTO]]:
+        for start in range(0, len(self.students_list), chunk_size):
+            yield self.students_list[start : start + chunk_size]
+
+    async def list_by_student_ids(self, student_ids: Sequence[UUID]) -> list[InvoiceDTO]:
+        return [invoice for student_id in student_ids for invoice in self.by_student[student_id]]
+
+    async def count_by_school_id(self, school_id: UUID) -> int:
+        return sum(len(invoices) for invoices in self.by_student.values()) if school_id == self.school.id else 0
+
+
+def make_school(*, students: int, invoices: int) -> InMemoryRepos:
+    school = SchoolDTO(id=uuid7(), name="Huge Academy")
+    student_rows = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {i}") for i in range(students)]
+    invoice_rows = [
+        InvoiceDTO(
+            id=uuid7(),
+            student_id=student_rows[index % students].id,
+            total_amount=Decimal("100.00"),
+            due_date=date(2026, 3, 1),
+            issued_at=datetime(2026, 2, 1),
+            status=InvoiceStatus.PARTIAL,
+            payments_total=Decimal("40.00"),
+            refunds_total=Decimal("5.00"),
+        )
+        for index in range(invoices)
+    ]
+    return InMemoryRepos(school, student_rows, invoice_rows)
+
+
+async def measure_lag(name: str, use_case: GetSchoolStatement, school_id: UUID, *, tick: float) -> LagResult:
+    # The whole GET /schools/{id}/statement route runs in-process, so encoding and sending the response are measured
+    # along with building the statement. A heartbeat stands in for unrelated requests on the same worker: how late
+    # does each of its wake-ups run?
+    app.dependency_overrides[get_school_statement_uc] = lambda: use_case.json
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def heartbeat() -> None:
+        while not done.is_set():
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            beat = asyncio.create_task(heartbeat())
+            await asyncio.sleep(tick * 5)
+            started = time.perf_counter()
+            response = await client.get(f"/schools/{school_id}/statement")
+            elapsed = time.perf_counter() - started
+            done.set()
+            await beat
+    finally:
+        app.dependency_overrides.clear()
+    response.raise_for_status()
+    return LagResult(
+        name=name,
+        response_bytes=len(response.content),
+        statement_seconds=elapsed,
+        max_lag_seconds=max(lags),
+        p99_lag_seconds=statistics.quantiles(lags, n=100, method="inclusive")[98] if len(lags) >= 2 else lags[0],
+    )
+
+
+async def run_benchmark(repos: InMemoryRepos, *, workers: int, chunk_invoices: int, tick: float) -> list[LagResult]:
+    @asynccontextmanager
+    async def open_repos() -> AsyncIterator[Any]:
+        yield repos
+
+    inline = GetSchoolStatement(open_repos)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        offload = StatementOffload(executor, min_invoices=0, chunk_invoices=chunk_invoices)
+        offloaded = GetSchoolStatement(open_repos, offload=offload)
+        # Warm-up: spawn the workers and import the app in them before anything is timed.
+        await offloaded.json(repos.school.id)
+        return [
+            await measure_lag("inline", inline, repos.school.id, tick=tick),
+            await measure_lag("process pool", offloaded, repos.school.id, tick=tick),
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event loop lag while serving a huge school statement.")
+    parser.add_argument("--students", type=int, default=5_000)
+    parser.add_argument("--invoices", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk-invoices", type=int, default=5_000)
+    parser.add_argument("--tick-ms", type=float, default=1.0, help="heartbeat interval standing in for other requests")
+    args = parser.parse_args()
+
+    repos = make_school(students=args.students, invoices=args.invoices)
+    # The fixture stands in for the database: keep full collections from re-walking its objects mid-request, which
+    # would show up as lag no real worker has.
+    gc.freeze()
+    results = asyncio.run(
+        run_benchmark(repos, workers=args.workers, chunk_invoices=args.chunk_invoices, tick=args.tick_ms / 1000)
+    )
+    for result in results:
+        print(
+            f"{result.name:<13} route={result.statement_seconds * 1000:8.1f} ms body={result.response_bytes / 1e6:5.1f} MB "
+            f"max_lag={result.max_lag_seconds * 1000:8.1f} ms p99_lag={result.p99_lag_seconds * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
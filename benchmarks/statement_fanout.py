@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from uuid_extensions import uuid7
+
+from app.core.settings import settings
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.db.base import Base
+from app.models import Invoice, School, Student
+from app.services.use_cases import GetSchoolStatement
+
+
+@dataclass(frozen=True, slots=True)
+class FanoutResult:
+    max_concurrency: int
+    requests: int
+    elapsed_seconds: float
+
+    @property
+    def milliseconds_per_request(self) -> float:
+        return self.elapsed_seconds / self.requests * 1000
+
+
+class DelayedRepo:
+    """Sleeps before every query, and before every chunk of a paged query, to stand in for network latency."""
+
+    def __init__(self, repo: object, delay_seconds: float) -> None:
+        self._repo = repo
+        self._delay_seconds = delay_seconds
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._repo, name)
+        delay_seconds = self._delay_seconds
+        if inspect.isasyncgenfunction(method):
+
+            async def paged(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+                chunks = method(*args, **kwargs)
+                while True:
+                    await asyncio.sleep(delay_seconds)
+                    try:
+                        yield await anext(chunks)
+                    except StopAsyncIteration:
+                        return
+
+            return paged
+
+        async def query(*args: Any, **kwargs: Any) -> Any:
+            await asyncio.sleep(delay_seconds)
+            return await method(*args, **kwargs)
+
+        return query
+
+
+class DelayedRepos:
+    def __init__(self, uow: SQLAlchemyUnitOfWork, delay_seconds: float) -> None:
+        self.schools: Any = DelayedRepo(uow.schools, delay_seconds)
+        self.students: Any = DelayedRepo(uow.students, delay_seconds)
+        self.invoices: Any = DelayedRepo(uow.invoices, delay_seconds)
+
+
+async def seed(session_maker: async_sessionmaker[AsyncSession], *, students: int, invoices_per_student: int) -> UUID:
+    school_id: UUID = uuid7()
+    student_ids = [uuid7() for _ in range(students)]
+    async with session_maker() as session:
+        await session.execute(insert(School).values(id=school_id, name="Fan-out Academy"))
+        await session.execute(
+            insert(Student),
+            [
+                {"id": student_id, "school_id": school_id, "full_name": f"Student {index}"}
+                for index, student_id in enumerate(student_ids)
+            ],
+        )
+        await session.execute(
+            insert(Invoice),
+            [
+                {"student_id": student_id, "total_amount": Decimal("100.00"), "due_date": date(2026, 3, 1)}
+                for student_id in student_ids
+                for _ in range(invoices_per_student)
+            ],
+        )
+        await session.commit()
+    return school_id
+
+
+async def run_benchmark(
+    database_url: str,
+    *,
+    create_schema: bool,
+    delay_seconds: float,
+    students: int,
+    invoices_per_student: int,
+    chunk_size: int,
+    concurrency_levels: list[int],
+    requests: int,
+) -> list[FanoutResult]:
+    engine = create_async_engine(database_url, pool_size=max(concurrency_levels), max_overflow=0)
+    try:
+        if create_schema:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        school_id = await seed(session_maker, students=students, invoices_per_student=invoices_per_student)
+
+        @asynccontextmanager
+        async def repos() -> AsyncIterator[DelayedRepos]:
+            async with session_maker() as session:
+                yield DelayedRepos(SQLAlchemyUnitOfWork(session), delay_seconds)
+
+        results = []
+        for max_concurrency in concurrency_levels:
+            use_case = GetSchoolStatement(repos, chunk_size=chunk_size, max_concurrency=max_concurrency)
+            await use_case(school_id)
+            started = time.perf_counter()
+            for _ in range(requests):
+                await use_case(school_id)
+            results.append(
+                FanoutResult(
+                    max_concurrency=max_concurrency, requests=requests, elapsed_seconds=time.perf_counter() - started
+                )
+            )
+        return results
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="School statement latency: sequential vs concurrent query fan-out.")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument(
+        "--create-schema", action="store_true", help="create tables first (for throwaway SQLite databases)"
+    )
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="artificial latency added to every query")
+    parser.add_argument("--students", type=int, default=2_000)
+    parser.add_argument("--invoices-per-student", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=settings.statement_student_chunk_size)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, settings.statement_max_concurrency])
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run_benchmark(
+            args.database_url,
+            create_schema=args.create_schema,
+            delay_seconds=args.delay_ms / 1000,
+            students=args.students,
+            invoices_per_student=args.invoices_per_student,
+            chunk_size=args.chunk_size,
+            concurrency_levels=args.concurrency,
+            requests=args.requests,
+        )
+    )
+    for result in results:
+        print(f"max_concurrency={result.max_concurrency:<3} {result.milliseconds_per_request:8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
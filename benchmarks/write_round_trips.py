@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.observability import track_queries
+from app.core.settings import settings
+from app.dal import invoice as invoice_dal
+from app.dal import payment as payment_dal
+from app.dal import school as school_dal
+from app.dal import student as student_dal
+from app.db.base import Base
+from app.db.session import instrument_engine
+from app.models import Invoice, Payment, School, Student
+
+
+@dataclass(frozen=True, slots=True)
+class WriteCost:
+    operation: str
+    statements: int
+    elapsed_seconds: float
+
+
+async def legacy_create(session: AsyncSession, model: type[Base], values: dict[str, Any]) -> Any:
+    # The pre-RETURNING DAL shape: INSERT on flush, then a SELECT to refresh server defaults.
+    row = model(**values)
+    session.add(row)
+    await session.flush()
+    await session.refresh(row)
+    return row
+
+
+async def legacy_update(session: AsyncSession, model: type[Base], row_id: UUID, values: dict[str, Any]) -> Any:
+    row = await session.get(model, row_id)
+    for key, value in values.items():
+        setattr(row, key, value)
+    await session.flush()
+    await session.refresh(row)
+    return row
+
+
+async def legacy_delete(session: AsyncSession, model: type[Base], row_id: UUID) -> bool:
+    row = await session.get(model, row_id)
+    await session.delete(row)
+    await session.flush()
+    return True
+
+
+async def measure(
+    session_maker: async_sessionmaker[AsyncSession],
+    operation: str,
+    write: Callable[[AsyncSession], Awaitable[Any]],
+    *,
+    repeat: int,
+) -> tuple[WriteCost, Any]:
+    statements = 0
+    elapsed = 0.0
+    result: Any = None
+    for _ in range(repeat):
+        # Each write runs in a fresh session, like a request, so nothing is served from the identity map.
+        async with session_maker() as session:
+            started = time.perf_counter()
+            with track_queries() as stats:
+                result = await write(session)
+            elapsed += time.perf_counter() - started
+            await session.commit()
+        statements = stats.count
+    return WriteCost(operation=operation, statements=statements, elapsed_seconds=elapsed / repeat), result
+
+
+async def run_benchmark(engine: AsyncEngine, *, repeat: int) -> list[tuple[WriteCost, WriteCost]]:
+    session_maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    pairs: list[tuple[WriteCost, WriteCost]] = []
+
+    async def compare(
+        operation: str,
+        before: Callable[[AsyncSession], Awaitable[Any]],
+        after: Callable[[AsyncSession], Awaitable[Any]],
+    ) -> tuple[Any, Any]:
+        before_cost, before_result = await measure(session_maker, operation, before, repeat=repeat)
+        after_cost, after_result = await measure(session_maker, operation, after, repeat=repeat)
+        pairs.append((before_cost, after_cost))
+        return before_result, after_result
+
+    old_school, new_school = await compare(
+        "create school",
+        lambda s: legacy_create(s, School, {"name": "Round Trip School"}),
+        lambda s: school_dal.create_school(s, {"name": "Round Trip School"}),
+    )
+    old_student, new_student = await compare(
+        "create student",
+        lambda s: legacy_create(s, Student, {"school_id": old_school.id, "full_name": "Round Trip"}),
+        lambda s: student_dal.create_student(s, {"school_id": new_school.id, "full_name": "Round Trip"}),
+    )
+    invoice_values = {"total_amount": Decimal("100.00"), "due_date": date.today()}
+    old_invoice, new_invoice = await compare(
+        "create invoice",
+        lambda s: legacy_create(s, Invoice, {"student_id": old_student.id, **invoice_values}),
+        lambda s: invoice_dal.create_invoice(s, {"student_id": new_student.id, **invoice_values}),  # type: ignore[typeddict-item]
+    )
+    old_payment, new_payment = await compare(
+        "create payment",
+        lambda s: legacy_create(s, Payment, {"invoice_id": old_invoice.id, "amount": Decimal("10.00")}),
+        lambda s: payment_dal.create_payment(s, {"invoice_id": new_invoice.id, "amount": Decimal("10.00")}),
+    )
+    # Every update writes a fresh value so the ORM path cannot skip an unchanged flush.
+    revision = itertools.count(1)
+    await compare(
+        "update student",
+        lambda s: legacy_update(s, Student, old_student.id, {"full_name": f"Renamed {next(revision)}"}),
+        lambda s: student_dal.update_student(s, new_student.id, {"full_name": f"Renamed {next(revision)}"}),
+    )
+    await compare(
+        "update invoice",
+        lambda s: legacy_update(s, Invoice, old_invoice.id, {"total_amount": Decimal(100 + next(revision))}),
+        lambda s: invoice_dal.update_invoice(s, new_invoice.id, {"total_amount": Decimal(100 + next(revision))}),
+    )
+    await compare(
+        "update payment",
+        lambda s: legacy_update(s, Payment, old_payment.id, {"amount": Decimal(next(revision))}),
+        lambda s: payment_dal.update_payment(s, new_payment.id, {"amount": Decimal(next(revision))}),
+    )
+
+    # Each delete removes a different pre-created payment and school, one per repetition.
+    async def seed(count: int) -> tuple[list[UUID], list[UUID]]:
+        async with session_maker() as session:
+            payments = [
+                (
+                    await payment_dal.create_payment(session, {"invoice_id": new_invoice.id, "amount": Decimal("1.00")})
+                ).id
+                for _ in range(count)
+            ]
+            schools = [(await school_dal.create_school(session, {"name": "Doomed School"})).id for _ in range(count)]
+            await session.commit()
+        return payments, schools
+
+    old_payment_ids, old_school_ids = await seed(repeat)
+    new_payment_ids, new_school_ids = await seed(repeat)
+    old_payments, new_payments = iter(old_payment_ids), iter(new_payment_ids)
+    old_schools, new_schools = iter(old_school_ids), iter(new_school_ids)
+    await compare(
+        "delete payment",
+        lambda s: legacy_delete(s, Payment, next(old_payments)),
+        lambda s: payment_dal.delete_payment(s, next(new_payments)),
+    )
+    await compare(
+        "delete school",
+        lambda s: legacy_delete(s, School, next(old_schools)),
+        lambda s: school_dal.delete_school(s, next(new_schools)),
+    )
+    return pairs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Statements per DAL write: ORM flush/refresh vs single RETURNING.")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--create-schema", action="store_true", help="create tables first (for throwaway SQLite databases)"
+    )
+    args = parser.parse_args()
+
+    async def _run() -> list[tuple[WriteCost, WriteCost]]:
+        engine = create_async_engine(args.database_url)
+        instrument_engine(engine.sync_engine)
+        try:
+            if args.create_schema:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+            return await run_benchmark(engine, repeat=args.repeat)
+        finally:
+            await engine.dispose()
+
+    print(f"{'operation':<16} {'before':>7} {'after':>6} {'before_ms':>10} {'after_ms':>9}")
+    for before, after in asyncio.run(_run()):
+        print(
+            f"{before.operation:<16} {before.statements:>7} {after.statements:>6} "
+            f"{before.elapsed_seconds * 1000:>10.2f} {after.elapsed_seconds * 1000:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
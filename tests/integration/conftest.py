@@ -76,7 +76,9 @@ async def integration_engine() -> AsyncGenerator[AsyncEngine, None]:
 async def db_session(integration_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
     session_local = async_sessionmaker(bind=integration_engine, autoflush=False, expire_on_commit=False)
     async with session_local() as session:
-        await session.execute(text("TRUNCATE TABLE payments, invoices, students, schools RESTART IDENTITY CASCADE"))
+        await session.execute(
+            text("TRUNCATE TABLE idempotency_keys, payments, invoices, students, schools RESTART IDENTITY CASCADE")
+        )
         await session.commit()
 
         yield session
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Select, insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.dal.invoice import aging_query, sum_open_balances_by_aging_bucket
+from app.dal.school import create_school
+from app.dal.student import create_student
+from app.domain.enums import AgingBucket, InvoiceStatus
+from app.models.invoice import Invoice
+
+AS_OF = date(2026, 5, 1)
+
+
+async def _seed_schools(session: AsyncSession) -> tuple[UUID, UUID]:
+    north = await create_school(session, data={"name": "North Aging Academy"})
+    south = await create_school(session, data={"name": "South Aging Academy"})
+    north_student = await create_student(session, data={"school_id": north.id, "full_name": "North Student"})
+    south_student = await create_student(session, data={"school_id": south.id, "full_name": "South Student"})
+
+    def invoice(student_id: UUID, days_past_due: int, status: InvoiceStatus, paid: str = "0.00") -> dict[str, object]:
+        return {
+            "student_id": student_id,
+            "total_amount": Decimal("100.00"),
+            "due_date": AS_OF - timedelta(days=days_past_due),
+            "status": status,
+            "payments_total": Decimal(paid),
+        }
+
+    await session.execute(
+        insert(Invoice),
+        [
+            invoice(north_student.id, -10, InvoiceStatus.PENDING),
+            invoice(north_student.id, 0, InvoiceStatus.PARTIAL, "25.00"),
+            invoice(north_student.id, 1, InvoiceStatus.PENDING),
+            invoice(north_student.id, 45, InvoiceStatus.PARTIAL, "60.00"),
+            invoice(north_student.id, 91, InvoiceStatus.PENDING),
+            # Settled invoices never age, however late they were.
+            invoice(north_student.id, 200, InvoiceStatus.PAID, "100.00"),
+            invoice(south_student.id, 90, InvoiceStatus.PENDING),
+        ],
+    )
+    await session.commit()
+    return north.id, south.id
+
+
+async def _plan(session: AsyncSession, stmt: Select[Any]) -> str:
+    sql = stmt.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_aging_buckets_open_balances_by_days_past_due(db_session: AsyncSession) -> None:
+    north_id, south_id = await _seed_schools(db_session)
+
+    north_rows = await sum_open_balances_by_aging_bucket(db_session, as_of=AS_OF, school_id=north_id)
+    all_rows = await sum_open_balances_by_aging_bucket(db_session, as_of=AS_OF)
+
+    assert sorted((bucket, count, balance) for _, bucket, count, balance in north_rows) == sorted(
+        [
+            (AgingBucket.CURRENT, 2, Decimal("175.00")),
+            (AgingBucket.DAYS_1_30, 1, Decimal("100.00")),
+            (AgingBucket.DAYS_31_60, 1, Decimal("40.00")),
+            (AgingBucket.DAYS_OVER_90, 1, Decimal("100.00")),
+        ]
+    )
+    assert {school_id for school_id, *_ in north_rows} == {north_id}
+    assert [row for row in all_rows if row[0] == south_id] == [(south_id, AgingBucket.DAYS_61_90, 1, Decimal("100.00"))]
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_school_aging_is_served_from_the_open_invoice_index(
+    integration_engine: AsyncEngine, db_session: AsyncSession
+) -> None:
+    north_id, _ = await _seed_schools(db_session)
+    # VACUUM cannot run inside a transaction; it also sets the visibility map index-only scans rely on.
+    async with integration_engine.connect() as conn:
+        autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await autocommit.execute(text("VACUUM ANALYZE invoices"))
+    # Tiny tables always favour a sequential scan; rule it out to see which index the planner reaches for.
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    plan = await _plan(db_session, aging_query(as_of=AS_OF, school_id=north_id))
+
+    assert "ix_invoices_open_student_id_aging" in plan
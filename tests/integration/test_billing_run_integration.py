@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid_extensions import uuid7
+
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.dal.school import create_school
+from app.dal.student import create_student
+from app.domain.dtos import FeeDTO
+from app.domain.enums import InvoiceStatus
+from app.domain.errors import ConflictError
+from app.models.invoice import Invoice
+from app.services.billing_runs import run_term_billing
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_billing_run_rerun_skips_invoices_it_already_created(db_session: AsyncSession) -> None:
+    school = await create_school(db_session, data={"name": "Billing Run Academy"})
+    for index in range(7):
+        await create_student(db_session, data={"school_id": school.id, "full_name": f"Billed Student {index}"})
+    await db_session.commit()
+    fees = [FeeDTO("tuition", Decimal("1200.00")), FeeDTO("books", Decimal("80.00"), "Books")]
+    run_id = uuid7()
+
+    async def bill(due_date: date = date(2026, 9, 1)) -> tuple[int, int]:
+        result = await run_term_billing(
+            SQLAlchemyUnitOfWork(db_session),
+            run_id=run_id,
+            school_id=school.id,
+            fees=fees,
+            due_date=due_date,
+            batch_size=4,
+            student_chunk_size=3,
+        )
+        return result.invoices_created, result.invoices_skipped
+
+    assert await bill() == (14, 0)
+    assert await bill() == (0, 14)
+    with pytest.raises(ConflictError):
+        await bill(date(2026, 10, 1))
+    await db_session.rollback()
+
+    rows = (
+        await db_session.execute(
+            select(Invoice.fee_code, Invoice.status, func.count(), func.sum(Invoice.total_amount))
+            .where(Invoice.billing_run_id == run_id)
+            .group_by(Invoice.fee_code, Invoice.status)
+        )
+    ).all()
+    assert sorted(rows) == [
+        ("books", InvoiceStatus.PENDING, 7, Decimal("560.00")),
+        ("tuition", InvoiceStatus.PENDING, 7, Decimal("8400.00")),
+    ]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.domain.enums import InvoiceStatus, PaymentKind
+from app.services import invoices as invoice_service
+from app.services import payments as payment_service
+from app.services import schools as school_service
+from app.services import students as student_service
+from app.services.invoice_totals import check_invoice_totals
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_bulk_payments_insert_and_update_totals_in_one_transaction(db_session: AsyncSession) -> None:
+    uow = SQLAlchemyUnitOfWork(db_session)
+    school = await school_service.create_school(uow, data={"name": "Bulk Academy"})
+    student = await student_service.create_student(uow, data={"school_id": school.id, "full_name": "Bulk Student"})
+    first = await invoice_service.create_invoice(
+        uow, data={"student_id": student.id, "total_amount": Decimal("100.00"), "due_date": date(2026, 3, 1)}
+    )
+    second = await invoice_service.create_invoice(
+        uow, data={"student_id": student.id, "total_amount": Decimal("40.00"), "due_date": date(2026, 3, 1)}
+    )
+
+    results = await payment_service.create_payments_bulk(
+        uow,
+        [
+            {"invoice_id": first.id, "amount": Decimal("60.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": second.id, "amount": Decimal("40.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": first.id, "amount": Decimal("50.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": first.id, "amount": Decimal("10.00"), "kind": PaymentKind.REFUND},
+        ],
+    )
+    assert [result.error is None for result in results] == [True, True, False, True]
+
+    db_session.expire_all()
+    stored_first = await uow.invoices.get_by_id(first.id)
+    stored_second = await uow.invoices.get_by_id(second.id)
+    assert stored_first is not None and stored_second is not None
+    assert (stored_first.payments_total, stored_first.refunds_total, stored_first.status) == (
+        Decimal("60.00"),
+        Decimal("10.00"),
+        InvoiceStatus.PARTIAL,
+    )
+    assert stored_second.status == InvoiceStatus.PAID
+    assert await check_invoice_totals(uow) == []
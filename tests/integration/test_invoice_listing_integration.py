@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Select, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dal.invoice import invoice_list_query, list_invoices
+from app.dal.school import create_school
+from app.dal.student import create_student
+from app.domain.dtos import InvoiceFiltersDTO
+from app.domain.enums import InvoiceSort, InvoiceStatus
+from app.models.invoice import Invoice
+
+INVOICES_PER_STUDENT = 1_000
+
+
+async def _seed_invoices(session: AsyncSession) -> list[UUID]:
+    school = await create_school(session, data={"name": "Listing Academy"})
+    students = [
+        await create_student(session, data={"school_id": school.id, "full_name": f"Listing Student {index}"})
+        for index in range(4)
+    ]
+    # Nine in ten invoices are settled, like a real ledger, so the open-invoice partial index stays small.
+    await session.execute(
+        insert(Invoice),
+        [
+            {
+                "student_id": student.id,
+                "total_amount": Decimal("100.00"),
+                "due_date": date(2026, 1, 1) + timedelta(days=index % 365),
+                "status": InvoiceStatus.PENDING if index % 10 == 0 else InvoiceStatus.PAID,
+            }
+            for student in students
+            for index in range(INVOICES_PER_STUDENT)
+        ],
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE invoices"))
+    return [student.id for student in students]
+
+
+async def _plan(session: AsyncSession, stmt: Select[Any]) -> str:
+    # Literal binds give the planner the same constants a real request does, which partial indexes depend on.
+    sql = stmt.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_invoice_listing_filters_and_sorts_use_their_indexes(db_session: AsyncSession) -> None:
+    student_ids = await _seed_invoices(db_session)
+    # The table is small enough that a sequential scan would always win; rule it out to see which index the planner
+    # reaches for.
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    overdue = invoice_list_query(
+        limit=50,
+        filters=InvoiceFiltersDTO(statuses=(InvoiceStatus.PENDING,), due_before=date(2026, 3, 1)),
+        sort=InvoiceSort.DUE_DATE,
+    )
+    by_student = invoice_list_query(
+        limit=20, filters=InvoiceFiltersDTO(student_id=student_ids[0]), sort=InvoiceSort.DUE_DATE
+    )
+    by_due_date = invoice_list_query(limit=20, sort=InvoiceSort.DUE_DATE_DESC)
+
+    assert "ix_invoices_open_status_due_date" in await _plan(db_session, overdue)
+    assert "ix_invoices_student_id_due_date" in await _plan(db_session, by_student)
+    assert "ix_invoices_due_date_id" in await _plan(db_session, by_due_date)
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_invoice_listing_filters_and_sorts_return_matching_rows(db_session: AsyncSession) -> None:
+    student_ids = await _seed_invoices(db_session)
+
+    rows = await list_invoices(
+        db_session,
+        limit=500,
+        filters=InvoiceFiltersDTO(
+            statuses=(InvoiceStatus.PENDING, InvoiceStatus.PARTIAL),
+            due_after=date(2026, 1, 31),
+            due_before=date(2026, 3, 1),
+            student_id=student_ids[1],
+        ),
+        sort=InvoiceSort.DUE_DATE_DESC,
+    )
+
+    assert rows
+    assert {row.student_id for row in rows} == {student_ids[1]}
+    assert {row.status for row in rows} == {InvoiceStatus.PENDING}
+    assert all(date(2026, 1, 31) < row.due_date < date(2026, 3, 1) for row in rows)
+    assert [row.due_date for row in rows] == sorted((row.due_date for row in rows), reverse=True)
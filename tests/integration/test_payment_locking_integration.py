@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.dal.payment import sum_payments_by_invoice_ids
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.domain.dtos import PaymentDTO
+from app.domain.enums import InvoiceStatus, PaymentKind
+from app.domain.errors import ConflictError
+from app.services import invoices as invoice_service
+from app.services import payments as payment_service
+from app.services import schools as school_service
+from app.services import students as student_service
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_concurrent_payments_on_one_invoice_never_overpay(
+    integration_engine: AsyncEngine, db_session: AsyncSession
+) -> None:
+    uow = SQLAlchemyUnitOfWork(db_session)
+    school = await school_service.create_school(uow, data={"name": "Locking Academy"})
+    student = await student_service.create_student(uow, data={"school_id": school.id, "full_name": "Locking Student"})
+    invoice = await invoice_service.create_invoice(
+        uow,
+        data={"student_id": student.id, "total_amount": Decimal("100.00"), "due_date": date(2026, 3, 1)},
+    )
+
+    session_local = async_sessionmaker(bind=integration_engine, autoflush=False, expire_on_commit=False)
+
+    async def post_payment() -> bool:
+        async with session_local() as session:
+            try:
+                await payment_service.create_payment(
+                    SQLAlchemyUnitOfWork(session), data={"invoice_id": invoice.id, "amount": Decimal("30.00")}
+                )
+            except ConflictError:
+                return False
+            return True
+
+    outcomes = await asyncio.gather(*(post_payment() for _ in range(6)))
+    assert outcomes.count(True) == 3
+
+    db_session.expire_all()
+    stored = await uow.invoices.get_by_id(invoice.id)
+    assert stored is not None
+    assert stored.payments_total == Decimal("90.00")
+    assert stored.status == InvoiceStatus.PARTIAL
+    [(_, recomputed_payments, _)] = await sum_payments_by_invoice_ids(db_session, invoice_ids=[invoice.id])
+    assert recomputed_payments == Decimal("90.00")
+
+
+@pytest.mark.integration
+@pytest.mark.anyio
+async def test_concurrent_retries_with_one_idempotency_key_post_once(
+    integration_engine: AsyncEngine, db_session: AsyncSession
+) -> None:
+    uow = SQLAlchemyUnitOfWork(db_session)
+    school = await school_service.create_school(uow, data={"name": "Idempotency Academy"})
+    student = await student_service.create_student(
+        uow, data={"school_id": school.id, "full_name": "Idempotency Student"}
+    )
+    invoice = await invoice_service.create_invoice(
+        uow,
+        data={"student_id": student.id, "total_amount": Decimal("100.00"), "due_date": date(2026, 3, 1)},
+    )
+
+    session_local = async_sessionmaker(bind=integration_engine, autoflush=False, expire_on_commit=False)
+
+    async def post_retry() -> PaymentDTO:
+        async with session_local() as session:
+            return await payment_service.create_payment(
+                SQLAlchemyUnitOfWork(session),
+                data={"invoice_id": invoice.id, "amount": Decimal("25.00"), "kind": PaymentKind.PAYMENT},
+                idempotency_key="webhook-delivery-1",
+            )
+
+    results = await asyncio.gather(*(post_retry() for _ in range(4)))
+    assert len({payment.id for payment in results}) == 1
+
+    db_session.expire_all()
+    assert len(await uow.payments.list_by_invoice_id(invoice.id)) == 1
+    stored = await uow.invoices.get_by_id(invoice.id)
+    assert stored is not None
+    assert stored.payments_total == Decimal("25.00")
@@ -4,23 +4,23 @@ from datetime import date
 from decimal import Decimal
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from app.dal.invoice import create_invoice
-from app.dal.repos.sqlalchemy_invoice_repo import SQLAlchemyInvoiceRepo
-from app.dal.repos.sqlalchemy_payment_repo import SQLAlchemyPaymentRepo
-from app.dal.repos.sqlalchemy_school_repo import SQLAlchemySchoolRepo
-from app.dal.repos.sqlalchemy_student_repo import SQLAlchemyStudentRepo
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork, unit_of_work_factory
 from app.dal.school import create_school
 from app.dal.student import create_student
 from app.domain.enums import InvoiceStatus, PaymentKind
 from app.services import payments as payment_service
+from app.services.invoice_totals import check_invoice_totals
 from app.services.use_cases import GetSchoolStatement, GetStudentStatement
 
 
 @pytest.mark.integration
 @pytest.mark.anyio
-async def test_statements_with_real_postgres_support_partial_paid_and_refunds(db_session: AsyncSession) -> None:
+async def test_statements_with_real_postgres_support_partial_paid_and_refunds(
+    integration_engine: AsyncEngine, db_session: AsyncSession
+) -> None:
     school = await create_school(db_session, data={"name": "Integration Academy"})
     student = await create_student(db_session, data={"school_id": school.id, "full_name": "Integration Student"})
 
@@ -61,28 +61,20 @@ async def test_statements_with_real_postgres_support_partial_paid_and_refunds(db
         },
     )
 
-    invoice_repo = SQLAlchemyInvoiceRepo(db_session)
-    payment_repo = SQLAlchemyPaymentRepo(db_session)
-    await payment_service.create_payment(
-        payment_repo, invoice_repo, data={"invoice_id": partial_invoice.id, "amount": Decimal("50.00")}
-    )
-    await payment_service.create_payment(
-        payment_repo, invoice_repo, data={"invoice_id": paid_invoice.id, "amount": Decimal("60.00")}
-    )
-    await payment_service.create_payment(
-        payment_repo, invoice_repo, data={"invoice_id": refund_invoice.id, "amount": Decimal("40.00")}
-    )
+    await db_session.commit()
+
+    uow = SQLAlchemyUnitOfWork(db_session)
+    await payment_service.create_payment(uow, data={"invoice_id": partial_invoice.id, "amount": Decimal("50.00")})
+    await payment_service.create_payment(uow, data={"invoice_id": paid_invoice.id, "amount": Decimal("60.00")})
+    await payment_service.create_payment(uow, data={"invoice_id": refund_invoice.id, "amount": Decimal("40.00")})
     await payment_service.create_payment(
-        payment_repo,
-        invoice_repo,
+        uow,
         data={"invoice_id": refund_invoice.id, "amount": Decimal("10.00"), "kind": PaymentKind.REFUND},
     )
 
-    student_statement = await GetStudentStatement(
-        student_repo=SQLAlchemyStudentRepo(db_session),
-        invoice_repo=SQLAlchemyInvoiceRepo(db_session),
-        payment_repo=SQLAlchemyPaymentRepo(db_session),
-    )(student.id)
+    # Statement queries run concurrently, each on its own session, so they only see committed rows.
+    repos = unit_of_work_factory(async_sessionmaker(bind=integration_engine, autoflush=False, expire_on_commit=False))
+    student_statement = await GetStudentStatement(repos)(student.id)
 
     assert student_statement.student_id == student.id
     assert student_statement.totals.invoiced_total == Decimal("290.00")
@@ -95,13 +87,10 @@ async def test_statements_with_real_postgres_support_partial_paid_and_refunds(db
     assert invoice_statuses[paid_invoice.id] == InvoiceStatus.PAID
     assert invoice_statuses[refund_invoice.id] == InvoiceStatus.PARTIAL
 
-    school_statement = await GetSchoolStatement(
-        school_repo=SQLAlchemySchoolRepo(db_session),
-        student_repo=SQLAlchemyStudentRepo(db_session),
-        invoice_repo=SQLAlchemyInvoiceRepo(db_session),
-        payment_repo=SQLAlchemyPaymentRepo(db_session),
-    )(school.id)
+    school_statement = await GetSchoolStatement(repos)(school.id)
 
     assert school_statement.school_id == school.id
     assert school_statement.students_count == 1
     assert school_statement.totals == student_statement.totals
+
+    assert await check_invoice_totals(uow) == []
@@ -1,23 +1,53 @@
 from __future__ import annotations
 
+import json
 from collections.abc import AsyncGenerator, Generator
 from datetime import date, datetime
 from decimal import Decimal
+from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock
+from uuid import UUID
 
 import httpx
 import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid_extensions import uuid7
 
+from app.api import deps
+from app.api.constants import INVOICES
+from app.api.deps import get_read_session
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.read_routing import LAST_WRITE_COOKIE
+from app.core.observability import UNMATCHED_ROUTE, current_query_stats
 from app.core.security import decode_access_token
 from app.core.settings import settings
+from app.dal.repos.sqlalchemy_invoice_repo import SQLAlchemyInvoiceRepo
+from app.dal.repos.sqlalchemy_school_repo import SQLAlchemySchoolRepo
+from app.db import session as db_session
+from app.db.base import Base
 from app.db.session import get_db
-from app.domain.dtos import InvoiceDTO, PaymentDTO
-from app.domain.enums import InvoiceStatus, PaymentKind
+from app.domain.dtos import (
+    AgingBucketTotalsDTO,
+    BillingRunResultDTO,
+    BulkPaymentResultDTO,
+    FeeDTO,
+    InvoiceDTO,
+    InvoiceFiltersDTO,
+    PaymentDTO,
+    SchoolDTO,
+)
+from app.domain.enums import AgingBucket, InvoiceSort, InvoiceStatus, PaymentKind
+from app.domain.errors import ConflictError, NotFoundError
 from app.main import app
+from app.schemas import InvoiceRead
+from app.services import billing_runs as billing_run_service
 from app.services import invoices as invoice_service
 from app.services import payments as payment_service
+from app.services import schools as school_service
+from app.services.use_cases import GetSchoolStatement, StreamSchoolStatement
 
 
 @pytest.fixture
@@ -31,6 +61,7 @@ def override_db() -> Generator[None, None, None]:
         yield MagicMock(spec=AsyncSession)
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_session] = override_get_db
     try:
         yield
     finally:
@@ -181,7 +212,10 @@ async def test_create_payment_response_includes_kind(
     payment_id = uuid7()
     invoice_id = uuid7()
 
-    async def fake_create_payment(*_args: object, **_kwargs: object) -> PaymentDTO:
+    seen_keys: list[object] = []
+
+    async def fake_create_payment(*_args: object, idempotency_key: object = None, **_kwargs: object) -> PaymentDTO:
+        seen_keys.append(idempotency_key)
         return PaymentDTO(
             id=payment_id,
             invoice_id=invoice_id,
@@ -192,13 +226,90 @@ async def test_create_payment_response_includes_kind(
     monkeypatch.setattr(payment_service, "create_payment", fake_create_payment)
     response = await client.post(
         "/payments",
-        headers={"Authorization": f"Bearer {token}"},
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "webhook-42"},
         json={"invoice_id": str(invoice_id), "amount": "10.00", "kind": "REFUND"},
     )
 
     body = response.json()
     assert response.status_code == 200
     assert body["kind"] == PaymentKind.REFUND
+    assert seen_keys == ["webhook-42"]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_bulk_payments_accept_json_and_ndjson_with_per_row_results(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "admin_password", "test-pass")
+    login_response = await client.post("/auth/login", json={"username": "admin", "password": "test-pass"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    invoice_id = uuid7()
+    seen_rows: list[list[dict[str, object]]] = []
+
+    async def fake_create_payments_bulk(
+        _uow: object, rows: list[dict[str, object]], **_kwargs: object
+    ) -> list[BulkPaymentResultDTO]:
+        seen_rows.append(rows)
+        return [
+            BulkPaymentResultDTO(
+                index=0,
+                payment=PaymentDTO(
+                    id=uuid7(), invoice_id=invoice_id, amount=rows[0]["amount"], kind=PaymentKind.PAYMENT
+                ),  # type: ignore[arg-type]
+            ),
+            BulkPaymentResultDTO(index=1, error="payment amount exceeds remaining balance"),
+        ]
+
+    monkeypatch.setattr(payment_service, "create_payments_bulk", fake_create_payments_bulk)
+    rows = [
+        {"invoice_id": str(invoice_id), "amount": 10.1},
+        {"invoice_id": str(invoice_id), "amount": "-5.00"},
+        {"invoice_id": str(invoice_id), "amount": "500.00"},
+    ]
+
+    json_response = await client.post("/payments/bulk", headers=headers, json=rows)
+    ndjson_response = await client.post(
+        "/payments/bulk",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(row) for row in rows) + "\n",
+    )
+
+    for response in (json_response, ndjson_response):
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["created"], body["rejected"]) == (1, 2)
+        assert [result["status"] for result in body["results"]] == ["created", "rejected", "rejected"]
+        assert body["results"][0]["payment"]["amount"] == "10.1"
+        assert body["results"][1]["error"].startswith("amount:")
+        assert body["results"][2]["error"] == "payment amount exceeds remaining balance"
+    assert [row["amount"] for row in seen_rows[0]] == [Decimal("10.1"), Decimal("500.00")]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_bulk_payments_reject_malformed_bodies(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "admin_password", "test-pass")
+    login_response = await client.post("/auth/login", json={"username": "admin", "password": "test-pass"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    not_array = await client.post("/payments/bulk", headers=headers, json={"invoice_id": str(uuid7())})
+    empty = await client.post("/payments/bulk", headers=headers, json=[])
+    bad_line = await client.post(
+        "/payments/bulk",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content='{"invoice_id": "x", "amount": "1.00"}\n{oops\n',
+    )
+    unauthenticated = await client.post("/payments/bulk", json=[])
+
+    assert not_array.status_code == 400
+    assert empty.json() == {"detail": "bulk request contains no payments"}
+    assert bad_line.json() == {"detail": "invalid JSON on line 2"}
+    assert unauthenticated.status_code == 401
 
 
 @pytest.mark.smoke
@@ -218,3 +329,431 @@ async def test_patch_payment_kind_null_returns_validation_error(
     )
 
     assert response.status_code == 422
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_list_schools_cursor_pagination_seeks_and_returns_next_cursor(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    schools = [SchoolDTO(id=uuid7(), name=f"School {index}") for index in range(2)]
+    seen_after_ids: list[object] = []
+
+    async def fake_list_schools(*_args: object, after_id: object = None, **_kwargs: object) -> list[SchoolDTO]:
+        seen_after_ids.append(after_id)
+        return schools
+
+    monkeypatch.setattr(school_service, "list_schools", fake_list_schools)
+    cursor = encode_cursor(schools[0].id)
+
+    full_page = await client.get("/schools", params={"limit": 2, "cursor": cursor})
+    short_page = await client.get("/schools", params={"limit": 3})
+
+    assert full_page.status_code == 200
+    assert seen_after_ids == [schools[0].id, None]
+    assert decode_cursor(full_page.headers["x-next-cursor"]) == schools[1].id
+    assert "x-next-cursor" not in short_page.headers
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_list_routes_serialize_once_and_keep_their_openapi_schema(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    invoice = InvoiceDTO(
+        id=uuid7(),
+        student_id=uuid7(),
+        total_amount=Decimal("100.00"),
+        due_date=date(2026, 3, 1),
+        issued_at=datetime(2026, 2, 1),
+        status=InvoiceStatus.PARTIAL,
+        payments_total=Decimal("30.00"),
+    )
+    validations = 0
+    original_model_validate = InvoiceRead.model_validate
+
+    def counting_model_validate(*args: object, **kwargs: object) -> InvoiceRead:
+        nonlocal validations
+        validations += 1
+        return original_model_validate(*args, **kwargs)  # type: ignore[arg-type]
+
+    async def fake_list_invoices(*_args: object, **_kwargs: object) -> list[InvoiceDTO]:
+        return [invoice]
+
+    monkeypatch.setattr(invoice_service, "list_invoices", fake_list_invoices)
+    monkeypatch.setattr(InvoiceRead, "model_validate", counting_model_validate)
+    response = await client.get("/invoices", params={"limit": 1})
+    monkeypatch.undo()
+
+    # The route validates the whole page through the list adapter, not item by item.
+    assert validations == 0
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert decode_cursor(response.headers["x-next-cursor"]) == invoice.id
+    assert response.json() == [
+        InvoiceRead.model_validate(invoice_service.serialize_invoice_with_totals(invoice)).model_dump(mode="json")
+    ]
+
+    list_schema = app.openapi()["paths"]["/invoices"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert list_schema["schema"]["items"] == {"$ref": "#/components/schemas/InvoiceRead"}
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_list_invoices_forwards_filters_and_sort(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    invoice = InvoiceDTO(
+        id=uuid7(),
+        student_id=uuid7(),
+        total_amount=Decimal("100.00"),
+        due_date=date(2026, 3, 1),
+        issued_at=datetime(2026, 2, 1),
+        status=InvoiceStatus.PENDING,
+    )
+    calls: list[dict[str, object]] = []
+
+    async def fake_list_invoices(*_args: object, **kwargs: object) -> list[InvoiceDTO]:
+        calls.append(kwargs)
+        return [invoice]
+
+    monkeypatch.setattr(invoice_service, "list_invoices", fake_list_invoices)
+    school_id = uuid7()
+    response = await client.get(
+        "/invoices",
+        params=[
+            ("status", "PENDING"),
+            ("status", "PARTIAL"),
+            ("due_before", "2026-04-01"),
+            ("school_id", str(school_id)),
+            ("sort", "-due_date"),
+            ("limit", "1"),
+        ],
+    )
+    with_cursor = await client.get("/invoices", params={"sort": "due_date", "cursor": encode_cursor(uuid7())})
+    unknown_sort = await client.get("/invoices", params={"sort": "total_amount"})
+
+    assert response.status_code == 200
+    assert calls[0]["filters"] == InvoiceFiltersDTO(
+        statuses=(InvoiceStatus.PENDING, InvoiceStatus.PARTIAL), due_before=date(2026, 4, 1), school_id=school_id
+    )
+    assert calls[0]["sort"] is InvoiceSort.DUE_DATE_DESC
+    # Cursors seek on id, so a full page in another order gets no next cursor and cannot take one.
+    assert "x-next-cursor" not in response.headers
+    assert with_cursor.status_code == 400
+    assert with_cursor.json() == {"detail": "cursor pagination requires sort=id"}
+    assert unknown_sort.status_code == 422
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_aging_routes_return_bucket_totals_only(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    school = SchoolDTO(id=uuid7(), name="Aging Academy")
+    aging_calls: list[tuple[date, UUID | None]] = []
+
+    async def fake_get_school(_repo: object, school_id: UUID) -> SchoolDTO | None:
+        return school if school_id == school.id else None
+
+    async def fake_aging_by_school(
+        _repo: object, *, as_of: date, school_id: UUID | None = None
+    ) -> list[AgingBucketTotalsDTO]:
+        aging_calls.append((as_of, school_id))
+        return [AgingBucketTotalsDTO(school.id, AgingBucket.DAYS_61_90, 4, Decimal("320.00"))]
+
+    monkeypatch.setattr(SQLAlchemySchoolRepo, "get_by_id", fake_get_school)
+    monkeypatch.setattr(SQLAlchemyInvoiceRepo, "aging_by_school", fake_aging_by_school)
+
+    school_aging = await client.get(f"/schools/{school.id}/aging", params={"as_of": "2026-05-01"})
+    report = await client.get("/reports/aging")
+    missing = await client.get(f"/schools/{uuid7()}/aging")
+
+    assert school_aging.status_code == 200
+    body = school_aging.json()
+    assert (body["as_of"], body["invoices_count"], body["balance_due"]) == ("2026-05-01", 4, "320.00")
+    assert [bucket["bucket"] for bucket in body["buckets"]] == ["current", "1-30", "31-60", "61-90", "90+"]
+    assert report.status_code == 200
+    assert report.json()["schools"] == [{**body, "as_of": report.json()["as_of"]}]
+    assert aging_calls[0] == (date(2026, 5, 1), school.id)
+    assert aging_calls[1][1] is None
+    assert missing.status_code == 404
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_billing_run_route_is_admin_only_and_forwards_the_run(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    school_id = uuid7()
+    run_id = uuid7()
+    calls: list[dict[str, Any]] = []
+
+    async def fake_run_term_billing(_uow: object, **kwargs: Any) -> BillingRunResultDTO:
+        calls.append(kwargs)
+        return BillingRunResultDTO(run_id, school_id, students=3, invoices_created=4, invoices_skipped=2)
+
+    monkeypatch.setattr(billing_run_service, "run_term_billing", fake_run_term_billing)
+    monkeypatch.setattr(settings, "admin_password", "test-pass")
+    payload = {
+        "run_id": str(run_id),
+        "due_date": "2026-09-01",
+        "fees": [
+            {"code": "tuition", "amount": "1200.00"},
+            {"code": "books", "amount": "80.00", "description": "Books"},
+        ],
+    }
+
+    anonymous = await client.post(f"/schools/{school_id}/billing-runs", json=payload)
+    login_response = await client.post("/auth/login", json={"username": "admin", "password": "test-pass"})
+    token = login_response.json()["access_token"]
+    response = await client.post(
+        f"/schools/{school_id}/billing-runs", headers={"Authorization": f"Bearer {token}"}, json=payload
+    )
+
+    assert anonymous.status_code == 401
+    assert response.status_code == 200
+    assert response.json() == {
+        "run_id": str(run_id),
+        "school_id": str(school_id),
+        "students": 3,
+        "invoices_created": 4,
+        "invoices_skipped": 2,
+    }
+    assert calls[0]["run_id"] == run_id
+    assert calls[0]["due_date"] == date(2026, 9, 1)
+    assert calls[0]["fees"] == [
+        FeeDTO("tuition", Decimal("1200.00")),
+        FeeDTO("books", Decimal("80.00"), "Books"),
+    ]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_billing_run_route_returns_409_when_the_run_id_was_used_differently(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fake_run_term_billing(_uow: object, **_kwargs: Any) -> BillingRunResultDTO:
+        raise ConflictError("billing run id was already used for another school")
+
+    monkeypatch.setattr(billing_run_service, "run_term_billing", fake_run_term_billing)
+    monkeypatch.setattr(settings, "admin_password", "test-pass")
+    login_response = await client.post("/auth/login", json={"username": "admin", "password": "test-pass"})
+    token = login_response.json()["access_token"]
+
+    response = await client.post(
+        f"/schools/{uuid7()}/billing-runs",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"run_id": str(uuid7()), "due_date": "2026-09-01", "fees": [{"code": "tuition", "amount": "1200.00"}]},
+    )
+
+    assert response.status_code == 409
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_list_rejects_invalid_or_mixed_cursor_pagination(client: httpx.AsyncClient) -> None:
+    invalid = await client.get("/invoices", params={"cursor": "not-a-cursor"})
+    mixed = await client.get("/payments", params={"cursor": encode_cursor(uuid7()), "offset": 5})
+
+    assert invalid.status_code == 400
+    assert invalid.json() == {"detail": "invalid pagination cursor"}
+    assert mixed.status_code == 400
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_request_metrics_are_labelled_with_route_templates(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fake_get_invoice_with_totals(_repo: object, invoice_id: object) -> dict[str, object]:
+        raise NotFoundError(INVOICES, str(invoice_id))
+
+    monkeypatch.setattr(invoice_service, "get_invoice_with_totals", fake_get_invoice_with_totals)
+
+    def requests_total(path: str, status: str) -> float:
+        labels = {"method": "GET", "path": path, "status": status}
+        return REGISTRY.get_sample_value("http_requests_total", labels) or 0.0
+
+    template_before = requests_total("/invoices/{invoice_id}", "404")
+    unmatched_before = requests_total(UNMATCHED_ROUTE, "404")
+
+    invoice_id = uuid7()
+    first = await client.get(f"/invoices/{invoice_id}", headers={"x-request-id": "req-1"})
+    second = await client.get(f"/invoices/{uuid7()}")
+    unmatched = await client.get(f"/nowhere/{invoice_id}")
+
+    assert [first.status_code, second.status_code, unmatched.status_code] == [404, 404, 404]
+    assert first.headers["x-request-id"] == "req-1"
+    assert second.headers["x-request-id"]
+    assert requests_total("/invoices/{invoice_id}", "404") == template_before + 2
+    assert requests_total(UNMATCHED_ROUTE, "404") == unmatched_before + 1
+    assert requests_total(f"/invoices/{invoice_id}", "404") == 0.0
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_request_db_query_stats_are_observed_and_echoed_in_headers(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "db_timing_headers", True)
+
+    async def fake_get_invoice_with_totals(_repo: object, invoice_id: object) -> dict[str, object]:
+        stats = current_query_stats()
+        assert stats is not None
+        stats.record(0.002)
+        stats.record(0.003)
+        raise NotFoundError(INVOICES, str(invoice_id))
+
+    monkeypatch.setattr(invoice_service, "get_invoice_with_totals", fake_get_invoice_with_totals)
+    labels = {"method": "GET", "path": "/invoices/{invoice_id}"}
+    count_before = REGISTRY.get_sample_value("db_queries_per_request_count", labels) or 0.0
+    sum_before = REGISTRY.get_sample_value("db_queries_per_request_sum", labels) or 0.0
+
+    response = await client.get(f"/invoices/{uuid7()}")
+
+    assert response.status_code == 404
+    assert response.headers["x-db-queries"] == "2"
+    assert response.headers["server-timing"] == 'db;dur=5.00;desc="2 queries"'
+    assert REGISTRY.get_sample_value("db_queries_per_request_count", labels) == count_before + 1
+    assert REGISTRY.get_sample_value("db_queries_per_request_sum", labels) == sum_before + 2
+    assert current_query_stats() is None
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_reads_use_the_replica_except_inside_the_read_your_writes_window(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("aiosqlite")
+    primary_url = _sqlite_database(tmp_path / "primary.db")
+    replica_url = _sqlite_database(tmp_path / "replica.db")
+
+    monkeypatch.setattr(settings, "database_url", primary_url)
+    monkeypatch.setattr(settings, "read_replica_url", replica_url)
+    monkeypatch.setattr(settings, "admin_password", "test-pass")
+    for name in ("_engine", "_session_maker", "_read_engine", "_read_session_maker"):
+        monkeypatch.setattr(db_session, name, None)
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as writer:
+            login_response = await writer.post("/auth/login", json={"username": "admin", "password": "test-pass"})
+            # Logging in writes nothing, so it must not pin the client to the primary.
+            assert LAST_WRITE_COOKIE not in writer.cookies
+            headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+            created = await writer.post("/schools", headers=headers, json={"name": "Replica Academy"})
+            school_id = created.json()["id"]
+
+            student = await writer.post(
+                "/students", headers=headers, json={"school_id": school_id, "full_name": "Replica Student"}
+            )
+            student_id = student.json()["id"]
+
+            assert created.status_code == 200
+            assert LAST_WRITE_COOKIE in writer.cookies
+            assert (await writer.get(f"/schools/{school_id}")).status_code == 200
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as other_client:
+            # Both were only written to the primary, so replica reads, statements included, cannot see them.
+            assert (await other_client.get(f"/schools/{school_id}")).status_code == 404
+            assert (await other_client.get(f"/students/{student_id}/statement")).status_code == 404
+            assert (await other_client.get(f"/schools/{school_id}/statement")).status_code == 404
+    finally:
+        await db_session.get_engine().dispose()
+        await db_session.get_read_engine().dispose()
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_school_statement_streams_ndjson_summaries_then_a_totals_trailer(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setattr(settings, "database_url", _sqlite_database(tmp_path / "stream.db"))
+    monkeypatch.setattr(settings, "read_replica_url", None)
+    monkeypatch.setattr(settings, "statement_cache_backend", "none")
+    monkeypatch.setattr(settings, "admin_password", "test-pass")
+    for name in ("_engine", "_session_maker", "_read_engine", "_read_session_maker"):
+        monkeypatch.setattr(db_session, name, None)
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login_response = await client.post("/auth/login", json={"username": "admin", "password": "test-pass"})
+            headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+            school_id = (await client.post("/schools", headers=headers, json={"name": "Stream Academy"})).json()["id"]
+            student = await client.post("/students", headers=headers, json={"school_id": school_id, "full_name": "S"})
+            for amount in ("100.00", "40.00"):
+                await client.post(
+                    "/invoices",
+                    headers=headers,
+                    json={"student_id": student.json()["id"], "total_amount": amount, "due_date": "2026-03-01"},
+                )
+
+            streamed = await client.get(f"/schools/{school_id}/statement", params={"format": "ndjson"})
+            document = await client.get(f"/schools/{school_id}/statement")
+            missing = await client.get(f"/schools/{uuid7()}/statement", params={"format": "ndjson"})
+    finally:
+        await db_session.get_engine().dispose()
+
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    *summaries, trailer = [json.loads(line) for line in streamed.text.splitlines()]
+    assert summaries == sorted(document.json()["invoices"], key=lambda summary: summary["id"])
+    assert trailer == {
+        "school_id": school_id,
+        "students_count": 1,
+        "totals": document.json()["totals"],
+    }
+    assert missing.status_code == 404
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_school_statement_builds_only_the_use_case_for_the_requested_format(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "statement_cache_backend", "none")
+    monkeypatch.setattr(settings, "read_replica_url", "sqlite+aiosqlite:///replica.db")
+    opened: list[str] = []
+
+    def session_local(name: str) -> Any:
+        def open_session() -> AsyncSession:
+            opened.append(name)
+            return MagicMock(spec=AsyncSession)
+
+        return open_session
+
+    async def missing_statement(_self: object, school_id: UUID) -> Any:
+        raise NotFoundError("schools", str(school_id))
+
+    monkeypatch.setattr(deps, "SessionLocal", session_local("primary"))
+    monkeypatch.setattr(deps, "ReadSessionLocal", session_local("replica"))
+    monkeypatch.setattr(GetSchoolStatement, "json", missing_statement)
+    monkeypatch.setattr(StreamSchoolStatement, "__call__", missing_statement)
+
+    assert (await client.get(f"/schools/{uuid7()}/statement")).status_code == 404
+    # The JSON statement opens its sessions per query, so building it opens none; only the stream holds one.
+    assert opened == []
+
+    assert (await client.get(f"/schools/{uuid7()}/statement", params={"format": "ndjson"})).status_code == 404
+    assert opened == ["replica"]
+
+
+def _sqlite_database(path: Path) -> str:
+    schema_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(schema_engine)
+    schema_engine.dispose()
+    return f"sqlite+aiosqlite:///{path}"
@@ -1,20 +1,69 @@
-from datetime import date
+from dataclasses import fields
+from datetime import UTC, date, datetime
 from decimal import Decimal
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 from uuid_extensions import uuid7
 
-from app.dal.invoice import create_invoice, delete_invoice, get_invoice_by_id, list_invoices, update_invoice
-from app.dal.payment import create_payment, delete_payment, get_payment_by_id, list_payments, update_payment
+from app.core.observability import track_queries
+from app.core.settings import Settings
+from app.dal.billing_run import create_billing_run, get_billing_run
+from app.dal.idempotency import create_idempotency_key, delete_expired_idempotency_keys, get_idempotency_key
+from app.dal.invoice import (
+    INVOICE_ROW_COLUMNS,
+    count_invoices_by_school_id,
+    create_invoice,
+    delete_invoice,
+    get_invoice_by_id,
+    get_invoice_by_id_for_update,
+    insert_billing_run_invoices,
+    invoice_list_query,
+    list_invoices,
+    list_invoices_by_ids_for_update,
+    sum_open_balances_by_aging_bucket,
+    update_invoice,
+    update_invoice_totals,
+)
+from app.dal.payment import (
+    PAYMENT_ROW_COLUMNS,
+    create_payment,
+    create_payments,
+    delete_payment,
+    get_payment_by_id,
+    get_payment_by_id_for_update,
+    list_payments,
+    sum_payments_by_invoice_ids,
+    update_payment,
+)
+from app.dal.repos.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
 from app.dal.school import create_school, delete_school, get_school_by_id, list_schools, update_school
-from app.dal.student import create_student, delete_student, get_student_by_id, list_students, update_student
-from app.domain.enums import InvoiceStatus, PaymentKind
+from app.dal.student import (
+    create_student,
+    delete_student,
+    get_student_by_id,
+    list_school_ids_by_student_ids,
+    list_students,
+    update_student,
+)
+from app.db.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, register_pool_gauges
+from app.db.session import engine_options, instrument_engine
+from app.domain.dtos import InvoiceDTO, InvoiceFiltersDTO, PaymentDTO
+from app.domain.enums import AgingBucket, InvoiceSort, InvoiceStatus, PaymentKind
+from app.models.billing_run import BillingRun
 from app.models.invoice import Invoice
 from app.models.payment import Payment
 from app.models.school import School
 from app.models.student import Student
+from app.services.billing_runs import MAX_BATCH_SIZE
 
 
 @pytest.fixture
@@ -28,38 +77,58 @@ def _session_mock() -> AsyncMock:
     return session
 
 
+def _returning(session: AsyncMock, row: object) -> None:
+    result = MagicMock()
+    result.one.return_value = row
+    result.first.return_value = row
+    session.scalars.return_value = result
+
+
+def _last_statement(session: AsyncMock) -> str:
+    return str(session.scalars.await_args.args[0].compile(dialect=postgresql.dialect()))
+
+
+def _assert_single_returning_statement(session: AsyncMock, prefix: str) -> None:
+    compiled = _last_statement(session)
+    assert compiled.startswith(prefix)
+    assert "RETURNING" in compiled
+    session.scalars.assert_awaited_once()
+    session.get.assert_not_awaited()
+    session.refresh.assert_not_awaited()
+    session.flush.assert_not_awaited()
+    session.commit.assert_not_called()
+    session.scalars.reset_mock()
+
+
 @pytest.mark.smoke
 @pytest.mark.anyio
 async def test_school_crud_uses_session_methods() -> None:
     session = _session_mock()
     school_id = uuid7()
+    school = School(id=school_id, name="Hogwarts")
 
-    created = await create_school(session, data={"name": "Hogwarts"})
-    assert isinstance(created, School)
-    assert created.name == "Hogwarts"
-    session.add.assert_called_once_with(created)
-    session.commit.assert_awaited_once()
-    session.refresh.assert_awaited_once_with(created)
+    _returning(session, school)
+    assert await create_school(session, data={"name": "Hogwarts"}) is school
+    _assert_single_returning_statement(session, "INSERT INTO schools")
 
-    session.get.return_value = created
+    session.get.return_value = school
     fetched = await get_school_by_id(session, school_id=school_id)
-    assert fetched is created
+    assert fetched is school
     session.get.assert_awaited_with(School, school_id)
+    session.get.reset_mock()
 
-    session.scalars.return_value = [created]
+    session.scalars.return_value = [school]
     listed = await list_schools(session, offset=5, limit=10)
-    assert listed == [created]
-    session.scalars.assert_awaited_once()
+    assert listed == [school]
+    session.scalars.reset_mock()
 
-    session.get.return_value = created
-    updated = await update_school(session, school_id=school_id, data={"name": "Beauxbatons"})
-    assert updated is created
-    assert created.name == "Beauxbatons"
+    _returning(session, school)
+    assert await update_school(session, school_id=school_id, data={"name": "Beauxbatons"}) is school
+    _assert_single_returning_statement(session, "UPDATE schools SET name=")
 
-    session.get.return_value = created
-    deleted = await delete_school(session, school_id=school_id)
-    assert deleted is True
-    session.delete.assert_awaited_with(created)
+    _returning(session, school_id)
+    assert await delete_school(session, school_id=school_id) is True
+    _assert_single_returning_statement(session, "DELETE FROM schools")
 
 
 @pytest.mark.smoke
@@ -68,31 +137,35 @@ async def test_student_crud_uses_session_methods() -> None:
     session = _session_mock()
     school_id = uuid7()
     student_id = uuid7()
+    student = Student(id=student_id, school_id=school_id, full_name="Hermione Granger")
 
-    created = await create_student(session, data={"school_id": school_id, "full_name": "Hermione Granger"})
-    assert isinstance(created, Student)
-    assert created.school_id == school_id
-    assert created.full_name == "Hermione Granger"
-    session.add.assert_called_once_with(created)
+    _returning(session, student)
+    assert await create_student(session, data={"school_id": school_id, "full_name": "Hermione Granger"}) is student
+    _assert_single_returning_statement(session, "INSERT INTO students")
 
-    session.get.return_value = created
+    session.get.return_value = student
     fetched = await get_student_by_id(session, student_id=student_id)
-    assert fetched is created
+    assert fetched is student
     session.get.assert_awaited_with(Student, student_id)
+    session.get.reset_mock()
 
-    session.scalars.return_value = [created]
+    session.scalars.return_value = [student]
     listed = await list_students(session)
-    assert listed == [created]
+    assert listed == [student]
+    session.scalars.reset_mock()
 
-    session.get.return_value = created
-    updated = await update_student(session, student_id=student_id, data={"full_name": "H. Granger"})
-    assert updated is created
-    assert created.full_name == "H. Granger"
+    _returning(session, student)
+    assert await update_student(session, student_id=student_id, data={"full_name": "H. Granger"}) is student
+    _assert_single_returning_statement(session, "UPDATE students SET full_name=")
 
-    session.get.return_value = created
-    deleted = await delete_student(session, student_id=student_id)
-    assert deleted is True
-    session.delete.assert_awaited_with(created)
+    _returning(session, student_id)
+    assert await delete_student(session, student_id=student_id) is True
+    _assert_single_returning_statement(session, "DELETE FROM students")
+
+    session.scalars.return_value = [school_id]
+    assert await list_school_ids_by_student_ids(session, student_ids=[student_id, uuid7()]) == [school_id]
+    assert _last_statement(session).startswith("SELECT DISTINCT students.school_id")
+    assert await list_school_ids_by_student_ids(session, student_ids=[]) == []
 
 
 @pytest.mark.smoke
@@ -101,7 +174,9 @@ async def test_invoice_crud_uses_session_methods() -> None:
     session = _session_mock()
     student_id = uuid7()
     invoice_id = uuid7()
+    invoice = Invoice(id=invoice_id, student_id=student_id, total_amount=Decimal("100.00"), due_date=date(2026, 2, 28))
 
+    _returning(session, invoice)
     created = await create_invoice(
         session,
         data={
@@ -111,31 +186,35 @@ async def test_invoice_crud_uses_session_methods() -> None:
             "description": "Tuition",
         },
     )
-    assert isinstance(created, Invoice)
-    assert created.student_id == student_id
-    assert created.total_amount == Decimal("100.00")
-    assert created.status == InvoiceStatus.PENDING
-    assert created.due_date == date(2026, 2, 28)
-    assert created.description == "Tuition"
-
-    session.get.return_value = created
+    assert created is invoice
+    params = session.scalars.await_args.args[0].compile().params
+    assert (params["status"], params["description"]) == (InvoiceStatus.PENDING, "Tuition")
+    assert "issued_at" not in params
+    _assert_single_returning_statement(session, "INSERT INTO invoices")
+
+    session.get.return_value = invoice
     fetched = await get_invoice_by_id(session, invoice_id=invoice_id)
-    assert fetched is created
+    assert fetched is invoice
     session.get.assert_awaited_with(Invoice, invoice_id)
+    session.get.reset_mock()
 
-    session.scalars.return_value = [created]
-    listed = await list_invoices(session)
-    assert listed == [created]
+    row = MagicMock()
+    session.execute.return_value = [row]
+    assert await list_invoices(session) == [row]
+    assert "SELECT invoices.id, invoices.student_id" in str(session.execute.await_args.args[0])
+    session.execute.reset_mock()
 
-    session.get.return_value = created
-    updated = await update_invoice(session, invoice_id=invoice_id, data={"total_amount": Decimal("120.00")})
-    assert updated is created
-    assert created.total_amount == Decimal("120.00")
+    _returning(session, invoice)
+    updated = await update_invoice(
+        session, invoice_id=invoice_id, data={"total_amount": Decimal("120.00"), "issued_at": None}
+    )
+    assert updated is invoice
+    assert "issued_at=" not in _last_statement(session)
+    _assert_single_returning_statement(session, "UPDATE invoices SET total_amount=")
 
-    session.get.return_value = created
-    deleted = await delete_invoice(session, invoice_id=invoice_id)
-    assert deleted is True
-    session.delete.assert_awaited_with(created)
+    _returning(session, invoice_id)
+    assert await delete_invoice(session, invoice_id=invoice_id) is True
+    _assert_single_returning_statement(session, "DELETE FROM invoices")
 
 
 @pytest.mark.smoke
@@ -144,7 +223,9 @@ async def test_payment_crud_uses_session_methods() -> None:
     session = _session_mock()
     invoice_id = uuid7()
     payment_id = uuid7()
+    payment = Payment(id=payment_id, invoice_id=invoice_id, amount=Decimal("25.50"), kind=PaymentKind.PAYMENT)
 
+    _returning(session, payment)
     created = await create_payment(
         session,
         data={
@@ -154,31 +235,30 @@ async def test_payment_crud_uses_session_methods() -> None:
             "reference": "ABC123",
         },
     )
-    assert isinstance(created, Payment)
-    assert created.invoice_id == invoice_id
-    assert created.amount == Decimal("25.50")
-    assert created.kind == PaymentKind.PAYMENT
-    assert created.method == "bank_transfer"
-    assert created.reference == "ABC123"
-
-    session.get.return_value = created
+    assert created is payment
+    params = session.scalars.await_args.args[0].compile().params
+    assert (params["kind"], params["method"], params["reference"]) == (PaymentKind.PAYMENT, "bank_transfer", "ABC123")
+    _assert_single_returning_statement(session, "INSERT INTO payments")
+
+    session.get.return_value = payment
     fetched = await get_payment_by_id(session, payment_id=payment_id)
-    assert fetched is created
+    assert fetched is payment
     session.get.assert_awaited_with(Payment, payment_id)
+    session.get.reset_mock()
 
-    session.scalars.return_value = [created]
-    listed = await list_payments(session)
-    assert listed == [created]
+    row = MagicMock()
+    session.execute.return_value = [row]
+    assert await list_payments(session) == [row]
+    assert "SELECT payments.id, payments.invoice_id" in str(session.execute.await_args.args[0])
+    session.execute.reset_mock()
 
-    session.get.return_value = created
-    updated = await update_payment(session, payment_id=payment_id, data={"amount": Decimal("30.00")})
-    assert updated is created
-    assert created.amount == Decimal("30.00")
+    _returning(session, payment)
+    assert await update_payment(session, payment_id=payment_id, data={"amount": Decimal("30.00")}) is payment
+    _assert_single_returning_statement(session, "UPDATE payments SET amount=")
 
-    session.get.return_value = created
-    deleted = await delete_payment(session, payment_id=payment_id)
-    assert deleted is True
-    session.delete.assert_awaited_with(created)
+    _returning(session, payment_id)
+    assert await delete_payment(session, payment_id=payment_id) is True
+    _assert_single_returning_statement(session, "DELETE FROM payments")
 
 
 @pytest.mark.smoke
@@ -186,7 +266,7 @@ async def test_payment_crud_uses_session_methods() -> None:
 async def test_update_and_delete_return_none_or_false_when_record_does_not_exist() -> None:
     session = _session_mock()
     missing_id = uuid7()
-    session.get.return_value = None
+    _returning(session, None)
 
     assert await update_school(session, school_id=missing_id, data={"name": "Missing"}) is None
     assert await update_student(session, student_id=missing_id, data={"full_name": "Missing"}) is None
@@ -197,3 +277,360 @@ async def test_update_and_delete_return_none_or_false_when_record_does_not_exist
     assert await delete_student(session, student_id=missing_id) is False
     assert await delete_invoice(session, invoice_id=missing_id) is False
     assert await delete_payment(session, payment_id=missing_id) is False
+    session.get.assert_not_awaited()
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_unit_of_work_shares_one_session_and_owns_commit() -> None:
+    session = _session_mock()
+    uow = SQLAlchemyUnitOfWork(session)
+
+    invoice_id = uuid7()
+    _returning(session, Payment(id=uuid7(), invoice_id=invoice_id, amount=Decimal("10.00"), kind=PaymentKind.PAYMENT))
+    await uow.payments.create({"invoice_id": invoice_id, "amount": Decimal("10.00"), "kind": PaymentKind.PAYMENT})
+    _returning(session, None)
+    await uow.invoices.update(uuid7(), {"status": InvoiceStatus.PARTIAL})
+    session.commit.assert_not_called()
+
+    await uow.commit()
+    session.commit.assert_awaited_once_with()
+    await uow.rollback()
+    session.rollback.assert_awaited_once_with()
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_lock_queries_select_rows_for_update() -> None:
+    session = _session_mock()
+    session.scalars.return_value = MagicMock()
+    dialect = postgresql.dialect()
+
+    assert await list_invoices_by_ids_for_update(session, invoice_ids=[]) == []
+    session.scalars.assert_not_awaited()
+
+    await list_invoices_by_ids_for_update(session, invoice_ids=[uuid7(), uuid7()])
+    compiled = str(session.scalars.await_args.args[0].compile(dialect=dialect))
+    assert "ORDER BY invoices.id" in compiled
+    assert compiled.endswith("FOR UPDATE")
+
+    await get_invoice_by_id_for_update(session, invoice_id=uuid7())
+    await get_payment_by_id_for_update(session, payment_id=uuid7())
+    for call in session.scalars.await_args_list:
+        assert str(call.args[0].compile(dialect=dialect)).endswith("FOR UPDATE")
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_bulk_writes_use_one_insert_and_one_set_based_update() -> None:
+    session = _session_mock()
+    session.scalars.return_value = MagicMock()
+    dialect = postgresql.dialect()
+
+    assert await create_payments(session, data=[]) == []
+    assert await update_invoice_totals(session, data=[]) == 0
+    session.scalars.assert_not_awaited()
+    session.execute.assert_not_awaited()
+
+    invoice_id = uuid7()
+    await create_payments(
+        session,
+        data=[
+            {"invoice_id": invoice_id, "amount": Decimal("10.00")},
+            {"invoice_id": invoice_id, "amount": Decimal("5.00"), "kind": PaymentKind.REFUND},
+        ],
+    )
+    stmt, rows = session.scalars.await_args.args
+    assert str(stmt.compile(dialect=dialect)).startswith("INSERT INTO payments")
+    assert [row["kind"] for row in rows] == [PaymentKind.PAYMENT, PaymentKind.REFUND]
+
+    await update_invoice_totals(
+        session,
+        data=[
+            {
+                "invoice_id": invoice_id,
+                "status": InvoiceStatus.PAID,
+                "payments_total": Decimal("10.00"),
+                "refunds_total": Decimal("0.00"),
+            },
+            {
+                "invoice_id": uuid7(),
+                "status": InvoiceStatus.PARTIAL,
+                "payments_total": Decimal("5.00"),
+                "refunds_total": Decimal("0.00"),
+            },
+        ],
+    )
+    session.execute.assert_awaited_once()
+    compiled = str(session.execute.await_args.args[0].compile(dialect=dialect))
+    assert compiled.startswith("UPDATE invoices SET status=totals.status")
+    assert "FROM (VALUES" in compiled
+    assert "WHERE invoices.id = totals.id" in compiled
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_idempotency_keys_skip_expired_rows_and_only_take_over_expired_keys_on_conflict() -> None:
+    session = _session_mock()
+    session.execute.return_value = MagicMock(rowcount=0)
+    _returning(session, None)
+
+    assert await get_idempotency_key(session, scope="payments:create", key="retry-1") is None
+    lookup = str(session.scalars.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "idempotency_keys.expires_at > now()" in lookup
+
+    inserted = await create_idempotency_key(
+        session,
+        data={
+            "scope": "payments:create",
+            "key": "retry-1",
+            "request_hash": "0" * 64,
+            "response_status": 200,
+            "response_body": {"id": "x"},
+            "expires_at": datetime(2026, 10, 19, tzinfo=UTC),
+        },
+    )
+    assert inserted is False
+    compiled = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (scope, key) DO UPDATE SET request_hash = excluded.request_hash" in compiled
+    assert compiled.endswith("WHERE idempotency_keys.expires_at <= now()")
+
+    session.execute.return_value = MagicMock(rowcount=3)
+    assert await delete_expired_idempotency_keys(session) == 3
+    purge = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert purge == "DELETE FROM idempotency_keys WHERE idempotency_keys.expires_at <= now()"
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_count_invoices_by_school_id_counts_through_students_in_one_query() -> None:
+    session = _session_mock()
+    session.scalar.return_value = None
+
+    assert await count_invoices_by_school_id(session, school_id=uuid7()) == 0
+    session.scalar.assert_awaited_once()
+    compiled = str(session.scalar.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert compiled.startswith("SELECT count(*) AS count_1 \nFROM invoices JOIN students")
+    assert "WHERE students.school_id = " in compiled
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_billing_runs_use_primary_key_lookup_and_insert_on_conflict_do_nothing() -> None:
+    session = _session_mock()
+    session.execute.return_value = MagicMock(rowcount=1)
+    run_id = uuid7()
+
+    await get_billing_run(session, run_id=run_id)
+    session.get.assert_awaited_once_with(BillingRun, run_id)
+
+    inserted = await create_billing_run(session, data={"id": run_id, "school_id": uuid7(), "request_hash": "0" * 64})
+    assert inserted is True
+    compiled = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert compiled.startswith("INSERT INTO billing_runs")
+    assert compiled.endswith("ON CONFLICT (id) DO NOTHING")
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_billing_run_invoices_go_out_as_one_multi_row_insert_skipping_existing_keys() -> None:
+    session = _session_mock()
+    session.execute.return_value = MagicMock(rowcount=1)
+    run_id = uuid7()
+    rows = [
+        {
+            "student_id": uuid7(),
+            "fee_code": fee_code,
+            "total_amount": Decimal("100.00"),
+            "due_date": date(2026, 9, 1),
+            "description": None,
+        }
+        for fee_code in ("tuition", "books")
+    ]
+
+    assert await insert_billing_run_invoices(session, run_id, []) == 0
+    session.execute.assert_not_awaited()
+
+    created = await insert_billing_run_invoices(session, run_id, rows)
+
+    assert created == 1
+    session.execute.assert_awaited_once()
+    compiled = session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("INSERT INTO invoices")
+    assert sql.count("%(student_id_m") == 2
+    assert sql.endswith("ON CONFLICT ON CONSTRAINT uq_invoices_billing_run_student_fee DO NOTHING")
+    assert compiled.params["billing_run_id_m0"] == run_id
+    assert compiled.params["fee_code_m1"] == "books"
+    assert compiled.params["status_m1"] == InvoiceStatus.PENDING
+    # asyncpg caps a statement at 32,767 bind parameters; a new invoice column must not push a full batch past it.
+    assert MAX_BATCH_SIZE * len(compiled.params) // len(rows) <= 32_767
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_aging_buckets_open_balances_in_one_grouped_query() -> None:
+    session = _session_mock()
+    school_id = uuid7()
+    result = MagicMock()
+    result.tuples.return_value = [(school_id, "31-60", 2, Decimal("75.00"))]
+    session.execute.return_value = result
+
+    rows = await sum_open_balances_by_aging_bucket(session, as_of=date(2026, 5, 1), school_id=school_id)
+
+    assert rows == [(school_id, AgingBucket.DAYS_31_60, 2, Decimal("75.00"))]
+    session.execute.assert_awaited_once()
+    compiled = session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    # The open-invoice predicate is spelled exactly like the partial indexes' so the planner can match them.
+    assert "WHERE status <> 'PAID' AND students.school_id = %(school_id_1)s::UUID" in sql
+    assert "(invoices.total_amount - invoices.payments_total) + invoices.refunds_total AS balance" in sql
+    assert "GROUP BY open_balances.school_id, open_balances.bucket" in sql
+    assert compiled.params["param_1"] == date(2026, 5, 1)
+    assert [compiled.params[f"param_{index}"] for index in (3, 5, 7, 9, 10)] == [bucket.value for bucket in AgingBucket]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_sum_payments_by_invoice_ids_runs_single_grouped_query() -> None:
+    session = _session_mock()
+    invoice_id = uuid7()
+    result = MagicMock()
+    result.tuples.return_value = [(invoice_id, Decimal("70.00"), Decimal("20.00"))]
+    session.execute.return_value = result
+
+    assert await sum_payments_by_invoice_ids(session, invoice_ids=[]) == []
+    session.execute.assert_not_awaited()
+
+    rows = await sum_payments_by_invoice_ids(session, invoice_ids=[invoice_id])
+    assert rows == [(invoice_id, Decimal("70.00"), Decimal("20.00"))]
+    session.execute.assert_awaited_once()
+    compiled = str(session.execute.await_args.args[0])
+    assert "GROUP BY payments.invoice_id" in compiled
+    assert "CASE WHEN" in compiled
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_list_queries_seek_past_cursor_in_id_order() -> None:
+    session = _session_mock()
+    session.execute.return_value = []
+    after_id = uuid7()
+
+    await list_invoices(session, limit=10, after_id=after_id)
+
+    compiled = session.execute.await_args.args[0].compile()
+    assert "invoices.id > :id_1" in str(compiled)
+    assert "ORDER BY invoices.id" in str(compiled)
+    assert compiled.params["id_1"] == after_id
+
+
+@pytest.mark.smoke
+def test_invoice_list_query_pushes_filters_and_sort_into_sql() -> None:
+    student_id = uuid7()
+    school_id = uuid7()
+    filters = InvoiceFiltersDTO(
+        statuses=(InvoiceStatus.PENDING, InvoiceStatus.PARTIAL),
+        due_after=date(2026, 1, 1),
+        due_before=date(2026, 4, 1),
+        student_id=student_id,
+        school_id=school_id,
+    )
+
+    compiled = invoice_list_query(limit=20, offset=40, filters=filters, sort=InvoiceSort.DUE_DATE_DESC).compile(
+        dialect=postgresql.dialect()
+    )
+    sql = str(compiled)
+    assert "invoices.status IN (__[POSTCOMPILE_status_1])" in sql
+    assert "invoices.due_date > %(due_date_1)s AND invoices.due_date < %(due_date_2)s" in sql
+    assert "invoices.student_id = %(student_id_1)s::UUID" in sql
+    assert "JOIN students ON students.id = invoices.student_id" in sql
+    assert "students.school_id = %(school_id_1)s::UUID" in sql
+    assert "ORDER BY invoices.due_date DESC, invoices.id DESC" in sql
+    assert compiled.params["status_1"] == [InvoiceStatus.PENDING, InvoiceStatus.PARTIAL]
+    assert (compiled.params["student_id_1"], compiled.params["school_id_1"]) == (student_id, school_id)
+
+    unfiltered = str(invoice_list_query(limit=20, sort=InvoiceSort.DUE_DATE).compile(dialect=postgresql.dialect()))
+    assert "WHERE" not in unfiltered
+    assert "JOIN" not in unfiltered
+    assert "ORDER BY invoices.due_date, invoices.id" in unfiltered
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize(("row_columns", "dto"), [(INVOICE_ROW_COLUMNS, InvoiceDTO), (PAYMENT_ROW_COLUMNS, PaymentDTO)])
+def test_row_columns_follow_dto_field_order(row_columns: tuple[InstrumentedAttribute[Any], ...], dto: type) -> None:
+    # Repos build DTOs positionally from these rows.
+    assert [column.key for column in row_columns] == [field.name for field in fields(dto)]
+
+
+@pytest.mark.smoke
+def test_engine_instrumentation_counts_statements_for_the_current_context() -> None:
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+            with pytest.raises(DBAPIError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 3"))
+
+    assert stats.count == 3
+    assert stats.seconds > 0
+    engine.dispose()
+
+
+@pytest.mark.smoke
+def test_engine_options_come_from_settings() -> None:
+    config = Settings(
+        database_url="postgresql+asyncpg://user:pass@db:5432/app",
+        db_pool_size=4,
+        db_max_overflow=2,
+        db_pool_timeout_seconds=1.5,
+        db_pool_recycle_seconds=600,
+        db_statement_cache_size=0,
+    )
+
+    options = engine_options(config)
+
+    assert options["poolclass"] is InstrumentedAsyncAdaptedQueuePool
+    assert options["pool_logging_name"] == "primary"
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"], options["pool_recycle"]) == (
+        4,
+        2,
+        1.5,
+        600,
+    )
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+    assert "connect_args" not in engine_options(Settings(database_url="sqlite+aiosqlite://"))
+
+
+@pytest.mark.smoke
+def test_instrumented_pool_exports_checkout_wait_timeouts_and_gauges() -> None:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    register_pool_gauges(engine.pool)
+    pool = {"pool": "test"}
+    waits_before = REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", pool) or 0.0
+    timeouts_before = REGISTRY.get_sample_value("db_pool_checkout_timeouts_total", pool) or 0.0
+
+    with engine.connect():
+        assert REGISTRY.get_sample_value("db_pool_checked_out", pool) == 1
+        with pytest.raises(SQLAlchemyTimeoutError):
+            engine.connect()
+
+    assert REGISTRY.get_sample_value("db_pool_checked_out", pool) == 0
+    assert REGISTRY.get_sample_value("db_pool_checked_in", pool) == 1
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", pool) == waits_before + 2
+    assert REGISTRY.get_sample_value("db_pool_checkout_timeouts_total", pool) == timeouts_before + 1
+    engine.dispose()
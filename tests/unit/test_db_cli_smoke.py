@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import subprocess
 import sys
+from datetime import date
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
 
 import pytest
 
 from app.db import cli
+from app.domain.dtos import FeeDTO
+from app.services.billing_runs import DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE
 
 
 @pytest.fixture
@@ -84,3 +89,112 @@ async def test_db_seed_rolls_back_on_failure(monkeypatch: pytest.MonkeyPatch) ->
 
     session.commit.assert_not_called()
     session.rollback.assert_awaited_once_with()
+
+
+@pytest.mark.smoke
+def test_db_check_totals_exits_non_zero_when_drift_is_not_fixed(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[bool] = []
+
+    async def fake_check(*, fix: bool) -> int:
+        calls.append(fix)
+        return 2
+
+    monkeypatch.setattr(cli, "_db_check_totals_async", fake_check)
+    monkeypatch.setattr(sys, "argv", ["db-check-totals"])
+    with pytest.raises(SystemExit) as exc_info:
+        cli.db_check_totals()
+    assert exc_info.value.code == 1
+
+    monkeypatch.setattr(sys, "argv", ["db-check-totals", "--fix"])
+    cli.db_check_totals()
+    assert calls == [False, True]
+
+
+@pytest.mark.smoke
+def test_db_bill_term_parses_repeated_fees(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[dict[str, object]] = []
+
+    async def fake_bill_term(**kwargs: object) -> None:
+        calls.append(kwargs)
+
+    monkeypatch.setattr(cli, "_db_bill_term_async", fake_bill_term)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "db-bill-term",
+            "--school-id",
+            "0190b3c8-0000-7000-8000-000000000001",
+            "--run-id",
+            "0190b3c8-0000-7000-8000-000000000002",
+            "--due-date",
+            "2026-09-01",
+            "--fee",
+            "tuition=1200.00",
+            "--fee",
+            "books=80.00:Books and materials",
+        ],
+    )
+    cli.db_bill_term()
+
+    assert calls == [
+        {
+            "run_id": UUID("0190b3c8-0000-7000-8000-000000000002"),
+            "school_id": UUID("0190b3c8-0000-7000-8000-000000000001"),
+            "fees": [
+                FeeDTO(code="tuition", amount=Decimal("1200.00")),
+                FeeDTO(code="books", amount=Decimal("80.00"), description="Books and materials"),
+            ],
+            "due_date": date(2026, 9, 1),
+            "batch_size": DEFAULT_BATCH_SIZE,
+        }
+    ]
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("batch_size", ["0", "-5", str(MAX_BATCH_SIZE + 1), "many"])
+def test_db_bill_term_rejects_batch_sizes_outside_the_insert_limit(
+    monkeypatch: pytest.MonkeyPatch, batch_size: str
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "db-bill-term",
+            "--school-id",
+            "0190b3c8-0000-7000-8000-000000000001",
+            "--run-id",
+            "0190b3c8-0000-7000-8000-000000000002",
+            "--due-date",
+            "2026-09-01",
+            "--fee",
+            "tuition=1200.00",
+            "--batch-size",
+            batch_size,
+        ],
+    )
+    with pytest.raises(SystemExit):
+        cli.db_bill_term()
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_db_purge_idempotency_keys_reports_the_deleted_count(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    purge_mock = AsyncMock(return_value=4)
+
+    class SessionFactory:
+        async def __aenter__(self) -> AsyncMock:
+            return AsyncMock()
+
+        async def __aexit__(self, exc_type: object, exc: object, tb: object) -> None:
+            return None
+
+    monkeypatch.setattr(cli, "SessionLocal", lambda: SessionFactory())
+    monkeypatch.setattr(cli, "purge_expired_idempotency_keys", purge_mock)
+
+    await cli._db_purge_idempotency_keys_async()
+
+    purge_mock.assert_awaited_once()
+    assert capsys.readouterr().out == "4 expired idempotency key(s) deleted\n"
@@ -3,6 +3,7 @@ from sqlalchemy import inspect as sa_inspect
 
 from app.db.base import Base
 from app.domain.enums import InvoiceStatus, PaymentKind
+from app.models.billing_run import BillingRun
 from app.models.invoice import Invoice
 from app.models.payment import Payment
 from app.models.school import School
@@ -12,7 +13,7 @@ from app.models.student import Student
 @pytest.mark.smoke
 def test_tables_registered_in_metadata() -> None:
     table_names = set(Base.metadata.tables.keys())
-    assert {"schools", "students", "invoices", "payments"}.issubset(table_names)
+    assert {"schools", "students", "invoices", "payments", "idempotency_keys", "billing_runs"}.issubset(table_names)
 
 
 @pytest.mark.smoke
@@ -20,6 +21,33 @@ def test_foreign_keys_have_indexes() -> None:
     assert Student.__table__.c.school_id.index is True
     assert Invoice.__table__.c.student_id.index is True
     assert Payment.__table__.c.invoice_id.index is True
+    assert BillingRun.__table__.c.school_id.index is True
+
+
+@pytest.mark.smoke
+def test_invoice_listing_indexes_match_the_filters_and_sorts() -> None:
+    indexes = {index.name: index for index in Invoice.__table__.indexes}
+    assert [column.name for column in indexes["ix_invoices_student_id_due_date"].columns] == ["student_id", "due_date"]
+    assert [column.name for column in indexes["ix_invoices_due_date_id"].columns] == ["due_date", "id"]
+    open_invoices = indexes["ix_invoices_open_status_due_date"]
+    assert [column.name for column in open_invoices.columns] == ["status", "due_date"]
+    assert str(open_invoices.dialect_options["postgresql"]["where"]) == "status <> 'PAID'"
+    aging = indexes["ix_invoices_open_student_id_aging"]
+    assert [column.name for column in aging.columns] == ["student_id"]
+    assert aging.dialect_options["postgresql"]["include"] == [
+        "due_date",
+        "total_amount",
+        "payments_total",
+        "refunds_total",
+    ]
+    assert str(aging.dialect_options["postgresql"]["where"]) == "status <> 'PAID'"
+
+
+@pytest.mark.smoke
+def test_billing_run_invoices_are_unique_per_run_student_and_fee() -> None:
+    constraints = {constraint.name: constraint for constraint in Invoice.__table__.constraints}
+    unique = constraints["uq_invoices_billing_run_student_fee"]
+    assert [column.name for column in unique.columns] == ["billing_run_id", "student_id", "fee_code"]
 
 
 @pytest.mark.smoke
@@ -1,21 +1,74 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+import asyncio
+import pickle
+import random
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import replace
-from datetime import date, datetime
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
 
 import pytest
+from prometheus_client import REGISTRY
+from pydantic import TypeAdapter
 from uuid_extensions import uuid7
 
-from app.domain.dtos import InvoiceDTO, PaymentDTO, SchoolDTO, StudentDTO
-from app.domain.enums import InvoiceStatus, PaymentKind
-from app.domain.errors import ConflictError, NotFoundError
+from app.cache.memory_backend import InMemoryStatementCache
+from app.cache.redis_backend import RedisStatementCache
+from app.domain.dtos import (
+    AgingBucketTotalsDTO,
+    BillingRunDTO,
+    BillingRunResultDTO,
+    FeeDTO,
+    IdempotencyRecordDTO,
+    InvoiceDTO,
+    InvoiceFiltersDTO,
+    InvoicePaymentTotalsDTO,
+    InvoiceTotalsUpdateDTO,
+    PaymentDTO,
+    SchoolDTO,
+    StudentDTO,
+)
+from app.domain.enums import AgingBucket, InvoiceSort, InvoiceStatus, PaymentKind
+from app.domain.errors import ConflictError, DomainError, NotFoundError
+from app.schemas.statement import SchoolStatement, StudentStatement
 from app.services import billing_rules
 from app.services import invoices as invoice_service
 from app.services import payments as payment_service
-from app.services.use_cases import GetSchoolStatement, GetStudentStatement, ListInvoicePayments
+from app.services import schools as school_service
+from app.services.billing_runs import MAX_BATCH_SIZE, run_term_billing
+from app.services.columnar_statements import ColumnarStatementEngine
+from app.services.idempotency import purge_expired_idempotency_keys, request_fingerprint
+from app.services.invoice_totals import check_invoice_totals
+from app.services.statement_cache import (
+    STUDENT_SCOPE,
+    CachedGetSchoolStatement,
+    CachedGetStudentStatement,
+    _CachedStatementJSON,
+    invalidate_school_statements,
+    school_statement_key,
+    student_statement_key,
+)
+from app.services.statement_offload import StatementOffload
+from app.services.statements import (
+    build_school_statement,
+    build_school_statement_from_payments,
+    build_student_statement,
+    encode_statement,
+    invoice_row,
+    summarize_invoice_rows,
+)
+from app.services.use_cases import (
+    GetAgingReport,
+    GetSchoolAging,
+    GetSchoolStatement,
+    GetStudentStatement,
+    ListInvoicePayments,
+)
 
 
 @pytest.fixture
@@ -30,18 +83,31 @@ class FakeSchoolRepo:
     async def get_by_id(self, school_id: UUID) -> SchoolDTO | None:
         return self.schools.get(school_id)
 
+    async def delete(self, school_id: UUID) -> bool:
+        return self.schools.pop(school_id, None) is not None
+
 
 class FakeStudentRepo:
     def __init__(self, students: dict[UUID, StudentDTO], by_school: dict[UUID, list[StudentDTO]]) -> None:
         self.students = students
         self.by_school = by_school
+        self.school_id_lookups: list[list[UUID]] = []
 
     async def get_by_id(self, student_id: UUID) -> StudentDTO | None:
         return self.students.get(student_id)
 
+    async def list_school_ids_by_student_ids(self, student_ids: Sequence[UUID]) -> list[UUID]:
+        self.school_id_lookups.append(list(student_ids))
+        return list(dict.fromkeys(self.students[sid].school_id for sid in student_ids if sid in self.students))
+
     async def list_by_school_id(self, school_id: UUID, *, offset: int = 0, limit: int = 100) -> list[StudentDTO]:
         return self.by_school.get(school_id, [])[offset : offset + limit]
 
+    async def iter_by_school_id(self, school_id: UUID, *, chunk_size: int = 500) -> AsyncIterator[list[StudentDTO]]:
+        students = self.by_school.get(school_id, [])
+        for start in range(0, len(students), chunk_size):
+            yield students[start : start + chunk_size]
+
 
 class FakeInvoiceRepo:
     def __init__(
@@ -49,10 +115,19 @@ class FakeInvoiceRepo:
         invoices_by_id: dict[UUID, InvoiceDTO],
         by_student: dict[UUID, list[InvoiceDTO]] | None = None,
         by_students: dict[tuple[UUID, ...], list[InvoiceDTO]] | None = None,
+        payments_by_invoice: dict[UUID, list[PaymentDTO]] | None = None,
     ) -> None:
         self.invoices_by_id = invoices_by_id
         self.by_student = by_student or {}
         self.by_students = by_students or {}
+        self.payments_by_invoice = payments_by_invoice or {}
+        self.locked: list[UUID] = []
+        self.student_id_batches: list[list[UUID]] = []
+        self.totals_updates: list[list[InvoiceTotalsUpdateDTO]] = []
+        self.aging_rows: list[AgingBucketTotalsDTO] = []
+        self.aging_calls: list[tuple[date, UUID | None]] = []
+        self.billing_run_batches: list[list[Mapping[str, object]]] = []
+        self.billing_run_keys: set[tuple[UUID, object, object]] = set()
 
     async def create(self, data: Mapping[str, object]) -> InvoiceDTO:
         invoice = InvoiceDTO(
@@ -67,9 +142,31 @@ class FakeInvoiceRepo:
         self.invoices_by_id[invoice.id] = invoice
         return invoice
 
+    async def create_for_billing_run(self, billing_run_id: UUID, rows: Sequence[Mapping[str, object]]) -> int:
+        # Mirrors ON CONFLICT DO NOTHING on the (billing run, student, fee) key.
+        if not rows:
+            return 0
+        self.billing_run_batches.append(list(rows))
+        keys = {(billing_run_id, row["student_id"], row["fee_code"]) for row in rows}
+        created = len(keys - self.billing_run_keys)
+        self.billing_run_keys |= keys
+        return created
+
     async def get_by_id(self, invoice_id: UUID) -> InvoiceDTO | None:
         return self.invoices_by_id.get(invoice_id)
 
+    async def get_by_id_for_update(self, invoice_id: UUID) -> InvoiceDTO | None:
+        self.locked.append(invoice_id)
+        return self.invoices_by_id.get(invoice_id)
+
+    async def list_by_ids_for_update(self, invoice_ids: Sequence[UUID]) -> list[InvoiceDTO]:
+        found = sorted(
+            (self.invoices_by_id[invoice_id] for invoice_id in set(invoice_ids) if invoice_id in self.invoices_by_id),
+            key=lambda invoice: invoice.id,
+        )
+        self.locked.extend(invoice.id for invoice in found)
+        return found
+
     async def update(self, invoice_id: UUID, data: Mapping[str, object]) -> InvoiceDTO | None:
         invoice = self.invoices_by_id.get(invoice_id)
         if invoice is None:
@@ -80,22 +177,77 @@ class FakeInvoiceRepo:
             total_amount=data.get("total_amount", invoice.total_amount),  # type: ignore[arg-type]
             due_date=data.get("due_date", invoice.due_date),  # type: ignore[arg-type]
             status=data.get("status", invoice.status),  # type: ignore[arg-type]
+            payments_total=data.get("payments_total", invoice.payments_total),  # type: ignore[arg-type]
+            refunds_total=data.get("refunds_total", invoice.refunds_total),  # type: ignore[arg-type]
             description=data.get("description", invoice.description),  # type: ignore[arg-type]
         )
         self.invoices_by_id[invoice_id] = updated
         return updated
 
+    async def update_totals_many(self, updates: Sequence[InvoiceTotalsUpdateDTO]) -> int:
+        self.totals_updates.append(list(updates))
+        for item in updates:
+            await self.update(
+                item.invoice_id,
+                {"status": item.status, "payments_total": item.payments_total, "refunds_total": item.refunds_total},
+            )
+        return len(updates)
+
+    async def list_all(
+        self,
+        *,
+        offset: int,
+        limit: int,
+        after_id: UUID | None = None,
+        filters: InvoiceFiltersDTO | None = None,
+        sort: InvoiceSort = InvoiceSort.ID,
+    ) -> list[InvoiceDTO]:
+        # Filters and sorts are pushed down to SQL in the real repo; the fake only pages in id order.
+        invoices = sorted(self.invoices_by_id.values(), key=lambda invoice: invoice.id)
+        if after_id is not None:
+            invoices = [invoice for invoice in invoices if invoice.id > after_id]
+        return invoices[offset : offset + limit]
+
+    async def aging_by_school(self, *, as_of: date, school_id: UUID | None = None) -> list[AgingBucketTotalsDTO]:
+        # Bucketing happens in SQL in the real repo; the fake serves pre-bucketed rows.
+        self.aging_calls.append((as_of, school_id))
+        return [row for row in self.aging_rows if school_id is None or row.school_id == school_id]
+
+    async def list_with_payment_totals(
+        self, *, offset: int, limit: int, after_id: UUID | None = None
+    ) -> list[tuple[InvoiceDTO, InvoicePaymentTotalsDTO]]:
+        rows = []
+        for invoice in await self.list_all(offset=offset, limit=limit, after_id=after_id):
+            totals = billing_rules.movement_totals(self.payments_by_invoice.get(invoice.id, []))
+            rows.append(
+                (
+                    invoice,
+                    InvoicePaymentTotalsDTO(
+                        invoice_id=invoice.id, payments_total=totals.payments_total, refunds_total=totals.refunds_total
+                    ),
+                )
+            )
+        return rows
+
     async def list_by_student_id(self, student_id: UUID) -> list[InvoiceDTO]:
         return self.by_student.get(student_id, [])
 
     async def list_by_student_ids(self, student_ids: Sequence[UUID]) -> list[InvoiceDTO]:
-        return self.by_students.get(tuple(student_ids), [])
+        self.student_id_batches.append(list(student_ids))
+        if tuple(student_ids) in self.by_students:
+            return self.by_students[tuple(student_ids)]
+        return [invoice for student_id in student_ids for invoice in self.by_student.get(student_id, [])]
+
+    async def count_by_school_id(self, school_id: UUID) -> int:
+        # Statement fakes hold a single school's invoices.
+        return sum(len(invoices) for invoices in self.by_student.values())
 
 
 class FakePaymentRepo:
     def __init__(self, by_invoice: dict[UUID, list[PaymentDTO]]) -> None:
         self.by_invoice = by_invoice
         self.by_id: dict[UUID, PaymentDTO] = {}
+        self.create_many_calls = 0
         for invoice_payments in by_invoice.values():
             for payment in invoice_payments:
                 self.by_id[payment.id] = payment
@@ -114,6 +266,9 @@ class FakePaymentRepo:
     async def get_by_id(self, payment_id: UUID) -> PaymentDTO | None:
         return self.by_id.get(payment_id)
 
+    async def get_by_id_for_update(self, payment_id: UUID) -> PaymentDTO | None:
+        return self.by_id.get(payment_id)
+
     async def update(self, payment_id: UUID, data: Mapping[str, object]) -> PaymentDTO | None:
         current = self.by_id.get(payment_id)
         if current is None:
@@ -140,6 +295,10 @@ class FakePaymentRepo:
         ]
         return True
 
+    async def create_many(self, rows: Sequence[Mapping[str, object]]) -> list[PaymentDTO]:
+        self.create_many_calls += 1
+        return [await self.create(row) for row in rows]
+
     async def list_by_invoice_id(self, invoice_id: UUID) -> list[PaymentDTO]:
         return list(self.by_invoice.get(invoice_id, []))
 
@@ -150,11 +309,104 @@ class FakePaymentRepo:
         return payments
 
 
+class FakeIdempotencyRepo:
+    def __init__(self) -> None:
+        self.records: dict[tuple[str, str], IdempotencyRecordDTO] = {}
+        self.racing_record: IdempotencyRecordDTO | None = None
+
+    async def get(self, scope: str, key: str) -> IdempotencyRecordDTO | None:
+        record = self.records.get((scope, key))
+        if record is None or record.expires_at <= datetime.now(UTC):
+            return None
+        return record
+
+    async def create(self, record: IdempotencyRecordDTO) -> bool:
+        if self.racing_record is not None:
+            self.records[(record.scope, record.key)] = self.racing_record
+        if await self.get(record.scope, record.key) is not None:
+            return False
+        self.records[(record.scope, record.key)] = record
+        return True
+
+    async def purge_expired(self) -> int:
+        now = datetime.now(UTC)
+        expired = [scope_key for scope_key, record in self.records.items() if record.expires_at <= now]
+        for scope_key in expired:
+            del self.records[scope_key]
+        return len(expired)
+
+
+class FakeBillingRunRepo:
+    def __init__(self) -> None:
+        self.runs: dict[UUID, BillingRunDTO] = {}
+
+    async def get(self, run_id: UUID) -> BillingRunDTO | None:
+        return self.runs.get(run_id)
+
+    async def create(self, run: BillingRunDTO) -> bool:
+        if run.id in self.runs:
+            return False
+        self.runs[run.id] = run
+        return True
+
+
+class FakeUnitOfWork:
+    def __init__(
+        self,
+        *,
+        invoices: FakeInvoiceRepo | None = None,
+        payments: FakePaymentRepo | None = None,
+        students: FakeStudentRepo | None = None,
+        schools: FakeSchoolRepo | None = None,
+    ) -> None:
+        self.schools = schools or FakeSchoolRepo({})
+        self.students = students or FakeStudentRepo(students={}, by_school={})
+        self.invoices = invoices or FakeInvoiceRepo(invoices_by_id={})
+        self.payments = payments or FakePaymentRepo(by_invoice={})
+        self.idempotency = FakeIdempotencyRepo()
+        self.billing_runs = FakeBillingRunRepo()
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+class FakeStatementRepos:
+    def __init__(
+        self,
+        *,
+        schools: FakeSchoolRepo | None = None,
+        students: FakeStudentRepo | None = None,
+        invoices: FakeInvoiceRepo | None = None,
+    ) -> None:
+        self.schools = schools or FakeSchoolRepo(schools={})
+        self.students = students or FakeStudentRepo(students={}, by_school={})
+        self.invoices = invoices or FakeInvoiceRepo(invoices_by_id={})
+        self.opened = 0
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[FakeStatementRepos]:
+        # Stands in for a session factory: every call is one more pooled session.
+        self.opened += 1
+        yield self
+
+
 def _payment(payment_id: UUID, amount: str, invoice_id: UUID, kind: PaymentKind = PaymentKind.PAYMENT) -> PaymentDTO:
     return PaymentDTO(id=payment_id, invoice_id=invoice_id, amount=Decimal(amount), kind=kind, paid_at=None)
 
 
-def _invoice(invoice_id: UUID, student_id: UUID, total_amount: str, status: InvoiceStatus) -> InvoiceDTO:
+def _invoice(
+    invoice_id: UUID,
+    student_id: UUID,
+    total_amount: str,
+    status: InvoiceStatus,
+    payments_total: str = "0.00",
+    refunds_total: str = "0.00",
+) -> InvoiceDTO:
     return InvoiceDTO(
         id=invoice_id,
         student_id=student_id,
@@ -163,6 +415,8 @@ def _invoice(invoice_id: UUID, student_id: UUID, total_amount: str, status: Invo
         issued_at=datetime(2026, 2, 1),
         description="Invoice",
         status=status,
+        payments_total=Decimal(payments_total),
+        refunds_total=Decimal(refunds_total),
     )
 
 
@@ -184,6 +438,31 @@ def test_business_rule_helpers_support_net_paid_and_three_statuses() -> None:
     assert billing_rules.derive_invoice_status(Decimal("20.00"), net_paid) == InvoiceStatus.PAID
 
 
+@pytest.mark.smoke
+def test_movement_totals_fold_payments_and_refunds_in_one_pass() -> None:
+    first_id = uuid7()
+    second_id = uuid7()
+    movements = [
+        _payment(uuid7(), "40.00", first_id),
+        _payment(uuid7(), "10.00", first_id, PaymentKind.REFUND),
+        _payment(uuid7(), "25.50", second_id),
+        _payment(uuid7(), "4.50", first_id),
+    ]
+
+    # A generator can only be walked once; the fused fold still sees every movement.
+    totals = billing_rules.movement_totals(movement for movement in movements)
+    assert (totals.payments_total, totals.refunds_total, totals.net_paid) == (
+        Decimal("70.00"),
+        Decimal("10.00"),
+        Decimal("60.00"),
+    )
+    assert billing_rules.net_paid_total(movement for movement in movements) == Decimal("60.00")
+    assert billing_rules.movement_totals_by_invoice(movements) == {
+        first_id: billing_rules.MovementTotals(Decimal("44.50"), Decimal("10.00")),
+        second_id: billing_rules.MovementTotals(Decimal("25.50"), Decimal("0.00")),
+    }
+
+
 @pytest.mark.smoke
 @pytest.mark.anyio
 async def test_invoice_create_defaults_status_pending() -> None:
@@ -191,7 +470,7 @@ async def test_invoice_create_defaults_status_pending() -> None:
     invoice_repo = FakeInvoiceRepo(invoices_by_id={})
 
     invoice = await invoice_service.create_invoice(
-        invoice_repo,
+        FakeUnitOfWork(invoices=invoice_repo),
         data={"student_id": student_id, "total_amount": Decimal("100.00"), "due_date": date(2026, 3, 1)},
     )
 
@@ -207,17 +486,16 @@ async def test_create_payment_transitions_status_pending_to_partial_to_paid() ->
         invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PENDING)}
     )
     payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
 
     await payment_service.create_payment(
-        payment_repo,
-        invoice_repo,
+        uow,
         data={"invoice_id": invoice_id, "amount": Decimal("30.00"), "kind": PaymentKind.PAYMENT},
     )
     assert (await invoice_repo.get_by_id(invoice_id)).status == InvoiceStatus.PARTIAL  # type: ignore[union-attr]
 
     await payment_service.create_payment(
-        payment_repo,
-        invoice_repo,
+        uow,
         data={"invoice_id": invoice_id, "amount": Decimal("70.00"), "kind": PaymentKind.PAYMENT},
     )
     assert (await invoice_repo.get_by_id(invoice_id)).status == InvoiceStatus.PAID  # type: ignore[union-attr]
@@ -229,22 +507,21 @@ async def test_create_refund_transitions_status_paid_to_partial_to_pending() ->
     student_id = uuid7()
     invoice_id = uuid7()
     invoice_repo = FakeInvoiceRepo(
-        invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PAID)}
+        invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PAID, "100.00")}
     )
     payment_repo = FakePaymentRepo(
         by_invoice={invoice_id: [_payment(uuid7(), "100.00", invoice_id, PaymentKind.PAYMENT)]}
     )
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
 
     await payment_service.create_payment(
-        payment_repo,
-        invoice_repo,
+        uow,
         data={"invoice_id": invoice_id, "amount": Decimal("40.00"), "kind": PaymentKind.REFUND},
     )
     assert (await invoice_repo.get_by_id(invoice_id)).status == InvoiceStatus.PARTIAL  # type: ignore[union-attr]
 
     await payment_service.create_payment(
-        payment_repo,
-        invoice_repo,
+        uow,
         data={"invoice_id": invoice_id, "amount": Decimal("60.00"), "kind": PaymentKind.REFUND},
     )
     assert (await invoice_repo.get_by_id(invoice_id)).status == InvoiceStatus.PENDING  # type: ignore[union-attr]
@@ -259,13 +536,15 @@ async def test_create_payment_rejects_overpayment() -> None:
         invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PENDING)}
     )
     payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
 
     with pytest.raises(ConflictError, match="payment amount exceeds remaining balance"):
         await payment_service.create_payment(
-            payment_repo,
-            invoice_repo,
+            uow,
             data={"invoice_id": invoice_id, "amount": Decimal("101.00"), "kind": PaymentKind.PAYMENT},
         )
+    assert uow.commits == 0
+    assert payment_repo.by_id == {}
 
 
 @pytest.mark.smoke
@@ -274,16 +553,16 @@ async def test_create_payment_rejects_over_refund() -> None:
     student_id = uuid7()
     invoice_id = uuid7()
     invoice_repo = FakeInvoiceRepo(
-        invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PARTIAL)}
+        invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PARTIAL, "50.00")}
     )
     payment_repo = FakePaymentRepo(
         by_invoice={invoice_id: [_payment(uuid7(), "50.00", invoice_id, PaymentKind.PAYMENT)]}
     )
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
 
     with pytest.raises(ConflictError, match="refund amount exceeds net paid amount"):
         await payment_service.create_payment(
-            payment_repo,
-            invoice_repo,
+            uow,
             data={"invoice_id": invoice_id, "amount": Decimal("60.00"), "kind": PaymentKind.REFUND},
         )
 
@@ -298,22 +577,14 @@ async def test_get_student_statement_use_case_aggregates_net_paid_totals() -> No
 
     student = StudentDTO(id=student_id, school_id=school_id, full_name="Ada Lovelace")
     invoices = [
-        _invoice(invoice_1_id, student_id, "100.00", InvoiceStatus.PAID),
-        _invoice(invoice_2_id, student_id, "50.00", InvoiceStatus.PARTIAL),
+        _invoice(invoice_1_id, student_id, "100.00", InvoiceStatus.PAID, "100.00"),
+        _invoice(invoice_2_id, student_id, "50.00", InvoiceStatus.PARTIAL, "40.00", "10.00"),
     ]
-    payment_repo = FakePaymentRepo(
-        by_invoice={
-            invoice_1_id: [_payment(uuid7(), "100.00", invoice_1_id, PaymentKind.PAYMENT)],
-            invoice_2_id: [
-                _payment(uuid7(), "40.00", invoice_2_id, PaymentKind.PAYMENT),
-                _payment(uuid7(), "10.00", invoice_2_id, PaymentKind.REFUND),
-            ],
-        }
-    )
     use_case = GetStudentStatement(
-        student_repo=FakeStudentRepo(students={student_id: student}, by_school={}),
-        invoice_repo=FakeInvoiceRepo(invoices_by_id={}, by_student={student_id: invoices}, by_students={}),
-        payment_repo=payment_repo,
+        FakeStatementRepos(
+            students=FakeStudentRepo(students={student_id: student}, by_school={}),
+            invoices=FakeInvoiceRepo(invoices_by_id={}, by_student={student_id: invoices}, by_students={}),
+        )
     )
 
     statement = await use_case(student_id)
@@ -345,23 +616,18 @@ async def test_get_school_statement_use_case_aggregates_across_students() -> Non
         StudentDTO(id=student_2_id, school_id=school_id, full_name="Alan Turing"),
     ]
     invoices = [
-        _invoice(invoice_1_id, student_1_id, "80.00", InvoiceStatus.PARTIAL),
-        _invoice(invoice_2_id, student_2_id, "120.00", InvoiceStatus.PAID),
+        _invoice(invoice_1_id, student_1_id, "80.00", InvoiceStatus.PARTIAL, "20.00"),
+        _invoice(invoice_2_id, student_2_id, "120.00", InvoiceStatus.PAID, "120.00"),
     ]
-    payment_repo = FakePaymentRepo(
-        by_invoice={
-            invoice_1_id: [_payment(uuid7(), "20.00", invoice_1_id)],
-            invoice_2_id: [_payment(uuid7(), "120.00", invoice_2_id)],
-        }
-    )
 
     use_case = GetSchoolStatement(
-        school_repo=FakeSchoolRepo(schools={school_id: school}),
-        student_repo=FakeStudentRepo(students={}, by_school={school_id: students}),
-        invoice_repo=FakeInvoiceRepo(
-            invoices_by_id={}, by_student={}, by_students={(student_1_id, student_2_id): invoices}
-        ),
-        payment_repo=payment_repo,
+        FakeStatementRepos(
+            schools=FakeSchoolRepo(schools={school_id: school}),
+            students=FakeStudentRepo(students={}, by_school={school_id: students}),
+            invoices=FakeInvoiceRepo(
+                invoices_by_id={}, by_student={}, by_students={(student_1_id, student_2_id): invoices}
+            ),
+        )
     )
 
     statement = await use_case(school_id)
@@ -378,21 +644,569 @@ async def test_get_school_statement_use_case_aggregates_across_students() -> Non
 
 @pytest.mark.smoke
 @pytest.mark.anyio
-async def test_use_cases_raise_not_found_for_missing_entities() -> None:
+async def test_get_school_statement_pages_through_every_student_in_chunks() -> None:
+    school = SchoolDTO(id=uuid7(), name="Large Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {index}") for index in range(250)]
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={},
+        by_student={
+            student.id: [_invoice(uuid7(), student.id, "10.00", InvoiceStatus.PARTIAL, "4.00")] for student in students
+        },
+    )
+    use_case = GetSchoolStatement(
+        FakeStatementRepos(
+            schools=FakeSchoolRepo(schools={school.id: school}),
+            students=FakeStudentRepo(students={}, by_school={school.id: students}),
+            invoices=invoice_repo,
+        ),
+        chunk_size=100,
+    )
+
+    statement = await use_case(school.id)
+
+    assert statement.students_count == 250
+    assert len(statement.invoices) == 250
+    assert statement.totals.invoiced_total == Decimal("2500.00")
+    assert statement.totals.balance_due_total == Decimal("1500.00")
+    assert [len(batch) for batch in invoice_repo.student_id_batches] == [100, 100, 50]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_school_statement_folds_chunks_in_order_holding_at_most_max_concurrency() -> None:
+    first_chunk_released = asyncio.Event()
+    paged: list[int] = []
+
+    class PagingStudentRepo(FakeStudentRepo):
+        async def iter_by_school_id(self, school_id: UUID, *, chunk_size: int = 500) -> AsyncIterator[list[StudentDTO]]:
+            async for students in super().iter_by_school_id(school_id, chunk_size=chunk_size):
+                paged.append(len(students))
+                yield students
+
+    class BlockingInvoiceRepo(FakeInvoiceRepo):
+        async def list_by_student_ids(self, student_ids: Sequence[UUID]) -> list[InvoiceDTO]:
+            if student_ids[0] == students[0].id:
+                await first_chunk_released.wait()
+            return await super().list_by_student_ids(student_ids)
+
+    school = SchoolDTO(id=uuid7(), name="Bounded Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {index}") for index in range(100)]
+    by_student = {student.id: [_invoice(uuid7(), student.id, "10.00", InvoiceStatus.PENDING)] for student in students}
+    repos = FakeStatementRepos(
+        schools=FakeSchoolRepo(schools={school.id: school}),
+        students=PagingStudentRepo(students={}, by_school={school.id: students}),
+        invoices=BlockingInvoiceRepo(invoices_by_id={}, by_student=by_student),
+    )
+
+    statement_task = asyncio.create_task(GetSchoolStatement(repos, chunk_size=10, max_concurrency=3)(school.id))
+    for _ in range(20):
+        await asyncio.sleep(0)
+    # The first chunk cannot be folded yet, so paging stops once three chunks are held.
+    assert len(paged) == 3
+    first_chunk_released.set()
+    statement = await statement_task
+
+    assert len(paged) == 10
+    assert [invoice.student_id for invoice in statement.invoices] == [student.id for student in students]
+    with pytest.raises(ValueError):
+        GetSchoolStatement(repos, max_concurrency=1)
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_large_school_statements_build_summaries_in_the_offload_executor() -> None:
+    class RecordingExecutor(ThreadPoolExecutor):
+        def __init__(self) -> None:
+            super().__init__(max_workers=2)
+            self.batch_sizes: list[int] = []
+
+        def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future[Any]:
+            self.batch_sizes.append(len(args[0]))
+            return super().submit(fn, *args, **kwargs)
+
+    school = SchoolDTO(id=uuid7(), name="Offload Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {index}") for index in range(120)]
+    by_student = {
+        student.id: [_invoice(uuid7(), student.id, "10.00", InvoiceStatus.PARTIAL, "6.00", "1.50")]
+        for student in students
+    }
+    repos = FakeStatementRepos(
+        schools=FakeSchoolRepo(schools={school.id: school}),
+        students=FakeStudentRepo(students={}, by_school={school.id: students}),
+        invoices=FakeInvoiceRepo(invoices_by_id={}, by_student=by_student),
+    )
+
+    with RecordingExecutor() as executor:
+        small = StatementOffload(executor, min_invoices=500, chunk_invoices=50)
+        large = StatementOffload(executor, min_invoices=60, chunk_invoices=25)
+        inline = await GetSchoolStatement(repos, chunk_size=40, offload=small)(school.id)
+        assert executor.batch_sizes == []
+        offloaded = await GetSchoolStatement(repos, chunk_size=40, offload=large)(school.id)
+        # The response splices the workers' JSON arrays in as they are, next to the inline chunk's encoding.
+        offloaded_json = await GetSchoolStatement(repos, chunk_size=40, offload=large).json(school.id)
+        empty_json = await GetSchoolStatement(
+            FakeStatementRepos(schools=FakeSchoolRepo(schools={school.id: school})), offload=large
+        ).json(school.id)
+
+    # The school's 120 invoices reach min_invoices, so every 40-invoice chunk, the first included, goes to the executor.
+    assert executor.batch_sizes[:6] == [25, 15, 25, 15, 25, 15]
+    assert offloaded == inline
+    assert offloaded_json == encode_statement(inline)
+    assert SchoolStatement.model_validate_json(empty_json).invoices == []
+    assert offloaded.students_count == 120
+    assert offloaded.totals.balance_due_total == Decimal("660.00")
+
+    # Rows and results cross a process boundary in production, so both must survive pickling unchanged.
+    rows = [invoice_row(invoice) for invoices in by_student.values() for invoice in invoices]
+    assert pickle.loads(pickle.dumps(summarize_invoice_rows(rows))) == summarize_invoice_rows(
+        pickle.loads(pickle.dumps(rows))
+    )
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_school_statement_runs_independent_queries_concurrently_within_its_limit() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def query() -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    class SlowSchoolRepo(FakeSchoolRepo):
+        async def get_by_id(self, school_id: UUID) -> SchoolDTO | None:
+            await query()
+            return await super().get_by_id(school_id)
+
+    class SlowInvoiceRepo(FakeInvoiceRepo):
+        async def list_by_student_ids(self, student_ids: Sequence[UUID]) -> list[InvoiceDTO]:
+            await query()
+            return await super().list_by_student_ids(student_ids)
+
+    school = SchoolDTO(id=uuid7(), name="Pipelined Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {index}") for index in range(50)]
+    by_student = {student.id: [_invoice(uuid7(), student.id, "10.00", InvoiceStatus.PENDING)] for student in students}
+    repos = FakeStatementRepos(
+        schools=SlowSchoolRepo(schools={school.id: school}),
+        students=FakeStudentRepo(students={}, by_school={school.id: students}),
+        invoices=SlowInvoiceRepo(invoices_by_id={}, by_student=by_student),
+    )
+
+    statement = await GetSchoolStatement(repos, chunk_size=10, max_concurrency=3)(school.id)
+
+    # One session pages the students, one looks up the school and one serves each of the five invoice chunks.
+    assert repos.opened == 7
+    assert 1 < peak <= 3
+    assert [invoice.student_id for invoice in statement.invoices] == [student.id for student in students]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_school_statement_from_running_totals_matches_python_reference() -> None:
+    school_id = uuid7()
+    student_id = uuid7()
+    paid_id = uuid7()
+    refunded_id = uuid7()
+    untouched_id = uuid7()
+
+    school = SchoolDTO(id=school_id, name="Reference Academy")
+    students = [StudentDTO(id=student_id, school_id=school_id, full_name="Katherine Johnson")]
+    invoices = [
+        _invoice(paid_id, student_id, "90.00", InvoiceStatus.PAID, "90.00"),
+        _invoice(refunded_id, student_id, "60.00", InvoiceStatus.PARTIAL, "60.00", "15.00"),
+        _invoice(untouched_id, student_id, "30.00", InvoiceStatus.PENDING),
+    ]
+    payment_repo = FakePaymentRepo(
+        by_invoice={
+            paid_id: [_payment(uuid7(), "50.00", paid_id), _payment(uuid7(), "40.00", paid_id)],
+            refunded_id: [
+                _payment(uuid7(), "60.00", refunded_id),
+                _payment(uuid7(), "15.00", refunded_id, PaymentKind.REFUND),
+            ],
+        }
+    )
+    payments = await payment_repo.list_by_invoice_ids([invoice.id for invoice in invoices])
+
+    reference = build_school_statement_from_payments(school, students, invoices, payments)
+    running = build_school_statement(school, students, invoices)
+
+    assert running == reference
+    assert running.invoices[2].payments_total == Decimal("0.00")
+    assert running.totals.refunds_total == Decimal("15.00")
+
+
+@pytest.mark.smoke
+def test_columnar_engine_matches_per_object_statements() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    schools = [SchoolDTO(id=uuid7(), name=f"School {index}") for index in range(3)]
+    # The last school has no students, so it must come back as an empty statement.
+    students = [
+        StudentDTO(id=uuid7(), school_id=schools[index % 2].id, full_name=f"Student {index}") for index in range(30)
+    ]
+    invoice_ids = [uuid7() for _ in range(200)]
+    payments = [
+        _payment(
+            uuid7(),
+            f"{rng.randint(1, 5_000) / 100:.2f}",
+            rng.choice(invoice_ids),
+            PaymentKind.REFUND if rng.random() < 0.2 else PaymentKind.PAYMENT,
+        )
+        for _ in range(1_000)
+    ]
+    totals = billing_rules.movement_totals_by_invoice(payments)
+    # Invoices of different students interleave, so each statement must keep its own invoices in input order.
+    invoices = [
+        replace(
+            _invoice(invoice_id, rng.choice(students).id, "500.00", InvoiceStatus.PARTIAL),
+            payments_total=totals.get(invoice_id, billing_rules.MovementTotals()).payments_total,
+            refunds_total=totals.get(invoice_id, billing_rules.MovementTotals()).refunds_total,
+        )
+        for invoice_id in invoice_ids
+    ]
+
+    stored = ColumnarStatementEngine(students, invoices)
+    recomputed = ColumnarStatementEngine(students, invoices, payments)
+
+    for school in schools:
+        school_students = [student for student in students if student.school_id == school.id]
+        student_ids = {student.id for student in school_students}
+        school_invoices = [invoice for invoice in invoices if invoice.student_id in student_ids]
+        expected = build_school_statement(school, school_students, school_invoices)
+        assert stored.school_statement(school.id) == expected
+        assert recomputed.school_statement(school.id) == build_school_statement_from_payments(
+            school, school_students, school_invoices, payments
+        )
+        if school_students:
+            assert stored.school_totals()[school.id] == expected.totals
+    for student in students:
+        expected_student = build_student_statement(
+            student, [invoice for invoice in invoices if invoice.student_id == student.id]
+        )
+        assert stored.student_statement(student.id) == expected_student
+        assert recomputed.student_totals()[student.id] == expected_student.totals
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_payment_writes_keep_invoice_running_totals_in_sync() -> None:
+    student_id = uuid7()
+    source_id = uuid7()
+    target_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={
+            source_id: _invoice(source_id, student_id, "100.00", InvoiceStatus.PENDING),
+            target_id: _invoice(target_id, student_id, "50.00", InvoiceStatus.PENDING),
+        }
+    )
+    payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+
+    payment = await payment_service.create_payment(uow, data={"invoice_id": source_id, "amount": Decimal("40.00")})
+    await payment_service.create_payment(uow, data={"invoice_id": source_id, "amount": Decimal("10.00")})
+    await payment_service.create_payment(
+        uow,
+        data={"invoice_id": source_id, "amount": Decimal("5.00"), "kind": PaymentKind.REFUND},
+    )
+    await payment_service.update_payment(
+        uow, payment_id=payment.id, data={"invoice_id": target_id, "amount": Decimal("50.00")}
+    )
+
+    source = invoice_repo.invoices_by_id[source_id]
+    target = invoice_repo.invoices_by_id[target_id]
+    assert (source.payments_total, source.refunds_total, source.status) == (
+        Decimal("10.00"),
+        Decimal("5.00"),
+        InvoiceStatus.PARTIAL,
+    )
+    assert (target.payments_total, target.refunds_total, target.status) == (
+        Decimal("50.00"),
+        Decimal("0.00"),
+        InvoiceStatus.PAID,
+    )
+    assert uow.commits == 4
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_payment_writes_lock_invoices_in_id_order() -> None:
+    student_id = uuid7()
+    lower_id = uuid7()
+    higher_id = uuid7()
+    payment_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={
+            lower_id: _invoice(lower_id, student_id, "100.00", InvoiceStatus.PENDING),
+            higher_id: _invoice(higher_id, student_id, "100.00", InvoiceStatus.PARTIAL, "20.00"),
+        }
+    )
+    payment_repo = FakePaymentRepo(by_invoice={higher_id: [_payment(payment_id, "20.00", higher_id)]})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+
+    await payment_service.create_payment(uow, data={"invoice_id": higher_id, "amount": Decimal("5.00")})
+    assert invoice_repo.locked == [higher_id]
+
+    invoice_repo.locked.clear()
+    await payment_service.update_payment(uow, payment_id=payment_id, data={"invoice_id": lower_id})
+    assert invoice_repo.locked == [lower_id, higher_id]
+
+    invoice_repo.locked.clear()
+    with pytest.raises(NotFoundError):
+        await payment_service.update_payment(uow, payment_id=payment_id, data={"invoice_id": uuid7()})
+    assert uow.commits == 2
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_bulk_payments_validate_accumulated_deltas_and_write_once() -> None:
+    student_id = uuid7()
+    first_id = uuid7()
+    second_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={
+            first_id: _invoice(first_id, student_id, "100.00", InvoiceStatus.PARTIAL, "20.00"),
+            second_id: _invoice(second_id, student_id, "50.00", InvoiceStatus.PENDING),
+        }
+    )
+    payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
     missing_id = uuid7()
 
-    student_statement_uc = GetStudentStatement(
-        student_repo=FakeStudentRepo(students={}, by_school={}),
-        invoice_repo=FakeInvoiceRepo(invoices_by_id={}, by_student={}, by_students={}),
-        payment_repo=FakePaymentRepo(by_invoice={}),
+    results = await payment_service.create_payments_bulk(
+        uow,
+        [
+            {"invoice_id": first_id, "amount": Decimal("50.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": first_id, "amount": Decimal("40.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": second_id, "amount": Decimal("50.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": missing_id, "amount": Decimal("1.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": first_id, "amount": Decimal("30.00"), "kind": PaymentKind.PAYMENT},
+            {"invoice_id": first_id, "amount": Decimal("10.00"), "kind": PaymentKind.REFUND},
+        ],
     )
 
-    school_statement_uc = GetSchoolStatement(
-        school_repo=FakeSchoolRepo(schools={}),
-        student_repo=FakeStudentRepo(students={}, by_school={}),
-        invoice_repo=FakeInvoiceRepo(invoices_by_id={}, by_student={}, by_students={}),
-        payment_repo=FakePaymentRepo(by_invoice={}),
+    assert [result.index for result in results] == list(range(6))
+    assert [result.payment is not None for result in results] == [True, False, True, False, True, True]
+    assert results[1].error == "payment amount exceeds remaining balance"
+    assert results[3].error == f"invoice {missing_id} not found"
+
+    first = invoice_repo.invoices_by_id[first_id]
+    second = invoice_repo.invoices_by_id[second_id]
+    assert (first.payments_total, first.refunds_total, first.status) == (
+        Decimal("100.00"),
+        Decimal("10.00"),
+        InvoiceStatus.PARTIAL,
+    )
+    assert (second.payments_total, second.status) == (Decimal("50.00"), InvoiceStatus.PAID)
+    assert invoice_repo.locked == sorted([first_id, second_id])
+    assert payment_repo.create_many_calls == 1
+    assert [[item.invoice_id for item in batch] for batch in invoice_repo.totals_updates] == [
+        sorted([first_id, second_id])
+    ]
+    assert uow.commits == 1
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_create_payment_replays_stored_result_for_repeated_idempotency_key() -> None:
+    student_id = uuid7()
+    invoice_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PENDING)}
+    )
+    payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+    data = {"invoice_id": invoice_id, "amount": Decimal("60.00"), "kind": PaymentKind.PAYMENT}
+
+    first = await payment_service.create_payment(uow, data=data, idempotency_key="bank-retry-1")
+    invoice_repo.locked.clear()
+    retried = await payment_service.create_payment(uow, data=data, idempotency_key="bank-retry-1")
+
+    assert retried == first
+    assert invoice_repo.locked == []
+    assert len(payment_repo.by_id) == 1
+    assert invoice_repo.invoices_by_id[invoice_id].payments_total == Decimal("60.00")
+    assert uow.commits == 1
+
+    with pytest.raises(ConflictError, match="idempotency key was already used for a different request"):
+        await payment_service.create_payment(
+            uow, data={**data, "amount": Decimal("10.00")}, idempotency_key="bank-retry-1"
+        )
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_create_payment_rolls_back_when_concurrent_request_claims_the_key() -> None:
+    student_id = uuid7()
+    invoice_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={invoice_id: _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PENDING)}
+    )
+    uow = FakeUnitOfWork(invoices=invoice_repo)
+    data = {"invoice_id": invoice_id, "amount": Decimal("60.00"), "kind": PaymentKind.PAYMENT}
+    winner = _payment(uuid7(), "60.00", invoice_id)
+    uow.idempotency.racing_record = IdempotencyRecordDTO(
+        scope=payment_service.PAYMENT_CREATE_SCOPE,
+        key="bank-retry-2",
+        request_hash=request_fingerprint(data),
+        response_status=200,
+        response_body=TypeAdapter(PaymentDTO).dump_python(winner, mode="json"),
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+    )
+
+    result = await payment_service.create_payment(uow, data=data, idempotency_key="bank-retry-2")
+
+    assert result == winner
+    assert (uow.commits, uow.rollbacks) == (0, 1)
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_create_payment_replays_a_retry_that_sends_the_amount_at_another_scale() -> None:
+    invoice_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={invoice_id: _invoice(invoice_id, uuid7(), "100.00", InvoiceStatus.PENDING)}
+    )
+    payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+    data = {"invoice_id": invoice_id, "amount": Decimal("10.00"), "kind": PaymentKind.PAYMENT}
+
+    first = await payment_service.create_payment(uow, data=data, idempotency_key="bank-retry-3")
+    retried = await payment_service.create_payment(
+        uow, data={**data, "amount": Decimal("10")}, idempotency_key="bank-retry-3"
+    )
+
+    assert retried == first
+    assert len(payment_repo.by_id) == 1
+    assert request_fingerprint({"fees": [{"amount": Decimal("1200")}]}) == request_fingerprint(
+        {"fees": [{"amount": Decimal("1200.00")}]}
+    )
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_expired_idempotency_keys_are_reused_and_purged() -> None:
+    invoice_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={invoice_id: _invoice(invoice_id, uuid7(), "100.00", InvoiceStatus.PENDING)}
+    )
+    payment_repo = FakePaymentRepo(by_invoice={})
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+    data = {"invoice_id": invoice_id, "amount": Decimal("10.00"), "kind": PaymentKind.PAYMENT}
+
+    first = await payment_service.create_payment(
+        uow, data=data, idempotency_key="bank-retry-4", idempotency_ttl=timedelta(0)
+    )
+    # The key expired at once, so the same key with another body is a new payment rather than a 409.
+    second = await payment_service.create_payment(
+        uow, data={**data, "amount": Decimal("20.00")}, idempotency_key="bank-retry-4", idempotency_ttl=timedelta(0)
+    )
+    assert second.id != first.id
+    assert len(payment_repo.by_id) == 2
+
+    assert await purge_expired_idempotency_keys(uow) == 1
+    assert uow.idempotency.records == {}
+    assert uow.commits == 3
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_check_invoice_totals_reports_and_fixes_drift() -> None:
+    student_id = uuid7()
+    in_sync_id = uuid7()
+    drifted_id = uuid7()
+    payment_repo = FakePaymentRepo(
+        by_invoice={
+            in_sync_id: [_payment(uuid7(), "30.00", in_sync_id)],
+            drifted_id: [
+                _payment(uuid7(), "100.00", drifted_id),
+                _payment(uuid7(), "20.00", drifted_id, PaymentKind.REFUND),
+            ],
+        }
+    )
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={
+            in_sync_id: _invoice(in_sync_id, student_id, "100.00", InvoiceStatus.PARTIAL, "30.00"),
+            drifted_id: _invoice(drifted_id, student_id, "100.00", InvoiceStatus.PENDING),
+        },
+        payments_by_invoice=payment_repo.by_invoice,
+    )
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+
+    drift = await check_invoice_totals(uow, batch_size=1)
+    assert uow.commits == 0
+    assert [item.invoice_id for item in drift] == [drifted_id]
+    assert drift[0].actual.net_paid == Decimal("80.00")
+    assert invoice_repo.invoices_by_id[drifted_id].payments_total == Decimal("0.00")
+
+    await check_invoice_totals(uow, fix=True)
+    repaired = invoice_repo.invoices_by_id[drifted_id]
+    assert (repaired.payments_total, repaired.refunds_total, repaired.status) == (
+        Decimal("100.00"),
+        Decimal("20.00"),
+        InvoiceStatus.PARTIAL,
+    )
+    assert await check_invoice_totals(uow) == []
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_check_invoice_totals_fix_recounts_movements_under_the_invoice_lock() -> None:
+    invoice_id = uuid7()
+    payment_repo = FakePaymentRepo(by_invoice={invoice_id: [_payment(uuid7(), "40.00", invoice_id)]})
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={invoice_id: _invoice(invoice_id, uuid7(), "100.00", InvoiceStatus.PENDING)},
+        payments_by_invoice=payment_repo.by_invoice,
+    )
+    unlocked_read = invoice_repo.list_with_payment_totals
+
+    async def read_then_race_a_payment(
+        *, offset: int, limit: int, after_id: UUID | None = None
+    ) -> list[tuple[InvoiceDTO, InvoicePaymentTotalsDTO]]:
+        rows = await unlocked_read(offset=offset, limit=limit, after_id=after_id)
+        # A payment commits between the drift read and the repair.
+        payment_repo.by_invoice[invoice_id].append(_payment(uuid7(), "60.00", invoice_id))
+        return rows
+
+    invoice_repo.list_with_payment_totals = read_then_race_a_payment  # type: ignore[method-assign]
+    uow = FakeUnitOfWork(invoices=invoice_repo, payments=payment_repo)
+
+    drift = await check_invoice_totals(uow, batch_size=10, fix=True)
+
+    assert drift[0].actual.payments_total == Decimal("40.00")
+    assert invoice_repo.locked == [invoice_id]
+    repaired = invoice_repo.invoices_by_id[invoice_id]
+    assert (repaired.payments_total, repaired.status) == (Decimal("100.00"), InvoiceStatus.PAID)
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_update_invoice_locks_the_row_before_checking_paid_totals() -> None:
+    invoice_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(
+        invoices_by_id={invoice_id: _invoice(invoice_id, uuid7(), "100.00", InvoiceStatus.PARTIAL, "60.00")}
     )
+    uow = FakeUnitOfWork(invoices=invoice_repo)
+
+    updated = await invoice_service.update_invoice(uow, invoice_id, {"total_amount": Decimal("60.00")})
+
+    assert invoice_repo.locked == [invoice_id]
+    assert (updated.total_amount, updated.status) == (Decimal("60.00"), InvoiceStatus.PAID)
+    with pytest.raises(ConflictError):
+        await invoice_service.update_invoice(uow, invoice_id, {"total_amount": Decimal("50.00")})
+    assert uow.commits == 1
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_use_cases_raise_not_found_for_missing_entities() -> None:
+    missing_id = uuid7()
+
+    student_statement_uc = GetStudentStatement(FakeStatementRepos())
+
+    school_statement_uc = GetSchoolStatement(FakeStatementRepos())
 
     invoice_payments_uc = ListInvoicePayments(
         invoice_repo=FakeInvoiceRepo(invoices_by_id={}, by_student={}, by_students={}),
@@ -407,3 +1221,368 @@ async def test_use_cases_raise_not_found_for_missing_entities() -> None:
 
     with pytest.raises(NotFoundError):
         await invoice_payments_uc(missing_id)
+
+    with pytest.raises(NotFoundError):
+        await GetSchoolAging(FakeSchoolRepo({}), FakeInvoiceRepo(invoices_by_id={}))(missing_id)
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_aging_fills_every_bucket_and_rolls_schools_up() -> None:
+    school = SchoolDTO(id=uuid7(), name="Aging Academy")
+    other_school_id = uuid7()
+    invoice_repo = FakeInvoiceRepo(invoices_by_id={})
+    invoice_repo.aging_rows = [
+        AgingBucketTotalsDTO(school.id, AgingBucket.CURRENT, 2, Decimal("150.00")),
+        AgingBucketTotalsDTO(school.id, AgingBucket.DAYS_OVER_90, 1, Decimal("40.00")),
+        AgingBucketTotalsDTO(other_school_id, AgingBucket.DAYS_31_60, 3, Decimal("75.50")),
+        AgingBucketTotalsDTO(other_school_id, AgingBucket.DAYS_OVER_90, 1, Decimal("10.00")),
+    ]
+    as_of = date(2026, 5, 1)
+
+    school_aging = await GetSchoolAging(FakeSchoolRepo({school.id: school}), invoice_repo)(school.id, as_of)
+    report = await GetAgingReport(invoice_repo)(as_of)
+
+    assert invoice_repo.aging_calls == [(as_of, school.id), (as_of, None)]
+    assert [bucket.bucket for bucket in school_aging.buckets] == list(AgingBucket)
+    assert [(bucket.invoices_count, bucket.balance_due) for bucket in school_aging.buckets] == [
+        (2, Decimal("150.00")),
+        (0, Decimal("0.00")),
+        (0, Decimal("0.00")),
+        (0, Decimal("0.00")),
+        (1, Decimal("40.00")),
+    ]
+    assert (school_aging.invoices_count, school_aging.balance_due) == (3, Decimal("190.00"))
+    assert [aging.school_id for aging in report.schools] == [school.id, other_school_id]
+    assert report.schools[0] == school_aging
+    assert (report.invoices_count, report.balance_due) == (7, Decimal("275.50"))
+    assert report.buckets[-1].invoices_count == 2
+    assert report.buckets[-1].balance_due == Decimal("50.00")
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_term_billing_run_batches_inserts_reports_progress_and_is_idempotent() -> None:
+    school = SchoolDTO(id=uuid7(), name="Billing Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"Student {index}") for index in range(5)]
+    invoice_repo = FakeInvoiceRepo(invoices_by_id={})
+    uow = FakeUnitOfWork(
+        invoices=invoice_repo,
+        students=FakeStudentRepo(students={}, by_school={school.id: students}),
+        schools=FakeSchoolRepo({school.id: school}),
+    )
+    fees = [FeeDTO("tuition", Decimal("1200.00"), "Term tuition"), FeeDTO("books", Decimal("80.00"))]
+    run_id = uuid7()
+    progress: list[BillingRunResultDTO] = []
+
+    async def bill() -> BillingRunResultDTO:
+        return await run_term_billing(
+            uow,
+            run_id=run_id,
+            school_id=school.id,
+            fees=fees,
+            due_date=date(2026, 9, 1),
+            batch_size=3,
+            student_chunk_size=2,
+            on_progress=progress.append,
+        )
+
+    first = await bill()
+
+    assert (first.students, first.invoices_created, first.invoices_skipped) == (5, 10, 0)
+    assert [len(batch) for batch in invoice_repo.billing_run_batches] == [3, 3, 3, 1]
+    assert invoice_repo.billing_run_batches[0][0] == {
+        "student_id": students[0].id,
+        "fee_code": "tuition",
+        "total_amount": Decimal("1200.00"),
+        "due_date": date(2026, 9, 1),
+        "description": "Term tuition",
+    }
+    # One report per student chunk, then the final committed totals.
+    assert [(report.students, report.invoices_created) for report in progress] == [(2, 3), (4, 6), (5, 9), (5, 10)]
+    assert uow.commits == 1
+
+    rerun = await bill()
+
+    assert (rerun.students, rerun.invoices_created, rerun.invoices_skipped) == (5, 0, 10)
+    assert len(invoice_repo.billing_run_keys) == 10
+    assert list(uow.billing_runs.runs) == [run_id]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_term_billing_run_id_cannot_be_reused_for_another_school_or_other_parameters() -> None:
+    school = SchoolDTO(id=uuid7(), name="Billing Academy")
+    other_school = SchoolDTO(id=uuid7(), name="Other Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name="Student")]
+    other_students = [StudentDTO(id=uuid7(), school_id=other_school.id, full_name="Other Student")]
+    invoice_repo = FakeInvoiceRepo(invoices_by_id={})
+    uow = FakeUnitOfWork(
+        invoices=invoice_repo,
+        students=FakeStudentRepo(students={}, by_school={school.id: students, other_school.id: other_students}),
+        schools=FakeSchoolRepo({school.id: school, other_school.id: other_school}),
+    )
+    run_id = uuid7()
+    tuition = FeeDTO("tuition", Decimal("1200.00"), "Term tuition")
+    books = FeeDTO("books", Decimal("80.00"))
+
+    async def bill(school_id: UUID, fees: list[FeeDTO], due_date: date = date(2026, 9, 1)) -> BillingRunResultDTO:
+        return await run_term_billing(uow, run_id=run_id, school_id=school_id, fees=fees, due_date=due_date)
+
+    await bill(school.id, [tuition, books])
+    # Listing the same fees in another order is the same run.
+    rerun = await bill(school.id, [books, tuition])
+    assert (rerun.invoices_created, rerun.invoices_skipped) == (0, 2)
+
+    for school_id, fees, due_date in (
+        (other_school.id, [tuition, books], date(2026, 9, 1)),
+        (school.id, [tuition, books], date(2026, 10, 1)),
+        (school.id, [tuition, FeeDTO("books", Decimal("90.00"))], date(2026, 9, 1)),
+        (school.id, [tuition, FeeDTO("books", Decimal("80.00"), "Books")], date(2026, 9, 1)),
+        (school.id, [tuition], date(2026, 9, 1)),
+    ):
+        with pytest.raises(ConflictError):
+            await bill(school_id, fees, due_date)
+
+    assert uow.commits == 2
+    assert len(invoice_repo.billing_run_keys) == 2
+    assert {student_id for _, student_id, _ in invoice_repo.billing_run_keys} == {students[0].id}
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_term_billing_run_rejects_invalid_fees_and_unknown_schools() -> None:
+    school = SchoolDTO(id=uuid7(), name="Billing Academy")
+    uow = FakeUnitOfWork(schools=FakeSchoolRepo({school.id: school}))
+
+    for fees in (
+        [],
+        [FeeDTO("tuition", Decimal("10.00")), FeeDTO("tuition", Decimal("20.00"))],
+        [FeeDTO("tuition", Decimal("0.00"))],
+    ):
+        with pytest.raises(DomainError):
+            await run_term_billing(uow, run_id=uuid7(), school_id=school.id, fees=fees, due_date=date(2026, 9, 1))
+
+    # Zero would never drain a batch, and past the cap one INSERT binds more parameters than asyncpg allows.
+    for batch_size in (0, -1, MAX_BATCH_SIZE + 1):
+        with pytest.raises(DomainError):
+            await run_term_billing(
+                uow,
+                run_id=uuid7(),
+                school_id=school.id,
+                fees=[FeeDTO("tuition", Decimal("10.00"))],
+                due_date=date(2026, 9, 1),
+                batch_size=batch_size,
+            )
+
+    with pytest.raises(NotFoundError):
+        await run_term_billing(
+            uow,
+            run_id=uuid7(),
+            school_id=uuid7(),
+            fees=[FeeDTO("tuition", Decimal("10.00"))],
+            due_date=date(2026, 9, 1),
+        )
+    assert uow.commits == 0
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_in_memory_statement_cache_evicts_least_recently_used_and_expired_entries() -> None:
+    now = [0.0]
+    cache = InMemoryStatementCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    capacity_before = REGISTRY.get_sample_value("statement_cache_evictions_total", {"reason": "capacity"}) or 0.0
+
+    await cache.set("a", b"1")
+    await cache.set("b", b"2")
+    assert await cache.get("a") == b"1"
+    await cache.set("c", b"3")
+
+    assert await cache.get("b") is None
+    assert (await cache.get("a"), await cache.get("c")) == (b"1", b"3")
+    assert REGISTRY.get_sample_value("statement_cache_evictions_total", {"reason": "capacity"}) == capacity_before + 1
+
+    now[0] = 10.0
+    assert await cache.get("a") is None
+    await cache.delete_many(["c", "missing"])
+    assert len(cache) == 0
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_redis_statement_cache_prefixes_keys_and_sets_ttl() -> None:
+    class FakeRedis:
+        def __init__(self) -> None:
+            self.values: dict[str, bytes] = {}
+            self.expiries: dict[str, int | None] = {}
+
+        async def get(self, name: str) -> bytes | None:
+            return self.values.get(name)
+
+        async def set(self, name: str, value: bytes, ex: int | None = None) -> object:
+            self.values[name] = value
+            self.expiries[name] = ex
+            return True
+
+        async def delete(self, *names: str) -> int:
+            return sum(self.values.pop(name, None) is not None for name in names)
+
+    client = FakeRedis()
+    cache = RedisStatementCache(client, ttl_seconds=30, key_prefix="school-billing:")
+
+    await cache.set("statement:student:1", b"{}")
+    assert client.expiries == {"school-billing:statement:student:1": 30}
+    assert await cache.get("statement:student:1") == b"{}"
+    await cache.delete_many(["statement:student:1"])
+    assert await cache.get("statement:student:1") is None
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_cached_statement_serves_hits_until_a_payment_write_invalidates_it() -> None:
+    school_id = uuid7()
+    student_id = uuid7()
+    invoice_id = uuid7()
+    invoice = _invoice(invoice_id, student_id, "100.00", InvoiceStatus.PENDING)
+    student_repo = FakeStudentRepo(
+        students={student_id: StudentDTO(id=student_id, school_id=school_id, full_name="Ada Lovelace")}, by_school={}
+    )
+    invoice_repo = FakeInvoiceRepo(invoices_by_id={invoice_id: invoice}, by_student={student_id: [invoice]})
+    use_case = GetStudentStatement(FakeStatementRepos(students=student_repo, invoices=invoice_repo))
+    computed: list[UUID] = []
+
+    async def counting_use_case(requested_id: UUID) -> bytes:
+        computed.append(requested_id)
+        return await use_case.json(requested_id)
+
+    cache = InMemoryStatementCache(ttl_seconds=60, max_entries=100)
+    cached_use_case = CachedGetStudentStatement(counting_use_case, cache)
+    hits_before = (
+        REGISTRY.get_sample_value("statement_cache_requests_total", {"scope": "student", "result": "hit"}) or 0.0
+    )
+
+    first = await cached_use_case(student_id)
+    second = await cached_use_case(student_id)
+    assert second == first
+    assert StudentStatement.model_validate_json(first) == await use_case(student_id)
+    assert computed == [student_id]
+    assert (
+        REGISTRY.get_sample_value("statement_cache_requests_total", {"scope": "student", "result": "hit"})
+        == hits_before + 1
+    )
+
+    await cache.set(school_statement_key(school_id), b"{}")
+    uow = FakeUnitOfWork(invoices=invoice_repo, students=student_repo)
+    await payment_service.create_payment(
+        uow, data={"invoice_id": invoice_id, "amount": Decimal("40.00")}, statement_cache=cache
+    )
+
+    assert await cache.get(student_statement_key(student_id)) is None
+    assert await cache.get(school_statement_key(school_id)) is None
+    await cached_use_case(student_id)
+    assert computed == [student_id, student_id]
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_deleting_a_school_drops_its_students_cached_statements_too() -> None:
+    school = SchoolDTO(id=uuid7(), name="Closing Academy")
+    students = [StudentDTO(id=uuid7(), school_id=school.id, full_name=f"S{index}") for index in range(3)]
+    uow = FakeUnitOfWork(
+        schools=FakeSchoolRepo({school.id: school}),
+        students=FakeStudentRepo(students={}, by_school={school.id: students}),
+    )
+    cache = InMemoryStatementCache(ttl_seconds=60, max_entries=100)
+    for key in [*(student_statement_key(student.id) for student in students), school_statement_key(school.id)]:
+        await cache.set(key, b"generation")
+
+    assert await school_service.delete_school(uow, school.id, statement_cache=cache) is True
+
+    assert len(cache) == 0
+    assert uow.commits == 1
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_bulk_payment_invalidation_looks_up_every_school_in_one_query() -> None:
+    school_ids = [uuid7(), uuid7()]
+    students = [StudentDTO(id=uuid7(), school_id=school_ids[index % 2], full_name=f"S{index}") for index in range(4)]
+    invoices = [_invoice(uuid7(), student.id, "100.00", InvoiceStatus.PENDING) for student in students]
+    student_repo = FakeStudentRepo(students={student.id: student for student in students}, by_school={})
+    uow = FakeUnitOfWork(
+        invoices=FakeInvoiceRepo(invoices_by_id={invoice.id: invoice for invoice in invoices}), students=student_repo
+    )
+    cache = InMemoryStatementCache(ttl_seconds=60, max_entries=100)
+    for key in [*map(student_statement_key, (s.id for s in students)), *map(school_statement_key, school_ids)]:
+        await cache.set(key, b"generation")
+
+    await payment_service.create_payments_bulk(
+        uow,
+        [{"invoice_id": invoice.id, "amount": Decimal("10.00"), "kind": PaymentKind.PAYMENT} for invoice in invoices],
+        statement_cache=cache,
+    )
+
+    assert student_repo.school_id_lookups == [sorted(student.id for student in students)]
+    assert len(cache) == 0
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_cache_fill_that_raced_an_invalidation_is_never_served() -> None:
+    school_id = uuid7()
+    cache = InMemoryStatementCache(ttl_seconds=60, max_entries=100)
+    bodies = iter([b'{"version": 1}', b'{"version": 2}'])
+    read_started = asyncio.Event()
+    write_committed = asyncio.Event()
+
+    async def slow_read(_school_id: UUID) -> bytes:
+        # The database was read before the write committed, but the fill only reaches the cache afterwards.
+        body = next(bodies)
+        read_started.set()
+        await write_committed.wait()
+        return body
+
+    async def fast_read(_school_id: UUID) -> bytes:
+        return next(bodies)
+
+    stale_fill = asyncio.create_task(CachedGetSchoolStatement(slow_read, cache)(school_id))
+    await read_started.wait()
+    await invalidate_school_statements(cache, [school_id])
+    write_committed.set()
+    assert await stale_fill == b'{"version": 1}'
+
+    assert await CachedGetSchoolStatement(fast_read, cache)(school_id) == b'{"version": 2}'
+    assert await CachedGetSchoolStatement(fast_read, cache)(school_id) == b'{"version": 2}'
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_replica_fills_are_only_cached_once_the_generation_outlives_replica_lag() -> None:
+    student_id = uuid7()
+    cache = InMemoryStatementCache(ttl_seconds=60, max_entries=100)
+    now = [1_000.0]
+    reads: list[UUID] = []
+
+    async def replica_read(requested_id: UUID) -> bytes:
+        reads.append(requested_id)
+        return b"{}"
+
+    cached_use_case = _CachedStatementJSON(
+        replica_read,
+        cache,
+        scope=STUDENT_SCOPE,
+        key=student_statement_key,
+        settle_seconds=5.0,
+        clock=lambda: now[0],
+    )
+
+    # Just after an invalidation the replica may still be behind: serve what it returns, but do not cache it.
+    await cached_use_case(student_id)
+    now[0] += 4.0
+    await cached_use_case(student_id)
+    assert len(reads) == 2
+
+    now[0] += 1.0
+    await cached_use_case(student_id)
+    await cached_use_case(student_id)
+    assert len(reads) == 3
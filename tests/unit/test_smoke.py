@@ -1,7 +1,9 @@
 import pytest
 
 from app.api.health import health
-from app.main import app
+from app.core import process_pool
+from app.core.settings import settings
+from app.main import app, lifespan
 
 
 @pytest.mark.smoke
@@ -16,3 +18,20 @@ def test_fastapi_skeleton_wired() -> None:
     assert app.title == "school-billing"
     assert "/health" in paths
     assert "/auth/login" in paths
+
+
+@pytest.mark.smoke
+@pytest.mark.anyio
+async def test_lifespan_shuts_down_the_statement_process_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "statement_offload_workers", 1)
+    monkeypatch.setattr(process_pool, "_process_pool", None)
+    monkeypatch.setattr(process_pool, "_process_pool_built", False)
+
+    async with lifespan(app):
+        executor = process_pool.get_shared_process_pool()
+        assert executor is not None
+        assert executor.submit(sum, [1, 2]).result(timeout=60) == 3
+
+    assert process_pool._process_pool is None
+    with pytest.raises(RuntimeError):
+        executor.submit(sum, [1, 2])